@@ -6,4 +6,4 @@ class JbDrfAuthConfig(AppConfig):
     verbose_name = "JB DRF Auth"
 
     def ready(self):
-        from jb_drf_auth import checks  # noqa: F401
+        from jb_drf_auth import checks, replicas  # noqa: F401
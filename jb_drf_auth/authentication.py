@@ -0,0 +1,159 @@
+"""DRF authentication classes."""
+
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.revocation import is_token_revoked
+from jb_drf_auth.tokens import DEVICE_CLAIM, IS_ACTIVE_CLAIM, IS_VERIFIED_CLAIM, ROLE_CLAIM
+
+
+class JbTokenUser(TokenUser):
+    """
+    User principal built from access token claims. Attributes that are not in the
+    token are read from the user model, which is loaded on first use.
+    """
+
+    deleted = None
+
+    @cached_property
+    def id(self):
+        # SimpleJWT stores the id as a string; give views the model's own type.
+        user_id_field = get_user_model()._meta.get_field(api_settings.USER_ID_FIELD)
+        return user_id_field.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def is_active(self):
+        return bool(self.token.get(IS_ACTIVE_CLAIM, True))
+
+    @cached_property
+    def is_verified(self):
+        return bool(self.token.get(IS_VERIFIED_CLAIM, True))
+
+    @cached_property
+    def profile_id(self):
+        return self.token.get(get_setting("PROFILE_ID_CLAIM"))
+
+    @cached_property
+    def role(self):
+        return self.token.get(ROLE_CLAIM)
+
+    @cached_property
+    def device_token(self):
+        return self.token.get(DEVICE_CLAIM)
+
+    @cached_property
+    def instance(self):
+        user_model = get_user_model()
+        try:
+            return user_model._default_manager.get(**{api_settings.USER_ID_FIELD: self.id})
+        except user_model.DoesNotExist:
+            raise AuthenticationFailed(_("Usuario no encontrado."), code="user_not_found")
+
+    @property
+    def is_loaded(self):
+        return "instance" in self.__dict__
+
+    # Not minted into the token (TokenUser reads a "username" claim).
+    @property
+    def username(self):
+        return self.instance.username
+
+    def get_username(self):
+        return self.instance.get_username()
+
+    def __str__(self):
+        return str(self.instance)
+
+    # Privileges are not part of the token; always read them from the model.
+    @property
+    def is_staff(self):
+        return self.instance.is_staff
+
+    @property
+    def is_superuser(self):
+        return self.instance.is_superuser
+
+    @property
+    def groups(self):
+        return self.instance.groups
+
+    @property
+    def user_permissions(self):
+        return self.instance.user_permissions
+
+    def get_group_permissions(self, obj=None):
+        return self.instance.get_group_permissions(obj)
+
+    def get_all_permissions(self, obj=None):
+        return self.instance.get_all_permissions(obj)
+
+    def has_perm(self, perm, obj=None):
+        return self.instance.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.instance.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.instance.has_module_perms(module)
+
+    def save(self, *args, **kwargs):
+        return self.instance.save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.instance.delete(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        return self.instance.set_password(raw_password)
+
+    def check_password(self, raw_password):
+        return self.instance.check_password(raw_password)
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ("token", "instance"):
+            raise AttributeError(name)
+        return getattr(self.instance, name)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without the per-request user query.
+
+    Safe (read-only) requests get a JbTokenUser built from the token claims; unsafe
+    requests get the user model instance so writes work unchanged. Revoked tokens
+    (logout, device sign-out, deactivation) are rejected through the revocation
+    state kept in the shared cache.
+    """
+
+    load_user_for_unsafe_methods = True
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None:
+            return None
+
+        user, validated_token = result
+        if self.load_user_for_unsafe_methods and request.method not in SAFE_METHODS:
+            user = user.instance
+            if not user.is_active:
+                raise AuthenticationFailed(_("Usuario inactivo."), code="user_inactive")
+        return user, validated_token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if not validated_token.get(IS_ACTIVE_CLAIM, True):
+            raise AuthenticationFailed(_("Usuario inactivo."), code="user_inactive")
+
+        if is_token_revoked(validated_token.payload):
+            raise AuthenticationFailed(_("El token fue revocado."), code="token_revoked")
+
+        return JbTokenUser(validated_token)
@@ -3,6 +3,7 @@ from django.contrib.auth.backends import ModelBackend
 from django.db.models import Q
 
 from jb_drf_auth.conf import get_setting
+from jb_drf_auth.utils import with_default_profile
 
 
 class EmailOrUsernameModelBackend(ModelBackend):
@@ -11,13 +12,14 @@ class EmailOrUsernameModelBackend(ModelBackend):
         if auth_type == "username":
             return super().authenticate(username, password)
         user_model = get_user_model()
+        users = with_default_profile(user_model.objects.all())
         try:
             if auth_type == "both":
-                user = user_model.objects.get(
+                user = users.get(
                     Q(username__iexact=username) | Q(email__iexact=username)
                 )
             else:
-                user = user_model.objects.get(email__iexact=username)
+                user = users.get(email__iexact=username)
             if user.check_password(password):
                 return user
         except user_model.DoesNotExist:
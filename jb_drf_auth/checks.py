@@ -3,7 +3,7 @@ import importlib.util
 from django.conf import settings
 from django.core.checks import Error, Warning, register
 
-from jb_drf_auth.conf import get_social_settings
+from jb_drf_auth.conf import get_setting, get_social_settings
 
 
 @register()
@@ -100,3 +100,106 @@ def social_auth_configuration_check(app_configs, **kwargs):
             )
 
     return issues
+
+
+@register()
+def jwt_signing_keys_check(app_configs, **kwargs):
+    if not get_setting("JWT_SIGNING_KEYS"):
+        return []
+
+    from jwt import PyJWTError
+
+    from jb_drf_auth.signing import get_keyset, reset_signing_keys
+
+    reset_signing_keys()
+    try:
+        keyset = get_keyset()
+    except (RuntimeError, ValueError, TypeError, PyJWTError) as exc:
+        return [
+            Error(
+                f"Invalid JWT signing keys: {exc}",
+                hint="Review JB_DRF_AUTH['JWT_SIGNING_KEYS'] and JB_DRF_AUTH['JWT_ACTIVE_KID'].",
+                id="jb_drf_auth.E004",
+            )
+        ]
+    if keyset.active is None:
+        return [
+            Error(
+                "JWT signing keys are configured but none has a PRIVATE_KEY.",
+                hint="Add the PRIVATE_KEY of the key that should sign new tokens.",
+                id="jb_drf_auth.E005",
+            )
+        ]
+    return []
+
+
+@register()
+def log_database_check(app_configs, **kwargs):
+    alias = get_setting("LOG_DATABASE")
+    if not alias:
+        return []
+    if alias not in settings.DATABASES:
+        return [
+            Error(
+                f"JB_DRF_AUTH LOG_DATABASE '{alias}' is not defined in DATABASES.",
+                id="jb_drf_auth.E006",
+            )
+        ]
+
+    issues = []
+    if "jb_drf_auth.routers.AuthLogRouter" not in getattr(settings, "DATABASE_ROUTERS", []):
+        issues.append(
+            Warning(
+                "LOG_DATABASE is set but AuthLogRouter is not installed.",
+                hint='Add "jb_drf_auth.routers.AuthLogRouter" to DATABASE_ROUTERS.',
+                id="jb_drf_auth.W004",
+            )
+        )
+
+    from django.core.exceptions import FieldDoesNotExist
+    from django.db import models
+
+    from jb_drf_auth.utils import get_otp_model_cls
+
+    if "OTP_MODEL" not in (get_setting("LOG_DATABASE_MODELS") or ()):
+        return issues
+    try:
+        user_field = get_otp_model_cls()._meta.get_field("user")
+    except (RuntimeError, LookupError, FieldDoesNotExist):
+        return issues
+    if user_field.db_constraint or user_field.remote_field.on_delete is not models.DO_NOTHING:
+        issues.append(
+            Warning(
+                "The OTP model lives on LOG_DATABASE but its user foreign key points to another database.",
+                hint=(
+                    "Override `user` on the concrete OTP model with "
+                    "on_delete=models.DO_NOTHING and db_constraint=False."
+                ),
+                id="jb_drf_auth.W005",
+            )
+        )
+    return issues
+
+
+@register()
+def read_replicas_check(app_configs, **kwargs):
+    replicas = tuple(get_setting("READ_REPLICAS") or ())
+    if not replicas:
+        return []
+    missing = [alias for alias in replicas if alias not in settings.DATABASES]
+    if missing:
+        return [
+            Error(
+                f"JB_DRF_AUTH READ_REPLICAS are not defined in DATABASES: {', '.join(missing)}.",
+                id="jb_drf_auth.E007",
+            )
+        ]
+    if "jb_drf_auth.routers.ReadReplicaRouter" not in getattr(settings, "DATABASE_ROUTERS", []):
+        return [
+            Warning(
+                "READ_REPLICAS is set but ReadReplicaRouter is not installed.",
+                hint='Add "jb_drf_auth.routers.ReadReplicaRouter" to DATABASE_ROUTERS.',
+                id="jb_drf_auth.W006",
+            )
+        ]
+    return []
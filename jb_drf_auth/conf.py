@@ -12,6 +12,8 @@ DEFAULTS = {
     "TERMS_AND_CONDITIONS_REQUIRED": True,
     "EMAIL_PROVIDER": "jb_drf_auth.providers.django_email.DjangoEmailProvider",
     "EMAIL_LOG_MODEL": None,  # required for email flows: "authentication.EmailLog"
+    "EMAIL_OUTBOX_MODEL": None,  # optional queue for deferred emails: "authentication.EmailOutbox"
+    "EMAIL_OUTBOX_MAX_ATTEMPTS": 5,
     "EMAIL_TEMPLATES": None,
     "ADMIN_BOOTSTRAP_TOKEN": None,
     "OTP_LENGTH": 6,
@@ -32,6 +34,23 @@ DEFAULTS = {
     ),
     "DEFAULT_PROFILE_ROLE": "USER",
     "PROFILE_ID_CLAIM": "profile_id",
+    "JWT_SIGNING_KEYS": (),  # ({"KID": "2026-01", "ALGORITHM": "RS256", "PRIVATE_KEY": "<pem>"},)
+    "JWT_ACTIVE_KID": None,  # defaults to the first key with a PRIVATE_KEY
+    "JWKS_CACHE_SECONDS": 60 * 60,
+    "TOKEN_CACHE_ALIAS": "default",  # shared cache for revocation state (use Redis/Memcached in production)
+    "ROTATE_REFRESH_TOKENS": True,
+    "REVOCATION_FILTER_ENABLED": False,  # in-process Bloom filter in front of the denylist
+    "REVOCATION_FILTER_SYNC_SECONDS": 5,
+    "REVOCATION_FILTER_SIZE_BITS": 1 << 20,
+    "REVOCATION_FILTER_HASHES": 7,
+    "DEVICE_LAST_SEEN_INTERVAL_SECONDS": 15 * 60,  # coalesces last_seen_at writes from /me/
+    "LOGIN_TOUCH_FLUSH_SECONDS": 60,  # buffers social last_login_at writes (0 writes on every login)
+    "DEVICE_STALE_DAYS": 90,  # jb_auth_prune_devices default threshold
+    "DELETED_ACCOUNT_RETENTION_DAYS": 30,  # jb_auth_process_deletions hard purge threshold
+    "PROFILE_PAGINATION_ENABLED": False,  # clients can still opt in with ?cursor= / ?page_size=
+    "PERSON_SEARCH_MODEL": None,  # model searched by /admin/persons/search/ (defaults to PROFILE_MODEL)
+    "PERSON_SEARCH_MIN_LENGTH": 3,
+    "DUPLICATE_CANDIDATE_MODEL": None,  # optional review table for jb_auth_find_duplicates
     "PROFILE_PICTURE_UPLOAD_TO": "uploads/users/profile-pictures",
     "PROFILE_PICTURE_OPTIMIZE": True,
     "PROFILE_PICTURE_MAX_BYTES": 1024 * 1024,
@@ -39,6 +58,8 @@ DEFAULTS = {
     "PROFILE_PICTURE_MAX_HEIGHT": 1080,
     "PROFILE_PICTURE_JPEG_QUALITY": 85,
     "PROFILE_PICTURE_MIN_JPEG_QUALITY": 65,
+    "PROFILE_PICTURE_MAX_UPLOAD_BYTES": 10 * 1024 * 1024,
+    "PROFILE_PICTURE_MAX_UPLOAD_PIXELS": 40_000_000,
     "PERSON_PICTURE_UPLOAD_TO": None,
     "PERSON_ID_DOCUMENTS_UPLOAD_TO": "uploads/people/id-documents",
     "SMS_PROVIDER": "jb_drf_auth.providers.aws_sns.AwsSnsSmsProvider",
@@ -50,6 +71,24 @@ DEFAULTS = {
     "TWILIO_FROM_NUMBER": None,
     "TWILIO_MESSAGING_SERVICE_SID": None,
     "SMS_LOG_MODEL": None,  # optional: "accounts.SmsLog"
+    "DELIVERY_STAT_MODEL": None,  # optional daily rollup: "accounts.DeliveryStat"
+    "DELIVERY_LOG_BODY_MODE": "digest",  # "digest", "compressed" or "full"
+    "DELIVERY_LOG_SINK": "jb_drf_auth.log_sinks.DatabaseLogSink",
+    "DELIVERY_LOG_BUFFER_SIZE": 100,  # BufferedDatabaseLogSink rows per INSERT
+    "DELIVERY_LOG_FLUSH_INTERVAL_MS": 1000,
+    "DELIVERY_LOG_MAX_PENDING": 10000,
+    "EMAIL_LOG_RETENTION_DAYS": 90,  # jb_auth_prune_logs
+    "SMS_LOG_RETENTION_DAYS": 90,
+    "LOG_DATABASE": None,  # database alias for AuthLogRouter, e.g. "auth_logs"
+    "LOG_DATABASE_MODELS": (
+        "OTP_MODEL",
+        "SMS_LOG_MODEL",
+        "EMAIL_LOG_MODEL",
+        "DELIVERY_STAT_MODEL",
+        "EMAIL_OUTBOX_MODEL",
+    ),
+    "READ_REPLICAS": (),  # database aliases for ReadReplicaRouter, e.g. ("replica",)
+    "REPLICA_STICKY_SECONDS": 10,  # a user who wrote reads from the primary for this long
     "PHONE_DEFAULT_COUNTRY_CODE": None,
     "PHONE_MIN_LENGTH": 10,
     "PHONE_MAX_LENGTH": 15,
@@ -80,6 +119,9 @@ DEFAULTS = {
         "PICTURE_DOWNLOAD_TIMEOUT_SECONDS": 5,
         "PICTURE_MAX_BYTES": 5 * 1024 * 1024,
         "PICTURE_ALLOWED_CONTENT_TYPES": ("image/jpeg", "image/png", "image/webp"),
+        "PICTURE_RESYNC_INTERVAL_SECONDS": 24 * 60 * 60,
+        "PICTURE_SYNC_ASYNC": False,
+        "IDENTITY_CACHE_SECONDS": 300,  # reuse verified tokens between precheck and login (0 = off)
         "PROVIDERS": {
             "google": {
                 "CLASS": "jb_drf_auth.providers.google_oidc.GoogleOidcProvider",
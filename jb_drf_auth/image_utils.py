@@ -1,12 +1,39 @@
+import base64
+import binascii
+import uuid
 from io import BytesIO
 from pathlib import Path
 
 from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
 from PIL import Image
 
 from jb_drf_auth.conf import get_setting
 
 
+# Multiple of 4 so every chunk decodes on its own.
+BASE64_CHUNK_CHARS = 64 * 1024
+DATA_URI_HEADER_MAX_CHARS = 256
+ALLOWED_IMAGE_FORMATS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "GIF": "gif",
+    "WEBP": "webp",
+}
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+class ImageDimensionsError(ValueError):
+    pass
+
+
+class UnsupportedImageError(ValueError):
+    pass
+
+
 def _int_setting(name: str, default: int) -> int:
     value = get_setting(name)
     try:
@@ -15,6 +42,75 @@ def _int_setting(name: str, default: int) -> int:
         return default
 
 
+def decode_base64_to_file(data: str, max_bytes: int, chunk_chars: int = BASE64_CHUNK_CHARS):
+    """
+    Decode a base64 payload (optionally a data URI) into a temporary file chunk by chunk.
+    Raises ValueError as soon as the decoded size goes over max_bytes.
+    """
+    start = 0
+    content_type = None
+    if data.startswith("data:"):
+        header_end = data.find(",", 0, DATA_URI_HEADER_MAX_CHARS)
+        if header_end < 0:
+            raise ValueError("Invalid data URI header.")
+        content_type = data[5:header_end].split(";")[0] or None
+        start = header_end + 1
+
+    upload = TemporaryUploadedFile(f"{uuid.uuid4()}.upload", content_type, 0, None)
+    written = 0
+    pending = ""
+    try:
+        for offset in range(start, len(data), chunk_chars):
+            chunk = pending + "".join(data[offset : offset + chunk_chars].split())
+            usable = len(chunk) - (len(chunk) % 4)
+            pending = chunk[usable:]
+            if not usable:
+                continue
+            decoded = base64.b64decode(chunk[:usable], validate=True)
+            written += len(decoded)
+            if written > max_bytes:
+                raise ImageTooLargeError("Image exceeds the maximum allowed size.")
+            upload.write(decoded)
+        if pending:
+            raise ValueError("Invalid base64 payload length.")
+    except binascii.Error as exc:
+        upload.close()
+        raise ValueError("Invalid base64 payload.") from exc
+    except Exception:
+        upload.close()
+        raise
+
+    upload.size = written
+    upload.seek(0)
+    return upload
+
+
+def inspect_image(uploaded_file, max_pixels: int | None = None):
+    """
+    Read image format and dimensions from the file header without decoding pixels.
+    Returns (extension, width, height) or raises ValueError.
+    """
+    try:
+        uploaded_file.seek(0)
+        with Image.open(uploaded_file) as image:
+            image_format = image.format
+            width, height = image.size
+    except (Image.DecompressionBombError, OSError, SyntaxError) as exc:
+        raise ValueError("Invalid image file.") from exc
+    finally:
+        try:
+            uploaded_file.seek(0)
+        except Exception:
+            pass
+
+    extension = ALLOWED_IMAGE_FORMATS.get(image_format or "")
+    if not extension:
+        raise UnsupportedImageError("Unsupported image type.")
+    if max_pixels and width * height > max_pixels:
+        raise ImageDimensionsError("Image dimensions exceed the maximum allowed.")
+    return extension, width, height
+
+
 def optimize_profile_picture(uploaded_file):
     if not get_setting("PROFILE_PICTURE_OPTIMIZE"):
         return uploaded_file
@@ -38,6 +134,9 @@ def optimize_profile_picture(uploaded_file):
     except Exception:
         return uploaded_file
 
+    # JPEG can be decoded at a reduced scale straight from the file.
+    image.draft("RGB", (max_width, max_height))
+
     if image.mode not in ("RGB", "L"):
         image = image.convert("RGB")
     elif image.mode == "L":
@@ -0,0 +1,151 @@
+"""
+Destinations for SmsLog/EmailLog rows (JB_DRF_AUTH_DELIVERY_LOG_SINK).
+
+Services call `get_delivery_log_sink().write(model, fields)` once per delivery, where
+`fields` comes from `DeliveryLogService.email_log_fields` / `sms_log_fields`.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.db import close_old_connections
+
+from jb_drf_auth.conf import get_setting
+
+
+logger = logging.getLogger("jb_drf_auth.log_sinks")
+
+
+class BaseLogSink:
+    def write(self, model, fields: dict):
+        raise NotImplementedError
+
+    def flush(self):
+        """Write anything still buffered."""
+
+    def close(self):
+        self.flush()
+
+
+class DatabaseLogSink(BaseLogSink):
+    """One INSERT per delivery, in the caller's request (the previous behavior)."""
+
+    def write(self, model, fields):
+        model.objects.create(**fields)
+
+
+class LoggingLogSink(BaseLogSink):
+    """Emits the log row to the `jb_drf_auth.delivery` logger instead of the database."""
+
+    delivery_logger = logging.getLogger("jb_drf_auth.delivery")
+
+    def write(self, model, fields):
+        values = " ".join(
+            f"{name}={value}" for name, value in fields.items() if value is not None and name != "body_compressed"
+        )
+        self.delivery_logger.info("delivery_logged model=%s %s", model._meta.label, values)
+
+
+class BufferedDatabaseLogSink(BaseLogSink):
+    """
+    Queues rows in memory and bulk inserts them from a background thread every
+    DELIVERY_LOG_BUFFER_SIZE rows or DELIVERY_LOG_FLUSH_INTERVAL_MS milliseconds,
+    whichever comes first. Pending rows are flushed at interpreter exit; rows still
+    queued when the process is killed are lost. When DELIVERY_LOG_MAX_PENDING rows are
+    waiting (database down or too slow) new rows are written synchronously.
+    """
+
+    _start_lock = threading.Lock()
+
+    def __init__(self, batch_size=None, flush_interval_ms=None, max_pending=None):
+        self.batch_size = batch_size or get_setting("DELIVERY_LOG_BUFFER_SIZE")
+        interval_ms = flush_interval_ms or get_setting("DELIVERY_LOG_FLUSH_INTERVAL_MS")
+        self.flush_interval = interval_ms / 1000
+        self.max_pending = max_pending or get_setting("DELIVERY_LOG_MAX_PENDING")
+        self._pid = None
+        self._exit_registered = False
+
+    def _start(self):
+        # Lazily, and again in forked workers (threads do not survive fork).
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="jb-drf-auth-log-sink", daemon=True)
+        self._thread.start()
+        if not self._exit_registered:
+            atexit.register(self.close)
+            self._exit_registered = True
+        # Published last: other threads only use the queue once it exists.
+        self._pid = os.getpid()
+
+    def write(self, model, fields):
+        if self._pid != os.getpid():
+            with self._start_lock:
+                # Two first writes must not each start a queue.
+                if self._pid != os.getpid():
+                    self._start()
+        try:
+            self._queue.put_nowait((model, fields))
+        except queue.Full:
+            logger.warning("delivery_log_buffer_full model=%s pending=%s", model._meta.label, self.max_pending)
+            model.objects.create(**fields)
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stopping:
+                # close() drains what is left in the calling thread.
+                return
+            self._drain()
+            close_old_connections()
+
+    def _drain(self):
+        with self._lock:
+            while True:
+                rows = {}
+                for _ in range(self.batch_size):
+                    try:
+                        model, fields = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    rows.setdefault(model, []).append(fields)
+                if not rows:
+                    return
+                for model, batch in rows.items():
+                    try:
+                        self._write_batch(model, batch)
+                    except Exception:
+                        logger.exception("delivery_log_flush_failed model=%s rows=%s", model._meta.label, len(batch))
+
+    def _write_batch(self, model, batch):
+        model.objects.bulk_create([model(**fields) for fields in batch])
+
+    def flush(self):
+        if self._pid == os.getpid():
+            self._drain()
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._drain()
+        self._pid = None
+
+
+def _reset_start_lock():
+    # A fork while another thread holds the lock would leave the child's copy locked forever.
+    BufferedDatabaseLogSink._start_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_start_lock)
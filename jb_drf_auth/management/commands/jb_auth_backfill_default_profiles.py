@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from jb_drf_auth.utils import get_profile_model_cls
+
+
+class Command(BaseCommand):
+    help = "Populate user.default_profile from the profile flagged as default, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be greater than zero.")
+
+        user_model = get_user_model()
+        try:
+            user_model._meta.get_field("default_profile")
+        except FieldDoesNotExist as exc:
+            raise CommandError(f"{user_model._meta.label} has no default_profile field.") from exc
+        profile_model = get_profile_model_cls()
+
+        linked = self._link_defaults(user_model, profile_model, batch_size)
+        cleared = self._clear_stale(user_model, batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(f"Default profiles linked: {linked}. Stale pointers cleared: {cleared}.")
+        )
+
+    @staticmethod
+    def _link_defaults(user_model, profile_model, batch_size):
+        defaults = profile_model._base_manager.filter(is_default=True)
+        if any(field.name == "deleted" for field in profile_model._meta.get_fields()):
+            defaults = defaults.filter(deleted__isnull=True)
+
+        linked = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                defaults.filter(pk__gt=last_pk).order_by("pk").values_list("pk", "user_id")[:batch_size]
+            )
+            if not rows:
+                return linked
+            last_pk = rows[-1][0]
+
+            profile_by_user = {user_id: profile_id for profile_id, user_id in rows}
+            stale = [
+                user_model(pk=user_id, default_profile_id=profile_by_user[user_id])
+                for user_id, current in user_model._base_manager.filter(
+                    pk__in=profile_by_user
+                ).values_list("pk", "default_profile_id")
+                if current != profile_by_user[user_id]
+            ]
+            if stale:
+                with transaction.atomic():
+                    user_model._base_manager.bulk_update(stale, ["default_profile"])
+                linked += len(stale)
+
+    @staticmethod
+    def _clear_stale(user_model, batch_size):
+        stale_filter = Q(default_profile__is_default=False)
+        profile_model = user_model._meta.get_field("default_profile").related_model
+        if any(field.name == "deleted" for field in profile_model._meta.get_fields()):
+            stale_filter |= Q(default_profile__deleted__isnull=False)
+        stale_users = user_model._base_manager.filter(stale_filter).order_by("pk")
+
+        cleared = 0
+        last_pk = 0
+        while True:
+            pks = list(stale_users.filter(pk__gt=last_pk).values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return cleared
+            last_pk = pks[-1]
+            cleared += user_model._base_manager.filter(pk__in=pks).update(default_profile=None)
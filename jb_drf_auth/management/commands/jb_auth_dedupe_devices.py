@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Coalesce
+
+from jb_drf_auth.utils import get_device_model_cls
+
+
+class Command(BaseCommand):
+    help = (
+        "Collapse duplicated devices, keeping the newest live row per (user, token) and, "
+        "for devices without token, per (user, notification_token); soft deleted rows are "
+        "only kept when no live row is left. Run it before migrating the unique (user, "
+        "token) constraint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be greater than zero.")
+
+        device_model = get_device_model_cls()
+        dry_run = options["dry_run"]
+        by_token = self._collapse(
+            device_model._base_manager.filter(token__isnull=False),
+            "token",
+            batch_size,
+            dry_run,
+        )
+        by_notification_token = self._collapse(
+            device_model._base_manager.filter(token__isnull=True, notification_token__isnull=False),
+            "notification_token",
+            batch_size,
+            dry_run,
+        )
+
+        verb = "Duplicate devices found" if dry_run else "Duplicate devices removed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb}: {by_token + by_notification_token} "
+                f"(by token: {by_token}, by notification token: {by_notification_token})."
+            )
+        )
+
+    @staticmethod
+    def _collapse(devices, key_field, batch_size, dry_run):
+        groups = (
+            devices.values("user_id", key_field)
+            # The newest live row survives; the newest row only if all are soft deleted.
+            .annotate(
+                rows=Count("pk"),
+                keep_pk=Coalesce(Max("pk", filter=Q(deleted__isnull=True)), Max("pk")),
+            )
+            .filter(rows__gt=1)
+            .order_by("user_id", key_field)
+        )
+
+        removed = 0
+        cursor = None
+        while True:
+            page = groups
+            if cursor is not None:
+                last_user_id, last_key = cursor
+                page = page.filter(
+                    Q(user_id__gt=last_user_id) | Q(user_id=last_user_id, **{f"{key_field}__gt": last_key})
+                )
+            batch = list(page[:batch_size])
+            if not batch:
+                return removed
+            cursor = (batch[-1]["user_id"], batch[-1][key_field])
+
+            group_filter = Q()
+            for group in batch:
+                group_filter |= Q(user_id=group["user_id"], **{key_field: group[key_field]})
+            duplicates = devices.filter(group_filter).exclude(pk__in=[group["keep_pk"] for group in batch])
+
+            if dry_run:
+                removed += duplicates.count()
+                continue
+            with transaction.atomic(using=devices.db):
+                removed += devices.model._base_manager.filter(
+                    pk__in=list(duplicates.values_list("pk", flat=True))
+                ).delete()[0]
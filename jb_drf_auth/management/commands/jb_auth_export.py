@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jb_drf_auth.services.user_export import EXPORT_FORMATS, UserExportService
+
+
+class Command(BaseCommand):
+    help = (
+        "Export users with their default profile and social accounts as JSON Lines or CSV. "
+        "Only allow-listed fields are written (no passwords, settings or provider payloads)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+        parser.add_argument("--output", default="-", help="File to write, or - for stdout.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be greater than zero.")
+
+        to_stdout = options["output"] == "-"
+        output = sys.stdout if to_stdout else open(options["output"], "w", newline="", encoding="utf-8")
+        exported = 0
+        try:
+            for line in UserExportService.iter_lines(options["format"], chunk_size=options["chunk_size"]):
+                output.write(line)
+                exported += 1
+        finally:
+            if not to_stdout:
+                output.close()
+
+        if options["format"] == "csv":
+            exported -= 1
+        self.stderr.write(f"Exported {exported} users.")
@@ -0,0 +1,88 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from jb_drf_auth.services.duplicates import KEY_TYPES, DuplicateDetectionService
+from jb_drf_auth.utils import get_duplicate_candidate_model_cls, get_person_search_model_cls
+
+
+class Command(BaseCommand):
+    help = (
+        "Find person records sharing a blocking key (normalized phone, lowercase email, "
+        "national id, name plus birthday) and write the groups to the review table "
+        "(JB_DRF_AUTH_DUPLICATE_CANDIDATE_MODEL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            default=None,
+            help="app_label.ModelName to scan (defaults to JB_DRF_AUTH_PERSON_SEARCH_MODEL or the profile model).",
+        )
+        parser.add_argument(
+            "--keys",
+            default=",".join(KEY_TYPES),
+            help="Comma separated blocking keys. Keys the model can not build are skipped.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10000)
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=1,
+            help="Split each key into this many passes to bound memory on very large tables.",
+        )
+        parser.add_argument("--show", type=int, default=20, help="Groups to print per key.")
+        parser.add_argument("--dry-run", action="store_true", help="Print groups without saving them.")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be greater than zero.")
+        if options["partitions"] < 1:
+            raise CommandError("--partitions must be greater than zero.")
+
+        try:
+            model = apps.get_model(options["model"]) if options["model"] else get_person_search_model_cls()
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        if not options["dry_run"]:
+            # Before scanning: saving needs the review table.
+            try:
+                get_duplicate_candidate_model_cls()
+            except (LookupError, RuntimeError) as exc:
+                raise CommandError(str(exc)) from exc
+
+        requested = [key.strip() for key in options["keys"].split(",") if key.strip()]
+        unknown = sorted(set(requested) - set(KEY_TYPES))
+        if unknown:
+            raise CommandError(f"Unknown keys: {', '.join(unknown)}.")
+        available = DuplicateDetectionService.available_key_types(model)
+        key_types = [key for key in requested if key in available]
+        for key in sorted(set(requested) - set(available)):
+            self.stdout.write(f"Skipping {key}: {model._meta.label} has no columns for it.")
+
+        queryset = model._default_manager.all()
+        summary = []
+        for key_type in key_types:
+            started = time.monotonic()
+            groups = DuplicateDetectionService.find_groups(
+                queryset, key_type, chunk_size=options["chunk_size"], partitions=options["partitions"]
+            )
+            groups = list(groups) if options["dry_run"] else groups
+            if options["dry_run"]:
+                found = len(groups)
+                self._print_groups(key_type, groups[: options["show"]])
+            else:
+                found = DuplicateDetectionService.save_candidates(model, key_type, groups)
+            summary.append(f"{key_type}: {found}")
+            self.stdout.write(f"{key_type}: {found} groups in {time.monotonic() - started:.1f}s")
+
+        verb = "Found" if options["dry_run"] else "Saved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} duplicate groups ({', '.join(summary) or 'none'})."))
+
+    def _print_groups(self, key_type, groups):
+        if not groups:
+            return
+        self.stdout.write(f"{'key':<12} {'value':<40} {'records'}")
+        for key, pks in groups:
+            self.stdout.write(f"{key_type:<12} {key[:40]:<40} {', '.join(str(pk) for pk in pks)}")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jb_drf_auth.services.login_activity import LoginActivityService
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the buffered social last_login_at timestamps now. Logins flush "
+        "them every JB_DRF_AUTH_LOGIN_TOUCH_FLUSH_SECONDS; run this from cron on quiet "
+        "sites or before clearing the cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be greater than zero.")
+
+        updated = LoginActivityService.flush(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Login timestamps written: {updated}."))
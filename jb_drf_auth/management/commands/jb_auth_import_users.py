@@ -0,0 +1,77 @@
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jb_drf_auth.services.user_import import UserImportService
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users and their default profile from a CSV or JSON Lines file. Columns: email "
+        "(required), username, password or password_hash (Django format), phone, first_name, "
+        "last_name_1, last_name_2, birthday (YYYY-MM-DD), gender, role, is_verified, "
+        "terms_and_conditions_accepted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--hash-workers",
+            type=int,
+            default=0,
+            help="Processes used to hash plain passwords (0 hashes in this process).",
+        )
+        parser.add_argument("--active", action="store_true", help="Create active users.")
+        parser.add_argument("--verified", action="store_true", help="Mark users as verified (and active).")
+        parser.add_argument(
+            "--send-confirmation",
+            action="store_true",
+            help="Queue confirmation emails in the email outbox for unverified users.",
+        )
+        parser.add_argument("--report", default=None, help="Write skipped rows to this CSV file.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be greater than zero.")
+        file_format = options["format"]
+        if file_format is None:
+            file_format = "csv" if options["path"].endswith(".csv") else "jsonl"
+
+        report_file = open(options["report"], "w", newline="", encoding="utf-8") if options["report"] else None
+        report = csv.writer(report_file or self.stderr)
+        report.writerow(["line", "email", "reason"])
+        stream = sys.stdin if options["path"] == "-" else open(options["path"], newline="", encoding="utf-8")
+        started = time.monotonic()
+        try:
+            result = UserImportService.import_rows(
+                UserImportService.read_rows(stream, file_format),
+                batch_size=options["batch_size"],
+                hash_workers=options["hash_workers"],
+                active=options["active"],
+                verified=options["verified"],
+                send_confirmation=options["send_confirmation"],
+                dry_run=options["dry_run"],
+                on_conflict=lambda line, email, reason: report.writerow([line, email or "", reason]),
+            )
+        except RuntimeError as exc:
+            raise CommandError(str(exc)) from exc
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if report_file is not None:
+                report_file.close()
+
+        elapsed = time.monotonic() - started
+        rate = result["created"] / elapsed if elapsed else 0
+        verb = "Would create" if options["dry_run"] else "Created"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {result['created']} users, skipped {result['skipped']}, "
+                f"queued {result['queued_emails']} emails in {elapsed:.1f}s ({rate:.0f} users/s)."
+            )
+        )
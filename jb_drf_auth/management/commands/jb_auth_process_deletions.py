@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.services.account_deletion import AccountDeletionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Soft delete the profiles, devices and OTP codes of deleted accounts, then hard delete "
+        "users, profiles, devices and OTP codes soft deleted more than --days ago. Works in "
+        "bounded batches with a pause between them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Retention before the hard purge.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--pause", type=float, default=0.1, help="Seconds to sleep between batches."
+        )
+        parser.add_argument("--skip-purge", action="store_true", help="Only cascade soft deletes.")
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the cascade checkpoint and walk every deleted account again.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else get_setting("DELETED_ACCOUNT_RETENTION_DAYS")
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be greater than zero.")
+        if days < 0:
+            raise CommandError("--days can not be negative.")
+        if options["pause"] < 0:
+            raise CommandError("--pause can not be negative.")
+
+        dry_run = options["dry_run"]
+        cascaded = AccountDeletionService.cascade(
+            batch_size=batch_size,
+            pause=options["pause"],
+            restart=options["restart"],
+            dry_run=dry_run,
+        )
+        verb = "Would soft delete" if dry_run else "Soft deleted"
+        self.stdout.write(f"{verb} {self._summary(cascaded)}.")
+        if options["skip_purge"]:
+            return
+
+        def progress(label, last_pk, purged):
+            self.stdout.write(f"  {label}: {purged} purged (last pk {last_pk})")
+
+        purged = AccountDeletionService.purge(
+            timezone.now() - timedelta(days=days),
+            batch_size=batch_size,
+            pause=options["pause"],
+            dry_run=dry_run,
+            on_progress=progress if options["verbosity"] > 1 else None,
+        )
+        verb = "Would purge" if dry_run else "Purged"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {self._summary(purged)}."))
+
+    @staticmethod
+    def _summary(counts):
+        return ", ".join(f"{label}: {count}" for label, count in counts.items()) or "nothing"
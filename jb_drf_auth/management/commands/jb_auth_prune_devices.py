@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.services.devices import DeviceService
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove devices not seen for --days and keep one device per notification token. "
+        "Works in primary-key batches with a pause between them so it can run at peak hours."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause", type=float, default=0.1, help="Seconds to sleep between batches."
+        )
+        parser.add_argument(
+            "--hard", action="store_true", help="Delete rows instead of soft deleting them."
+        )
+        parser.add_argument("--skip-dedupe", action="store_true")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else get_setting("DEVICE_STALE_DAYS")
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be greater than zero.")
+        if days < 1:
+            raise CommandError("--days must be greater than zero.")
+        if options["pause"] < 0:
+            raise CommandError("--pause can not be negative.")
+
+        batch_options = {
+            "hard": options["hard"],
+            "batch_size": batch_size,
+            "pause": options["pause"],
+            "dry_run": options["dry_run"],
+        }
+        stale = DeviceService.prune_stale(timezone.now() - timedelta(days=days), **batch_options)
+        duplicated = 0
+        if not options["skip_dedupe"]:
+            duplicated = DeviceService.dedupe_notification_tokens(**batch_options)
+
+        prefix = "Would remove" if options["dry_run"] else "Removed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix} {stale} stale devices and {duplicated} duplicated notification tokens."
+            )
+        )
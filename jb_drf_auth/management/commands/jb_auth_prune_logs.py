@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.services.delivery_logs import DeliveryLogService
+from jb_drf_auth.utils import get_delivery_stat_model_cls, get_email_log_model_cls, get_sms_log_model_cls
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll up SMS and email logs into daily counts (JB_DRF_AUTH_DELIVERY_STAT_MODEL) and "
+        "delete log rows older than the retention settings, in primary-key batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email-days", type=int, default=None)
+        parser.add_argument("--sms-days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause", type=float, default=0.1, help="Seconds to sleep between batches."
+        )
+        parser.add_argument("--skip-rollup", action="store_true")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be greater than zero.")
+        if options["pause"] < 0:
+            raise CommandError("--pause can not be negative.")
+
+        try:
+            stat_model = None if options["skip_rollup"] else get_delivery_stat_model_cls()
+        except RuntimeError:
+            stat_model = None
+            self.stderr.write("JB_DRF_AUTH_DELIVERY_STAT_MODEL is not set; skipping the daily rollup.")
+
+        channels = (
+            ("email", get_email_log_model_cls, options["email_days"], "EMAIL_LOG_RETENTION_DAYS"),
+            ("sms", get_sms_log_model_cls, options["sms_days"], "SMS_LOG_RETENTION_DAYS"),
+        )
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        for channel, get_model, days, setting_name in channels:
+            try:
+                log_model = get_model()
+            except RuntimeError:
+                continue
+            days = days if days is not None else get_setting(setting_name)
+            if days < 1:
+                raise CommandError(f"--{channel}-days must be greater than zero.")
+
+            buckets = 0
+            if stat_model is not None and not options["dry_run"]:
+                buckets = DeliveryLogService.rollup(channel, log_model, stat_model)
+            removed = DeliveryLogService.prune(
+                log_model,
+                timezone.now() - timedelta(days=days),
+                batch_size=options["batch_size"],
+                pause=options["pause"],
+                dry_run=options["dry_run"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{channel}: {verb} {removed} logs older than {days} days, {buckets} daily buckets updated."
+                )
+            )
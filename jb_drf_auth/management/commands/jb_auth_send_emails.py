@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jb_drf_auth.services.email_outbox import EmailOutboxService
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver emails queued in JB_DRF_AUTH_EMAIL_OUTBOX_MODEL. Safe to run from several "
+        "workers on databases with SELECT ... FOR UPDATE SKIP LOCKED."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many emails.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be greater than zero.")
+        if options["limit"] is not None and options["limit"] < 1:
+            raise CommandError("--limit must be greater than zero.")
+
+        try:
+            result = EmailOutboxService.deliver(batch_size=options["batch_size"], limit=options["limit"])
+        except RuntimeError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(f"Emails sent: {result['sent']}, failed: {result['failed']}."))
@@ -1,8 +1,11 @@
 from .base import (
     AbstractProfileOwnedModel,
     AbstractPersonCore,
+    AbstractJbDeliveryStat,
     AbstractJbDevice,
+    AbstractJbDuplicateCandidate,
     AbstractJbEmailLog,
+    AbstractJbEmailOutbox,
     AbstractJbOtpCode,
     AbstractJbPersonDataModel,
     AbstractJbProfile,
@@ -20,8 +23,11 @@ __all__ = [
     "AbstractJbUser",
     "AbstractJbProfile",
     "AbstractJbPersonDataModel",
+    "AbstractJbDeliveryStat",
     "AbstractJbDevice",
+    "AbstractJbDuplicateCandidate",
     "AbstractJbEmailLog",
+    "AbstractJbEmailOutbox",
     "AbstractJbOtpCode",
     "AbstractJbSmsLog",
     "AbstractJbSocialAccount",
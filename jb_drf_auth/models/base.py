@@ -2,13 +2,15 @@ import logging
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db import models, router, transaction
 from django.utils.translation import gettext_lazy as _
 
 from safedelete.models import SafeDeleteModel, SOFT_DELETE
 
 from jb_drf_auth.conf import get_setting
 from jb_drf_auth.managers import UserManager
+from jb_drf_auth.revocation import bump_user_token_version
 
 logger = logging.getLogger("jb_drf_auth.models.base")
 
@@ -158,6 +160,17 @@ class AbstractJbUser(AbstractSafeDeleteModel, AbstractTimeStampedModel, Abstract
         null=True,
     )
     settings = models.JSONField(default=dict, blank=True)
+    # Denormalized pointer kept in sync by AbstractJbProfile.save().
+    default_profile = models.ForeignKey(
+        get_setting("PROFILE_MODEL") or "authentication.Profile",
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    # Turning any of these off revokes the tokens already issued to the user.
+    TOKEN_REVOKING_FIELDS = ("is_active", "is_verified", "deleted")
 
     class Meta:
         abstract = True
@@ -165,34 +178,153 @@ class AbstractJbUser(AbstractSafeDeleteModel, AbstractTimeStampedModel, Abstract
     def __str__(self):
         return f"{self.email}-{self.username}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.TOKEN_REVOKING_FIELDS
+        }
+        return instance
+
+    def _lost_access(self, update_fields=None):
+        loaded = getattr(self, "_loaded_values", None)
+        if not loaded or self._state.adding:
+            return False
+        for name in ("is_active", "is_verified"):
+            if name in loaded and (update_fields is None or name in update_fields):
+                if loaded[name] and not getattr(self, name):
+                    return True
+        if "deleted" in loaded and (update_fields is None or "deleted" in update_fields):
+            return loaded["deleted"] is None and getattr(self, "deleted", None) is not None
+        return False
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        lost_access = self._lost_access(update_fields)
+        super().save(*args, **kwargs)
+        if lost_access:
+            user_id = self.pk
+            transaction.on_commit(
+                lambda: bump_user_token_version(user_id),
+                using=kwargs.get("using") or router.db_for_write(type(self), instance=self),
+            )
+        loaded = getattr(self, "_loaded_values", None) or {}
+        for name in self.TOKEN_REVOKING_FIELDS:
+            if name not in self.get_deferred_fields() and (update_fields is None or name in update_fields):
+                loaded[name] = getattr(self, name, None)
+        self._loaded_values = loaded
+
+    def _request_cache(self):
+        # Identity map living on the instance, i.e. for the lifetime of a request.
+        cache = self.__dict__.get("_jb_request_cache")
+        if cache is None:
+            cache = self.__dict__["_jb_request_cache"] = {}
+        return cache
+
+    def clear_request_cache(self, *keys):
+        """
+        Drops memoized default/active profile and settings (all of them if no keys are given).
+        """
+        cache = self._request_cache()
+        if not keys:
+            cache.clear()
+        for key in keys:
+            cache.pop(key, None)
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.clear_request_cache()
+        return super().refresh_from_db(*args, **kwargs)
+
     def get_default_profile(self):
         """
-        Returns the default profile for this user.
+        Returns the default profile for this user, memoized on the instance.
+        Uses the default_profile pointer (no query when loaded with select_related)
+        and falls back to a lookup for rows that were not backfilled yet.
         """
-        return self.profiles.filter(is_default=True).first()
+        cache = self._request_cache()
+        if "default_profile" not in cache:
+            cache["default_profile"] = self._resolve_default_profile()
+        return cache["default_profile"]
 
-    def _user_settings(self):
+    def _resolve_default_profile(self):
+        if self.default_profile_id is not None:
+            try:
+                profile = self.default_profile
+            except ObjectDoesNotExist:
+                profile = None
+            if profile is not None and profile.is_default and getattr(profile, "deleted", None) is None:
+                return profile
+
+        profile = self.profiles.filter(is_default=True).first()
+        if profile is not None:
+            self.default_profile = profile
+        return profile
+
+    def _remember_default_profile(self, profile):
+        cache = self._request_cache()
+        if profile is not None:
+            cache["default_profile"] = profile
+        elif "default_profile" in cache:
+            del cache["default_profile"]
+
+    def get_active_profile(self, profile_id):
+        """
+        Returns the user's profile selected by the token, memoized on the instance.
+        """
+        cache = self._request_cache()
+        for key in ("active_profile", "default_profile"):
+            profile = cache.get(key)
+            if profile is not None and str(profile.pk) == str(profile_id):
+                cache["active_profile"] = profile
+                return profile
+
+        profile = self.profiles.filter(pk=profile_id).first()
+        if profile is not None:
+            self.set_active_profile(profile)
+        return profile
+
+    def set_active_profile(self, profile):
+        cache = self._request_cache()
+        cache["active_profile"] = profile
+        if profile is not None and profile.is_default:
+            cache.setdefault("default_profile", profile)
+
+    def get_settings(self):
+        """
+        Returns user.settings as a dict, memoized until the field is reassigned.
+        """
+        cache = self._request_cache()
+        cached = cache.get("settings")
+        if cached is None or cached[0] is not self.settings:
+            cached = cache["settings"] = (self.settings, self._load_settings())
+        return cached[1]
+
+    def _load_settings(self):
         return self.settings if isinstance(self.settings, dict) else {}
 
     @property
     def language(self):
-        return self._user_settings().get("language") or settings.LANGUAGE_CODE
+        return self.get_settings().get("language") or settings.LANGUAGE_CODE
 
     @language.setter
     def language(self, value):
-        payload = self._user_settings()
+        payload = self.get_settings()
         payload["language"] = value
         self.settings = payload
+        self.clear_request_cache("settings")
 
     @property
     def timezone(self):
-        return self._user_settings().get("timezone") or settings.TIME_ZONE
+        return self.get_settings().get("timezone") or settings.TIME_ZONE
 
     @timezone.setter
     def timezone(self, value):
-        payload = self._user_settings()
+        payload = self.get_settings()
         payload["timezone"] = value
         self.settings = payload
+        self.clear_request_cache("settings")
 
 
 class AbstractJbProfile(AbstractSafeDeleteModel, AbstractTimeStampedModel, AbstractJbPersonDataModel):
@@ -201,6 +333,7 @@ class AbstractJbProfile(AbstractSafeDeleteModel, AbstractTimeStampedModel, Abstr
     NOTE: A User has MANY profiles.
     """
     ROLE_CHOICES = get_setting("PROFILE_ROLE_CHOICES")
+    TRACKED_FIELDS = ("picture", "is_default", "deleted")
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -233,6 +366,13 @@ class AbstractJbProfile(AbstractSafeDeleteModel, AbstractTimeStampedModel, Abstr
         indexes = [
             models.Index(fields=["user", "is_active"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(is_default=True, deleted__isnull=True),
+                name="%(app_label)s_%(class)s_one_default_per_user",
+            ),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -250,16 +390,94 @@ class AbstractJbProfile(AbstractSafeDeleteModel, AbstractTimeStampedModel, Abstr
     def full_name(self):
         return self._join_non_empty([self.first_name, self.last_name_1, self.last_name_2])
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember loaded values so save() can detect changes without a SELECT.
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if name in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def _refresh_tracked_values(self, update_fields=None):
+        deferred = self.get_deferred_fields()
+        saved = {
+            name: self._tracked_value(name)
+            for name in self.TRACKED_FIELDS
+            if name not in deferred and (update_fields is None or name in update_fields)
+        }
+        self._loaded_values = {**(getattr(self, "_loaded_values", None) or {}), **saved}
+
+    def _tracked_value(self, name):
+        value = getattr(self, name)
+        if name == "picture":
+            return value.name if value else None
+        return value
+
+    def _sync_user_default_profile(self, is_default, using):
+        cached_user = self._state.fields_cache.get("user")
+        if cached_user is not None and hasattr(cached_user, "_remember_default_profile"):
+            cached_user._remember_default_profile(self if is_default else None)
+
+        user_model = self._meta.get_field("user").related_model
+        try:
+            user_model._meta.get_field("default_profile")
+        except FieldDoesNotExist:
+            return
+
+        users = user_model._base_manager.using(using).filter(pk=self.user_id)
+        if is_default:
+            users.update(default_profile=self.pk)
+        else:
+            users.filter(default_profile=self.pk).update(default_profile=None)
+
+        if cached_user is None:
+            return
+        if is_default:
+            cached_user.default_profile = self
+        elif cached_user.default_profile_id == self.pk:
+            cached_user.default_profile = None
+
     def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        loaded = getattr(self, "_loaded_values", None)
+        adding = self._state.adding or not self.pk
+
         old_picture_name = None
-        if self.pk:
-            old_picture_name = (
-                type(self).objects.filter(pk=self.pk).values_list("picture", flat=True).first()
-            )
+        if not adding and (update_fields is None or "picture" in update_fields):
+            if loaded is not None and "picture" in loaded:
+                old_picture_name = loaded["picture"]
+            else:
+                old_picture_name = (
+                    type(self).objects.filter(pk=self.pk).values_list("picture", flat=True).first()
+                )
 
-        if self.is_default:
-            self.__class__.objects.filter(user=self.user, is_default=True).update(is_default=False)
-        super().save(*args, **kwargs)
+        is_default = bool(self.is_default) and getattr(self, "deleted", None) is None
+        if adding:
+            was_default = False
+        elif loaded is None or "is_default" not in loaded:
+            # Unknown previous state: sync the pointer either way.
+            was_default = not is_default
+        else:
+            was_default = bool(loaded["is_default"]) and loaded.get("deleted") is None
+        default_changed = is_default != was_default and (
+            update_fields is None or {"is_default", "deleted"} & set(update_fields)
+        )
+
+        if not default_changed:
+            super().save(*args, **kwargs)
+        else:
+            using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+            with transaction.atomic(using=using):
+                if is_default:
+                    others = self.__class__._base_manager.using(using).filter(
+                        user_id=self.user_id, is_default=True
+                    )
+                    if self.pk:
+                        others = others.exclude(pk=self.pk)
+                    others.update(is_default=False)
+                super().save(*args, **kwargs)
+                self._sync_user_default_profile(is_default, using)
 
         new_picture_name = self.picture.name if self.picture else None
         if old_picture_name and old_picture_name != new_picture_name:
@@ -271,6 +489,7 @@ class AbstractJbProfile(AbstractSafeDeleteModel, AbstractTimeStampedModel, Abstr
                     getattr(self, "pk", None),
                     old_picture_name,
                 )
+        self._refresh_tracked_values(update_fields)
 
 
 class AbstractJbDevice(AbstractSafeDeleteModel, AbstractTimeStampedModel):
@@ -281,16 +500,30 @@ class AbstractJbDevice(AbstractSafeDeleteModel, AbstractTimeStampedModel):
     )
     platform = models.CharField(max_length=250, null=True, blank=True)
     name = models.CharField(max_length=250, null=True, blank=True)
-    token = models.CharField(max_length=250, null=True, blank=True)
-    notification_token = models.CharField(max_length=500, null=True, blank=True)
+    token = models.CharField(max_length=250, null=True, blank=True, db_index=True)
+    notification_token = models.CharField(max_length=500, null=True, blank=True, db_index=True)
     linked_at = models.DateTimeField(
         "linked at",
         help_text="Date time on which the device was linked to profile.",
         auto_now_add=True,
     )
+    last_seen_at = models.DateTimeField(
+        "last seen at",
+        help_text="Last login or /me/ call from the device (written at most once per interval).",
+        null=True,
+        blank=True,
+        db_index=True,
+    )
 
     class Meta:
         abstract = True
+        constraints = [
+            # Tokenless devices (token NULL) are not covered; they are matched by notification_token.
+            models.UniqueConstraint(
+                fields=["user", "token"],
+                name="%(app_label)s_%(class)s_unique_user_token",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.platform} {self.name}".strip()
@@ -339,13 +572,22 @@ class AbstractJbSmsLog(AbstractTimeStampedModel):
     )
 
     phone = models.CharField(max_length=30)
-    message = models.TextField()
+    # Empty unless DELIVERY_LOG_BODY_MODE = "full" (OTP messages contain the code).
+    message = models.TextField(blank=True, default="")
     provider = models.CharField(max_length=255)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
     error_message = models.TextField(blank=True, null=True)
+    template_name = models.CharField(max_length=100, blank=True, null=True)
+    context_digest = models.CharField(max_length=64, blank=True, null=True)
+    body_compressed = models.BinaryField(blank=True, null=True)
 
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=["created"]),
+            models.Index(fields=["status", "created"]),
+            models.Index(fields=["phone", "created"]),
+        ]
 
 
 class AbstractJbEmailLog(AbstractTimeStampedModel):
@@ -356,15 +598,82 @@ class AbstractJbEmailLog(AbstractTimeStampedModel):
 
     to_email = models.EmailField()
     subject = models.CharField(max_length=255)
-    text_body = models.TextField()
+    # Bodies are kept only with DELIVERY_LOG_BODY_MODE = "full"; see body_compressed.
+    text_body = models.TextField(blank=True, default="")
     html_body = models.TextField(blank=True, null=True)
     provider = models.CharField(max_length=255)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
     error_message = models.TextField(blank=True, null=True)
     template_name = models.CharField(max_length=100, blank=True, null=True)
+    context_digest = models.CharField(max_length=64, blank=True, null=True)
+    body_compressed = models.BinaryField(blank=True, null=True)
 
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=["created"]),
+            models.Index(fields=["status", "created"]),
+            models.Index(fields=["to_email", "created"]),
+        ]
+
+
+class AbstractJbDeliveryStat(models.Model):
+    """
+    Daily SMS/email counts per provider, template and status, filled by
+    `jb_auth_prune_logs` so dashboards don't count the raw logs.
+    """
+
+    CHANNEL_CHOICES = (
+        ("email", "Email"),
+        ("sms", "SMS"),
+    )
+
+    day = models.DateField()
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    provider = models.CharField(max_length=255)
+    template_name = models.CharField(max_length=100, blank=True, default="")
+    status = models.CharField(max_length=10)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "channel", "provider", "template_name", "status"],
+                name="%(app_label)s_%(class)s_unique_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.channel} {self.template_name or '-'} {self.status}: {self.count}"
+
+
+class AbstractJbEmailOutbox(AbstractTimeStampedModel):
+    """
+    Email queued for later delivery (e.g. confirmation emails of bulk imports).
+    Rendered from `template_name` and `context` when `jb_auth_send_emails` delivers it.
+    Confirmation emails only store `{"user_id": ...}`; their link is built at delivery.
+    """
+
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    )
+
+    to_email = models.EmailField()
+    template_name = models.CharField(max_length=100)
+    context = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    error_message = models.TextField(blank=True, null=True)
+
+    class Meta:
+        abstract = True
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
 
 
 class AbstractJbSocialAccount(AbstractTimeStampedModel):
@@ -379,8 +688,17 @@ class AbstractJbSocialAccount(AbstractTimeStampedModel):
     email_verified = models.BooleanField(default=False)
     picture_url = models.URLField(max_length=1000, blank=True, null=True)
     raw_response = models.JSONField(default=dict, blank=True)
+    # sha256 of raw_response without per-token claims; unchanged logins skip the rewrite.
+    raw_response_sha256 = models.CharField(max_length=64, blank=True, null=True)
     last_login_at = models.DateTimeField(blank=True, null=True)
 
+    # Last provider picture copied into the profile, used to skip unchanged downloads.
+    picture_synced_url = models.URLField(max_length=1000, blank=True, null=True)
+    picture_synced_at = models.DateTimeField(blank=True, null=True)
+    picture_etag = models.CharField(max_length=255, blank=True, null=True)
+    picture_last_modified = models.CharField(max_length=64, blank=True, null=True)
+    picture_sha256 = models.CharField(max_length=64, blank=True, null=True)
+
     class Meta:
         abstract = True
         unique_together = (
@@ -391,3 +709,42 @@ class AbstractJbSocialAccount(AbstractTimeStampedModel):
             models.Index(fields=["provider", "provider_user_id"]),
             models.Index(fields=["email"]),
         ]
+
+
+class AbstractJbDuplicateCandidate(AbstractTimeStampedModel):
+    """
+    Group of person records that share a blocking key, written by
+    `jb_auth_find_duplicates` for manual review.
+    """
+
+    KEY_CHOICES = (
+        ("phone", "Phone"),
+        ("email", "Email"),
+        ("national_id", "National ID"),
+        ("name_birthday", "Name and birthday"),
+    )
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("merged", "Merged"),
+        ("dismissed", "Dismissed"),
+    )
+
+    model_label = models.CharField(max_length=100)
+    key_type = models.CharField(max_length=20, choices=KEY_CHOICES)
+    key_value = models.CharField(max_length=255)
+    record_ids = models.JSONField(default=list)
+    record_count = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending", db_index=True)
+    reviewed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model_label", "key_type", "key_value"],
+                name="%(app_label)s_%(class)s_unique_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} {self.key_type}={self.key_value} ({self.record_count})"
@@ -0,0 +1,134 @@
+"""Keyset (cursor) pagination."""
+
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a unique composite ordering, e.g. ("-linked_at", "-id").
+
+    The cursor holds the ordering values of the last row of the page, and the next
+    page is selected with a row comparison on every ordering field. Each page is a
+    single query with no COUNT and no OFFSET, so its cost does not grow with the
+    page number. The last ordering field must be unique (normally the primary key).
+    """
+
+    ordering = ("-id",)
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = _("Cursor invalido.")
+
+    def get_ordering(self, view):
+        return tuple(getattr(view, "keyset_ordering", None) or self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def _field(opts, name):
+        try:
+            return opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def encode_cursor(self, values):
+        values = [
+            value if value is None or isinstance(value, (bool, int, float)) else str(value)
+            for value in values
+        ]
+        raw = json.dumps(values, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, queryset, ordering, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            raw_values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if not isinstance(raw_values, list) or len(raw_values) != len(ordering):
+                raise ValueError(cursor)
+            opts = queryset.model._meta
+            values = []
+            for field, value in zip(ordering, raw_values):
+                model_field = self._field(opts, field.lstrip("-"))
+                if model_field is not None:
+                    value = model_field.to_python(value)
+                elif not isinstance(value, (int, float)) or isinstance(value, bool):
+                    raise ValueError(cursor)
+                values.append(value)
+            return values
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _after(ordering, values):
+        # (a, b) after (x, y)  ==  a > x OR (a = x AND b > y), honouring each direction.
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {
+                previous.lstrip("-"): value for previous, value in zip(ordering[:index], values[:index])
+            }
+            clauses.append(Q(**equal, **{f"{name}__{lookup}": values[index]}))
+        return reduce(or_, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering_fields = self.get_ordering(view)
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering_fields)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            values = self.decode_cursor(queryset, self.ordering_fields, cursor)
+            queryset = queryset.filter(self._after(self.ordering_fields, values))
+
+        rows = list(queryset[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        page = rows[:page_size]
+        self.next_cursor = None
+        if self.has_next:
+            last = page[-1]
+            opts = queryset.model._meta
+            values = []
+            for field in self.ordering_fields:
+                name = field.lstrip("-")
+                model_field = self._field(opts, name)
+                values.append(getattr(last, model_field.attname if model_field is not None else name))
+            self.next_cursor = self.encode_cursor(values)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
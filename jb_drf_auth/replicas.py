@@ -0,0 +1,108 @@
+"""
+Read replica scopes (used with `jb_drf_auth.routers.ReadReplicaRouter`).
+
+Reads only go to a JB_DRF_AUTH_READ_REPLICAS alias inside `use_read_replica()`, and only
+while the current request has not written anything. Every write also marks its user as
+sticky for REPLICA_STICKY_SECONDS in the default cache, so that user's next requests read
+from the primary until the replicas caught up.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+
+from jb_drf_auth.conf import get_setting
+
+
+STICKY_KEY_PREFIX = "jb_drf_auth:replica_sticky:"
+
+
+class _ReplicaState:
+    def __init__(self):
+        self.replica_reads = False
+        self.pinned = False
+        self.user_id = None
+        self.sticky_user_ids = set()
+
+
+_state = ContextVar("jb_drf_auth_replica_state", default=None)
+
+
+def _current_state():
+    state = _state.get()
+    if state is None:
+        state = _ReplicaState()
+        _state.set(state)
+    return state
+
+
+def reset_replica_state(**kwargs):
+    """Start a new request: forget the previous pin (connected to request_started/finished)."""
+    _state.set(None)
+
+
+request_started.connect(reset_replica_state, dispatch_uid="jb_drf_auth.replicas.request_started")
+request_finished.connect(reset_replica_state, dispatch_uid="jb_drf_auth.replicas.request_finished")
+
+
+def get_read_replicas():
+    return tuple(get_setting("READ_REPLICAS") or ())
+
+
+def _sticky_key(user_id):
+    return f"{STICKY_KEY_PREFIX}{user_id}"
+
+
+@contextmanager
+def use_read_replica(user=None):
+    """
+    Let the reads of the block (or decorated function) use a replica.
+
+    Pass the user the data belongs to, so a user who wrote recently keeps reading
+    from the primary.
+    """
+    if not get_read_replicas():
+        yield
+        return
+    state = _current_state()
+    previous = (state.replica_reads, state.user_id)
+    state.replica_reads = True
+    user_id = getattr(user, "pk", None)
+    if user_id is not None:
+        state.user_id = user_id
+        if not state.pinned and cache.get(_sticky_key(user_id)):
+            state.pinned = True
+    try:
+        yield
+    finally:
+        state.replica_reads, state.user_id = previous
+
+
+def replica_for_read():
+    """Replica alias for the next read, or None for the primary."""
+    state = _state.get()
+    if state is None or not state.replica_reads or state.pinned:
+        return None
+    replicas = get_read_replicas()
+    return random.choice(replicas) if replicas else None
+
+
+def record_write(instance=None):
+    """Pin the current request to the primary and mark the written user as sticky."""
+    if not get_read_replicas():
+        return
+    state = _current_state()
+    state.pinned = True
+    if instance is not None and isinstance(instance, get_user_model()):
+        user_id = instance.pk
+    else:
+        user_id = getattr(instance, "user_id", None) or state.user_id
+    sticky_seconds = get_setting("REPLICA_STICKY_SECONDS")
+    if user_id is None or not sticky_seconds or user_id in state.sticky_user_ids:
+        return
+    cache.set(_sticky_key(user_id), 1, sticky_seconds)
+    state.sticky_user_ids.add(user_id)
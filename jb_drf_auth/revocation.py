@@ -0,0 +1,325 @@
+"""Token revocation state shared by every worker through the Django cache."""
+
+import hashlib
+import logging
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from rest_framework_simplejwt.settings import api_settings
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.tokens import DEVICE_CLAIM, FAMILY_CLAIM, TOKEN_VERSION_CLAIM
+
+logger = logging.getLogger("jb_drf_auth.revocation")
+
+USER_VERSION_KEY = "jb_drf_auth:token_version:{user_id}"
+REFRESH_USED_KEY = "jb_drf_auth:refresh_used:{jti}"
+DENYLIST_KEY = "jb_drf_auth:denylist:{entry}"
+LOG_SEQUENCE_KEY = "jb_drf_auth:revocation_log:seq"
+LOG_ENTRY_KEY = "jb_drf_auth:revocation_log:{seq}"
+LOG_SYNC_BATCH_SIZE = 500
+
+
+def get_token_cache():
+    return caches[get_setting("TOKEN_CACHE_ALIAS") or "default"]
+
+
+def _refresh_lifetime_seconds():
+    return int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+
+def _device_digest(device_token):
+    return hashlib.sha256(str(device_token).encode("utf-8")).hexdigest()[:32]
+
+
+def _jti_entry(jti):
+    return f"jti:{jti}"
+
+
+def _family_entry(family):
+    return f"fam:{family}"
+
+
+def _device_entry(user_id, device_token):
+    return f"dev:{user_id}:{_device_digest(device_token)}"
+
+
+def _user_entry(user_id):
+    return f"user:{user_id}"
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter. `might_contain` never returns False for an added item.
+    """
+
+    def __init__(self, size_bits, hash_count):
+        self.size_bits = max(int(size_bits), 8)
+        self.hash_count = max(int(hash_count), 1)
+        self.bits = bytearray((self.size_bits + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return ((first + index * second) % self.size_bits for index in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationFilter:
+    """
+    In-process view of the revocation log. Every revocation is appended to a numbered
+    log in the token cache; each worker replays new log entries into its Bloom filter
+    at most every REVOCATION_FILTER_SYNC_SECONDS. Entries that are not in the filter
+    are known not to be revoked, so those checks need no cache round trip.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self):
+        self.bloom = BloomFilter(
+            get_setting("REVOCATION_FILTER_SIZE_BITS"), get_setting("REVOCATION_FILTER_HASHES")
+        )
+        self.entries = {}
+        self.cursor = 0
+        self.synced_at = None
+
+    def might_contain(self, entry):
+        return self.bloom.might_contain(entry)
+
+    def sync(self, force=False):
+        interval = float(get_setting("REVOCATION_FILTER_SYNC_SECONDS"))
+        if not force and self.synced_at is not None and time.monotonic() - self.synced_at < interval:
+            return
+        with self._lock:
+            if not force and self.synced_at is not None and time.monotonic() - self.synced_at < interval:
+                return
+            self._sync_locked()
+
+    def _sync_locked(self):
+        cache = get_token_cache()
+        sequence = int(cache.get(LOG_SEQUENCE_KEY) or 0)
+        if sequence < self.cursor:
+            # The cache was flushed; rebuild from whatever the log still holds.
+            self._reset_state()
+
+        now = time.time()
+        expired = [entry for entry, expires_at in self.entries.items() if expires_at <= now]
+        if expired:
+            for entry in expired:
+                del self.entries[entry]
+            self.bloom = BloomFilter(self.bloom.size_bits, self.bloom.hash_count)
+            for entry in self.entries:
+                self.bloom.add(entry)
+
+        for start in range(self.cursor + 1, sequence + 1, LOG_SYNC_BATCH_SIZE):
+            stop = min(start + LOG_SYNC_BATCH_SIZE, sequence + 1)
+            keys = [LOG_ENTRY_KEY.format(seq=seq) for seq in range(start, stop)]
+            for value in cache.get_many(keys).values():
+                entry, expires_at = value
+                if expires_at > now:
+                    self.entries[entry] = expires_at
+                    self.bloom.add(entry)
+
+        self.cursor = max(self.cursor, sequence)
+        self.synced_at = time.monotonic()
+
+
+_filter = None
+
+
+def get_revocation_filter():
+    global _filter
+    if not get_setting("REVOCATION_FILTER_ENABLED"):
+        return None
+    if _filter is None:
+        _filter = RevocationFilter()
+    return _filter
+
+
+def reset_revocation_filter():
+    global _filter
+    _filter = None
+
+
+def _on_setting_changed(setting, **kwargs):
+    if setting.startswith("JB_DRF_AUTH"):
+        reset_revocation_filter()
+
+
+setting_changed.connect(_on_setting_changed)
+
+
+def _append_to_log(cache, entries, timeout):
+    count = len(entries)
+    try:
+        last = cache.incr(LOG_SEQUENCE_KEY, count)
+    except ValueError:
+        if cache.add(LOG_SEQUENCE_KEY, count, timeout=None):
+            last = count
+        else:
+            last = cache.incr(LOG_SEQUENCE_KEY, count)
+    expires_at = time.time() + timeout
+    cache.set_many(
+        {
+            LOG_ENTRY_KEY.format(seq=last - count + 1 + index): (entry, expires_at)
+            for index, entry in enumerate(entries)
+        },
+        timeout=timeout,
+    )
+
+
+def _deny(entries, timeout):
+    """
+    Add denylist entries that expire after `timeout` seconds. The stored value is the
+    revocation time in whole seconds, like `iat`: device tokens issued in an earlier
+    second are rejected, so a device can sign in again right away. Costs a constant
+    number of cache round trips however many entries are added.
+    """
+    if not entries:
+        return
+    timeout = max(int(timeout), 1)
+    cache = get_token_cache()
+    revoked_at = int(time.time())
+    cache.set_many({DENYLIST_KEY.format(entry=entry): revoked_at for entry in entries}, timeout=timeout)
+    _append_to_log(cache, entries, timeout)
+
+
+def get_user_token_version(user_id):
+    """
+    Current revocation version for a user. Tokens minted with a lower version are rejected.
+    """
+    return int(get_token_cache().get(USER_VERSION_KEY.format(user_id=user_id)) or 0)
+
+
+def bump_user_token_version(user_id):
+    """
+    Revoke every token already issued to the user. Returns the new version.
+    """
+    cache = get_token_cache()
+    key = USER_VERSION_KEY.format(user_id=user_id)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=None):
+            version = 1
+        else:
+            version = cache.incr(key)
+    _append_to_log(cache, [_user_entry(user_id)], _refresh_lifetime_seconds())
+    logger.info("token_version_bumped user_id=%s version=%s", user_id, version)
+    return version
+
+
+def consume_refresh_token(jti, timeout):
+    """
+    Mark a refresh token as used. Returns False when it had already been used,
+    which means the token was replayed. `cache.add` is atomic, so exactly one of
+    several concurrent callers wins.
+    """
+    return get_token_cache().add(REFRESH_USED_KEY.format(jti=jti), 1, timeout=max(int(timeout), 1))
+
+
+def revoke_token(payload):
+    """
+    Deny a single token (by `jti`) until it expires.
+    """
+    timeout = int(payload.get("exp", 0)) - int(time.time())
+    if timeout > 0:
+        _deny([_jti_entry(payload[api_settings.JTI_CLAIM])], timeout)
+
+
+def revoke_token_family(family, timeout=None):
+    """
+    Revoke every refresh token descending from the same login, and the access
+    tokens minted from them.
+    """
+    _deny([_family_entry(family)], timeout or _refresh_lifetime_seconds())
+    logger.warning("token_family_revoked family=%s", family)
+
+
+def revoke_device(user_id, device_token):
+    """
+    Revoke every token issued to a user on a device before now.
+    """
+    revoke_devices(user_id, [device_token])
+
+
+def revoke_devices(user_id, device_tokens):
+    """
+    Revoke every token issued to a user on any of the given devices before now.
+    """
+    revoked = revoke_device_pairs((user_id, token) for token in device_tokens)
+    if revoked:
+        logger.info("device_tokens_revoked user_id=%s devices=%s", user_id, revoked)
+
+
+def revoke_device_pairs(pairs):
+    """
+    Revoke every token issued before now on each `(user_id, device_token)` device, in a
+    constant number of cache round trips. Returns the number of devices revoked.
+    """
+    entries = [_device_entry(user_id, token) for user_id, token in pairs if token]
+    _deny(entries, _refresh_lifetime_seconds())
+    return len(entries)
+
+
+def _token_entries(payload):
+    entries = []
+    if payload.get(api_settings.JTI_CLAIM):
+        entries.append(_jti_entry(payload[api_settings.JTI_CLAIM]))
+    if payload.get(FAMILY_CLAIM):
+        entries.append(_family_entry(payload[FAMILY_CLAIM]))
+    if payload.get(DEVICE_CLAIM):
+        entries.append(_device_entry(payload[api_settings.USER_ID_CLAIM], payload[DEVICE_CLAIM]))
+    return entries
+
+
+def is_token_revoked(payload, use_filter=True):
+    """
+    True when the token was revoked by jti, family, device or user token version.
+    Everything is read in one cache round trip; with the revocation filter enabled,
+    tokens the filter has never seen are accepted without touching the cache.
+    """
+    user_id = payload.get(api_settings.USER_ID_CLAIM)
+    entries = _token_entries(payload)
+    check_version = user_id is not None
+
+    revocation_filter = get_revocation_filter() if use_filter else None
+    if revocation_filter is not None:
+        revocation_filter.sync()
+        check_version = check_version and revocation_filter.might_contain(_user_entry(user_id))
+        entries = [entry for entry in entries if revocation_filter.might_contain(entry)]
+        if not entries and not check_version:
+            return False
+
+    keys = {DENYLIST_KEY.format(entry=entry): entry for entry in entries}
+    version_key = USER_VERSION_KEY.format(user_id=user_id)
+    if check_version:
+        keys[version_key] = None
+    found = get_token_cache().get_many(list(keys))
+
+    if check_version and int(payload.get(TOKEN_VERSION_CLAIM) or 0) < int(found.get(version_key) or 0):
+        return True
+
+    issued_at = int(payload.get("iat") or 0)
+    for key, entry in keys.items():
+        if entry is None or key not in found:
+            continue
+        # No token of a revoked family is minted afterwards; devices sign in again.
+        if entry.startswith(("jti:", "fam:")) or issued_at < found[key]:
+            return True
+    return False
+
+
+def is_token_family_revoked(family):
+    return get_token_cache().get(DENYLIST_KEY.format(entry=_family_entry(family))) is not None
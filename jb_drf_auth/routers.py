@@ -0,0 +1,84 @@
+"""
+Opt-in database routers.
+
+    DATABASE_ROUTERS = [
+        "jb_drf_auth.routers.AuthLogRouter",
+        "jb_drf_auth.routers.ReadReplicaRouter",
+    ]
+    JB_DRF_AUTH_LOG_DATABASE = "auth_logs"
+    JB_DRF_AUTH_READ_REPLICAS = ("replica",)
+
+AuthLogRouter reads, writes and migrates OTP codes, SMS/email logs, daily delivery stats
+and the email outbox on the LOG_DATABASE alias. ReadReplicaRouter sends the reads of
+`jb_drf_auth.replicas.use_read_replica()` blocks to READ_REPLICAS. Models they do not
+handle are left to the next router.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+
+from jb_drf_auth import replicas
+from jb_drf_auth.conf import get_setting
+
+
+class AuthLogRouter:
+    def _alias(self):
+        return get_setting("LOG_DATABASE")
+
+    def _routed_labels(self):
+        labels = set()
+        for setting_name in get_setting("LOG_DATABASE_MODELS") or ():
+            model_path = get_setting(setting_name)
+            if model_path:
+                labels.add(model_path.lower())
+        return labels
+
+    def _is_routed(self, model):
+        return model._meta.label_lower in self._routed_labels()
+
+    def db_for_read(self, model, **hints):
+        alias = self._alias()
+        if alias and self._is_routed(model):
+            return alias
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        alias = self._alias()
+        if alias and self._is_routed(type(obj1)) != self._is_routed(type(obj2)):
+            return False
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        alias = self._alias()
+        if not alias:
+            return None
+        if model_name is not None and f"{app_label}.{model_name}" in self._routed_labels():
+            return db == alias
+        if db == alias:
+            return False
+        return None
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return replicas.replica_for_read()
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get("instance")
+        replicas.record_write(instance)
+        # Rows read from a replica are saved on the primary.
+        if instance is not None and instance._state.db in replicas.get_read_replicas():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replicas.get_read_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas.get_read_replicas():
+            return False
+        return None
@@ -1,4 +1,9 @@
-from jb_drf_auth.serializers.device import DevicePayloadSerializer, DeviceSerializer
+from jb_drf_auth.serializers.device import (
+    DevicePayloadSerializer,
+    DeviceRevokeSerializer,
+    DeviceSerializer,
+    SignOutOtherDevicesSerializer,
+)
 from jb_drf_auth.serializers.email_confirmation import (
     EmailConfirmationSerializer,
     ResendConfirmationEmailSerializer,
@@ -10,20 +15,25 @@ from jb_drf_auth.serializers.password_reset import (
     PasswordResetConfirmSerializer,
     PasswordResetRequestSerializer,
 )
+from jb_drf_auth.serializers.person_search import get_person_search_serializer
 from jb_drf_auth.serializers.profile import ProfilePictureUpdateSerializer, ProfileSerializer
 from jb_drf_auth.serializers.register import RegisterSerializer
+from jb_drf_auth.serializers.sessions import LogoutSerializer
 from jb_drf_auth.serializers.social_auth import (
     SocialLinkSerializer,
     SocialLoginSerializer,
     SocialUnlinkSerializer,
 )
+from jb_drf_auth.serializers.tokens import TokenRefreshSerializer
 from jb_drf_auth.serializers.user import UserSerializer
 from jb_drf_auth.serializers.user_admin import UserAdminCreateSerializer
 from jb_drf_auth.serializers.user_update import UserUpdateSerializer
 
 __all__ = [
     "DevicePayloadSerializer",
+    "DeviceRevokeSerializer",
     "DeviceSerializer",
+    "SignOutOtherDevicesSerializer",
     "EmailConfirmationSerializer",
     "ResendConfirmationEmailSerializer",
     "BasicLoginSerializer",
@@ -33,12 +43,15 @@ __all__ = [
     "PasswordChangeSerializer",
     "PasswordResetConfirmSerializer",
     "PasswordResetRequestSerializer",
+    "get_person_search_serializer",
     "ProfileSerializer",
     "ProfilePictureUpdateSerializer",
     "RegisterSerializer",
+    "LogoutSerializer",
     "SocialLoginSerializer",
     "SocialLinkSerializer",
     "SocialUnlinkSerializer",
+    "TokenRefreshSerializer",
     "UserSerializer",
     "UserUpdateSerializer",
     "UserAdminCreateSerializer",
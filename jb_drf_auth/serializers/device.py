@@ -12,6 +12,16 @@ class DevicePayloadSerializer(serializers.Serializer):
     notification_token = serializers.CharField(required=False, allow_blank=True, allow_null=True)
 
 
+class DeviceRevokeSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500
+    )
+
+
+class SignOutOtherDevicesSerializer(serializers.Serializer):
+    device_token = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
 def _safe_exclude_fields(model, fields):
     model_fields = {field.name for field in model._meta.get_fields()}
     return tuple(field for field in fields if field in model_fields)
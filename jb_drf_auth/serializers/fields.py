@@ -0,0 +1,70 @@
+"""Custom serializer fields."""
+
+from django.core.files.uploadedfile import UploadedFile
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.image_utils import (
+    ImageDimensionsError,
+    ImageTooLargeError,
+    UnsupportedImageError,
+    decode_base64_to_file,
+    inspect_image,
+)
+
+
+class ProfilePictureField(serializers.ImageField):
+    """
+    Image field that accepts a multipart upload or a base64 string (plain or data URI).
+    Base64 payloads are decoded in chunks into a temporary file, and the size and
+    dimension limits are enforced before any pixel data is decoded.
+    """
+
+    EMPTY_VALUES = (None, "", [], (), {})
+
+    default_error_messages = {
+        **serializers.ImageField.default_error_messages,
+        "too_large": _("La imagen excede el tamano maximo permitido."),
+        "too_many_pixels": _("La imagen excede las dimensiones maximas permitidas."),
+        "invalid_image": _("El archivo no es una imagen valida."),
+        "invalid_type": _("Tipo de archivo no valido."),
+    }
+
+    def to_internal_value(self, data):
+        if data in self.EMPTY_VALUES:
+            if not self.allow_null:
+                self.fail("required")
+            return None
+
+        max_bytes = int(get_setting("PROFILE_PICTURE_MAX_UPLOAD_BYTES"))
+        max_pixels = int(get_setting("PROFILE_PICTURE_MAX_UPLOAD_PIXELS"))
+
+        if isinstance(data, str):
+            try:
+                upload = decode_base64_to_file(data, max_bytes=max_bytes)
+            except ImageTooLargeError:
+                self.fail("too_large")
+            except ValueError:
+                self.fail("invalid_image")
+            rename = True
+        elif isinstance(data, UploadedFile):
+            if data.size is not None and data.size > max_bytes:
+                self.fail("too_large")
+            upload = data
+            rename = False
+        else:
+            self.fail("invalid")
+
+        try:
+            extension, _width, _height = inspect_image(upload, max_pixels=max_pixels)
+        except ImageDimensionsError:
+            self.fail("too_many_pixels")
+        except UnsupportedImageError:
+            self.fail("invalid_type")
+        except ValueError:
+            self.fail("invalid_image")
+
+        if rename:
+            upload.name = f"{upload.name.rsplit('.', 1)[0]}.{extension}"
+        return upload
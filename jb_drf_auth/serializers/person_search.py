@@ -0,0 +1,26 @@
+"""Person search serializers."""
+
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from jb_drf_auth.services.person_search import IDENTIFIER_FIELDS, NAME_FIELDS
+
+RESULT_FIELDS = ("id", "user", *NAME_FIELDS, "birthday", *IDENTIFIER_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def get_person_search_serializer(model):
+    """Read-only result serializer limited to the lookup columns the model has."""
+    concrete = {field.name for field in model._meta.concrete_fields}
+    result_fields = [name for name in RESULT_FIELDS if name in concrete]
+
+    class PersonSearchResultSerializer(serializers.ModelSerializer):
+        rank = serializers.FloatField(read_only=True)
+
+        class Meta:
+            fields = [*result_fields, "rank"]
+            read_only_fields = result_fields
+
+    PersonSearchResultSerializer.Meta.model = model
+    return PersonSearchResultSerializer
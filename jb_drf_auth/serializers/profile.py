@@ -1,20 +1,33 @@
 """Profile serializers."""
 
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
+from rest_framework.utils import model_meta
+from rest_framework.utils.field_mapping import get_nested_relation_kwargs
 from django.utils.translation import gettext_lazy as _
 
 from jb_drf_auth.image_utils import optimize_profile_picture
+from jb_drf_auth.serializers.fields import ProfilePictureField
 from jb_drf_auth.utils import get_profile_model_cls
 
 
+NESTED_EXCLUDED_FIELDS = ("password", "deleted", "deleted_by_cascade")
+
+
 def _safe_exclude_fields(model, fields):
     model_fields = {field.name for field in model._meta.get_fields()}
     return tuple(field for field in fields if field in model_fields)
 
 
 class ProfileSerializer(serializers.ModelSerializer):
-    picture = Base64ImageField(required=False, allow_null=True)
+    """
+    Profile serializer configured per instance.
+
+    ``fields`` limits the output to a sparse fieldset and ``expand`` renders the named
+    relations as nested objects. Both are constructor arguments, so ``Meta`` is never
+    mutated and concurrent requests can not see each other's configuration.
+    """
+
+    picture = ProfilePictureField(required=False, allow_null=True)
 
     class Meta:
         model = get_profile_model_cls()
@@ -23,6 +36,66 @@ class ProfileSerializer(serializers.ModelSerializer):
             ("deleted", "deleted_by_cascade", "user"),
         )
 
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self.requested_fields = tuple(fields) if fields else None
+        self.expand = tuple(expand or ())
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.requested_fields is not None:
+            fields = {name: field for name, field in fields.items() if name in self.requested_fields}
+        if self.expand:
+            relations = model_meta.get_field_info(self.Meta.model).relations
+            for name in self.expand:
+                if name in fields and name in relations:
+                    field_class, field_kwargs = self.build_nested_field(name, relations[name], 1)
+                    fields[name] = field_class(**field_kwargs)
+        return fields
+
+    def build_nested_field(self, field_name, relation_info, nested_depth):
+        # Unlike DRF's depth-based nesting, expanded relations only render their own
+        # columns: no many-to-many (one query per row) and no secrets or soft-delete flags.
+        related_model = relation_info.related_model
+        nested_fields = [
+            field.name
+            for field in related_model._meta.concrete_fields
+            if field.name not in NESTED_EXCLUDED_FIELDS
+        ]
+
+        class NestedSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = related_model
+                fields = nested_fields
+
+        return NestedSerializer, get_nested_relation_kwargs(relation_info)
+
+    def get_expandable_fields(self):
+        relations = model_meta.get_field_info(self.Meta.model).relations
+        return [name for name in super().get_fields() if name in relations]
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, expand=None, required=()):
+        """
+        Select only the columns needed for ``fields`` (plus ``required``) and load the
+        ``expand`` relations in the same query (forward) or one prefetch (many-to-many).
+        """
+        model = queryset.model
+        relations = model_meta.get_field_info(model).relations
+        expand = [name for name in expand or () if name in relations and (not fields or name in fields)]
+        joined = [name for name in expand if not relations[name].to_many]
+        prefetched = [name for name in expand if relations[name].to_many]
+        if joined:
+            queryset = queryset.select_related(*joined)
+        if prefetched:
+            queryset = queryset.prefetch_related(*prefetched)
+        if fields:
+            concrete = {field.name for field in model._meta.concrete_fields}
+            columns = {model._meta.pk.name, *required, *joined}
+            columns.update(name for name in fields if name in concrete)
+            queryset = queryset.only(*columns)
+        return queryset
+
     def create(self, validated_data):
         user = self.context["request"].user
         if not user.is_authenticated:
@@ -45,7 +118,7 @@ class ProfileSerializer(serializers.ModelSerializer):
 
 class ProfilePictureUpdateSerializer(serializers.Serializer):
     profile = serializers.IntegerField(required=False)
-    picture = Base64ImageField(required=True, allow_null=False)
+    picture = ProfilePictureField(required=True, allow_null=False)
 
     def _resolve_profile(self):
         request = self.context["request"]
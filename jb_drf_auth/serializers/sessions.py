@@ -0,0 +1,5 @@
+from rest_framework import serializers
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False, allow_blank=True)
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from jb_drf_auth.services.tokens import TokensService
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+    access = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        return TokensService.refresh_tokens(attrs["refresh"])
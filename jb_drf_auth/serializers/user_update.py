@@ -20,6 +20,8 @@ class UserUpdateSerializer(serializers.ModelSerializer):
     def validate_email(self, value):
         user_model = self.Meta.model
         instance = self.instance
+        # On the primary: the save below does not map a unique conflict a lagging
+        # replica would let through.
         if value and user_model.objects.filter(email=value).exclude(pk=instance.pk).exists():
             raise serializers.ValidationError(_("Ya existe un usuario con este correo."))
         return value
@@ -1,27 +1,47 @@
 from jb_drf_auth.conf import get_setting
+from jb_drf_auth.services.account_deletion import AccountDeletionService
 from jb_drf_auth.services.client import ClientService
+from jb_drf_auth.services.delivery_logs import DeliveryLogService
+from jb_drf_auth.services.devices import DeviceService
+from jb_drf_auth.services.duplicates import DuplicateDetectionService
 from jb_drf_auth.services.email_confirmation import EmailConfirmationService
+from jb_drf_auth.services.email_outbox import EmailOutboxService
 from jb_drf_auth.services.login import LoginService
+from jb_drf_auth.services.login_activity import LoginActivityService
 from jb_drf_auth.services.me import MeService
 from jb_drf_auth.services.otp import OtpService
 from jb_drf_auth.services.password_reset import PasswordResetService
+from jb_drf_auth.services.person_search import PersonSearchService
 from jb_drf_auth.services.register import RegisterService
+from jb_drf_auth.services.sessions import SessionService
 from jb_drf_auth.services.social_auth import SocialAuthService
 from jb_drf_auth.services.tokens import TokensService
+from jb_drf_auth.services.user_export import UserExportService
+from jb_drf_auth.services.user_import import UserImportService
 from jb_drf_auth.services.user_settings import UserSettingsService
 
 CLIENT_CHOICES = get_setting("CLIENT_CHOICES")
 
 __all__ = [
     "CLIENT_CHOICES",
+    "AccountDeletionService",
     "ClientService",
+    "DeliveryLogService",
+    "DeviceService",
+    "DuplicateDetectionService",
     "EmailConfirmationService",
+    "EmailOutboxService",
+    "LoginActivityService",
     "LoginService",
     "MeService",
     "OtpService",
     "PasswordResetService",
+    "PersonSearchService",
     "RegisterService",
+    "SessionService",
     "SocialAuthService",
     "TokensService",
+    "UserExportService",
+    "UserImportService",
     "UserSettingsService",
 ]
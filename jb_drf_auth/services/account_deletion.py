@@ -0,0 +1,171 @@
+import logging
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import ProtectedError, Q
+from django.utils import timezone
+from safedelete.models import SOFT_DELETE, is_safedelete_cls
+
+from jb_drf_auth.utils import get_device_model_cls, get_otp_model_cls, get_profile_model_cls
+
+
+logger = logging.getLogger("jb_drf_auth.account_deletion")
+
+CASCADE_CHECKPOINT_KEY = "jb_drf_auth:deletion_cascade_checkpoint"
+
+
+def _has_field(model, name):
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class AccountDeletionService:
+    """
+    Account deletion in three steps:
+
+    1. `mark_deleted` soft deletes the user row only, so the request returns right away
+       (tokens are revoked by the user save hook).
+    2. `cascade` soft deletes what the user owns (profiles, devices, OTP codes and any
+       soft-delete model with a CASCADE foreign key to them) in bounded batches.
+    3. `purge` hard deletes soft-deleted rows older than the retention cutoff.
+    """
+
+    @staticmethod
+    def mark_deleted(user):
+        user.is_active = False
+        user.delete(force_policy=SOFT_DELETE, update_fields=["deleted", "is_active", "modified"])
+        logger.info("account_marked_deleted user_id=%s", user.pk)
+
+    @staticmethod
+    def cascade_relations(model=None, prefix="", seen=None):
+        """
+        Return `(model, lookup)` pairs for soft-delete models reachable from the user model
+        through CASCADE foreign keys, e.g. `(Profile, "user")`, `(Note, "profile__user")`.
+        """
+        model = model or get_user_model()
+        seen = seen if seen is not None else {model}
+        relations = []
+        for relation in model._meta.related_objects:
+            related_model = relation.related_model
+            if (
+                relation.many_to_many
+                or relation.on_delete is not models.CASCADE
+                or related_model in seen
+                or not is_safedelete_cls(related_model)
+            ):
+                continue
+            seen.add(related_model)
+            lookup = f"{relation.field.name}__{prefix}" if prefix else relation.field.name
+            relations.append((related_model, lookup))
+            relations.extend(AccountDeletionService.cascade_relations(related_model, lookup, seen))
+        return relations
+
+    @staticmethod
+    def cascade(batch_size=500, pause=0.0, restart=False, dry_run=False):
+        """
+        Soft delete the live records of deleted users, one batch of users at a time.
+
+        Users are walked in `(deleted, pk)` order from the checkpoint stored in the default
+        cache, so each run only looks at accounts deleted since the previous one. Records
+        get `deleted_by_cascade` so `user.undelete()` restores them.
+        """
+        user_model = get_user_model()
+        relations = AccountDeletionService.cascade_relations(user_model)
+        checkpoint = None if restart else cache.get(CASCADE_CHECKPOINT_KEY)
+        deleted_users = user_model._base_manager.filter(deleted__isnull=False).order_by("deleted", "pk")
+        counts = {related_model._meta.label: 0 for related_model, _lookup in relations}
+
+        while True:
+            page = deleted_users
+            if checkpoint is not None:
+                last_deleted, last_pk = checkpoint
+                page = page.filter(Q(deleted__gt=last_deleted) | Q(deleted=last_deleted, pk__gt=last_pk))
+            rows = list(page.values_list("pk", "deleted")[:batch_size])
+            if not rows:
+                break
+            user_ids = [pk for pk, _deleted in rows]
+            now = timezone.now()
+            for related_model, lookup in relations:
+                live = related_model._base_manager.filter(
+                    **{f"{lookup}__in": user_ids}, deleted__isnull=True
+                )
+                if dry_run:
+                    counts[related_model._meta.label] += live.count()
+                    continue
+                values = {"deleted": now}
+                if _has_field(related_model, "deleted_by_cascade"):
+                    values["deleted_by_cascade"] = True
+                counts[related_model._meta.label] += live.update(**values)
+
+            checkpoint = (rows[-1][1], rows[-1][0])
+            if not dry_run:
+                cache.set(CASCADE_CHECKPOINT_KEY, checkpoint, None)
+            if pause:
+                time.sleep(pause)
+
+        logger.info("deletion_cascade counts=%s dry_run=%s", counts, dry_run)
+        return counts
+
+    @staticmethod
+    def purge_models():
+        """Models purged by `purge`, owned records first."""
+        purge = []
+        for getter in (get_otp_model_cls, get_device_model_cls, get_profile_model_cls):
+            try:
+                purge.append(getter())
+            except RuntimeError:
+                continue
+        purge.append(get_user_model())
+        return purge
+
+    @staticmethod
+    def purge(cutoff, batch_size=500, pause=0.0, dry_run=False, on_progress=None):
+        """
+        Hard delete records soft deleted before `cutoff`, `batch_size` primary keys per
+        DELETE. `on_progress(label, last_pk, purged)` is called after every batch; rows
+        protected by other foreign keys are skipped and logged.
+        """
+        counts = {}
+        for model in AccountDeletionService.purge_models():
+            label = model._meta.label
+            expired = model._base_manager.filter(deleted__lt=cutoff).order_by("pk")
+            purged = 0
+            last_pk = None
+            while True:
+                page = expired if last_pk is None else expired.filter(pk__gt=last_pk)
+                pks = list(page.values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    break
+                last_pk = pks[-1]
+                if dry_run:
+                    purged += len(pks)
+                else:
+                    purged += AccountDeletionService._hard_delete(model, pks)
+                if on_progress is not None:
+                    on_progress(label, last_pk, purged)
+                if pause:
+                    time.sleep(pause)
+            counts[label] = purged
+        logger.info("deleted_records_purged cutoff=%s counts=%s dry_run=%s", cutoff.isoformat(), counts, dry_run)
+        return counts
+
+    @staticmethod
+    def _hard_delete(model, pks):
+        manager = model._base_manager
+        label = model._meta.label
+        try:
+            return manager.filter(pk__in=pks).delete()[1].get(label, 0)
+        except ProtectedError:
+            purged = 0
+            for pk in pks:
+                try:
+                    purged += manager.filter(pk=pk).delete()[1].get(label, 0)
+                except ProtectedError:
+                    logger.warning("purge_skipped_protected model=%s pk=%s", label, pk)
+            return purged
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.utils.translation import gettext as _
 
+from jb_drf_auth.services.devices import DeviceService
 from jb_drf_auth.services.me import MeService
 from jb_drf_auth.utils import get_device_model_cls
 
@@ -27,25 +28,7 @@ class ClientService:
                     {"device": _("notification_token es requerido para cliente movil.")}
                 )
 
-            token = device_data.get("token")
-            if token:
-                device_model.objects.update_or_create(
-                    user=user,
-                    token=token,
-                    defaults={
-                        "platform": device_data.get("platform", "Unknown Platform"),
-                        "name": device_data.get("name", "Unknown Device"),
-                        "notification_token": notification_token,
-                    },
-                )
-            else:
-                device_model.objects.create(
-                    user=user,
-                    platform=device_data.get("platform", "Unknown Platform"),
-                    name=device_data.get("name", "Unknown Device"),
-                    token=None,
-                    notification_token=notification_token,
-                )
+            DeviceService.register(user, device_data, device_model=device_model)
 
             response_data = MeService.get_me_mobile(user, profile, tokens)
             response_data["device_registered"] = True
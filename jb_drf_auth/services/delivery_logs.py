@@ -0,0 +1,188 @@
+import json
+import logging
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from jb_drf_auth.conf import get_setting
+
+
+logger = logging.getLogger("jb_drf_auth.delivery_logs")
+
+BODY_MODES = ("digest", "compressed", "full")
+DIGEST_SALT = "jb_drf_auth.delivery_logs.context"
+
+
+class DeliveryLogService:
+    """
+    Builds SmsLog/EmailLog rows and keeps the log tables small.
+
+    By default a log row keeps the recipient, subject, template name and an HMAC digest
+    of the render context (so a message can be matched without storing OTP codes or
+    reset links). DELIVERY_LOG_BODY_MODE = "compressed" also keeps the rendered bodies
+    zlib-compressed in `body_compressed`; "full" keeps the previous plain text columns.
+    """
+
+    @staticmethod
+    def body_mode():
+        mode = get_setting("DELIVERY_LOG_BODY_MODE")
+        if mode not in BODY_MODES:
+            raise RuntimeError(
+                "Invalid JB_DRF_AUTH_DELIVERY_LOG_BODY_MODE. Expected one of: " + ", ".join(BODY_MODES)
+            )
+        return mode
+
+    @staticmethod
+    def context_digest(context):
+        if context is None:
+            return None
+        payload = json.dumps(context, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+        return salted_hmac(DIGEST_SALT, payload, algorithm="sha256").hexdigest()
+
+    @staticmethod
+    def compress_body(body):
+        return zlib.compress(json.dumps(body, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def decompress_body(log):
+        """Return the bodies stored by the "compressed" mode, or None."""
+        if not log.body_compressed:
+            return None
+        return json.loads(zlib.decompress(bytes(log.body_compressed)).decode("utf-8"))
+
+    @staticmethod
+    def email_log_fields(
+        to_email,
+        subject,
+        text_body,
+        html_body,
+        status,
+        template_name=None,
+        context=None,
+        error_message=None,
+        provider=None,
+    ):
+        fields = {
+            "to_email": to_email,
+            "subject": subject[:255],
+            "provider": provider or get_setting("EMAIL_PROVIDER"),
+            "status": status,
+            "error_message": error_message,
+            "template_name": template_name,
+            "context_digest": DeliveryLogService.context_digest(context),
+        }
+        mode = DeliveryLogService.body_mode()
+        if mode == "full":
+            fields.update(text_body=text_body, html_body=html_body)
+        elif mode == "compressed" and (text_body or html_body):
+            fields["body_compressed"] = DeliveryLogService.compress_body({"text": text_body, "html": html_body})
+        return fields
+
+    @staticmethod
+    def sms_log_fields(phone, message, status, template_name=None, context=None, error_message=None, provider=None):
+        fields = {
+            "phone": phone,
+            "provider": provider or get_setting("SMS_PROVIDER"),
+            "status": status,
+            "error_message": error_message,
+            "template_name": template_name,
+            "context_digest": DeliveryLogService.context_digest(context),
+        }
+        mode = DeliveryLogService.body_mode()
+        if mode == "full":
+            fields["message"] = message
+        elif mode == "compressed" and message:
+            fields["body_compressed"] = DeliveryLogService.compress_body({"text": message})
+        return fields
+
+    @staticmethod
+    def rollup(channel, log_model, stat_model, since=None):
+        """
+        Write per-day counts by provider, template and status for `channel` ("email" or
+        "sms"). Starts at `since`, or at the last day already rolled up (recomputed, it
+        may have been partial), and works one day window at a time up to today.
+        Returns the number of buckets written.
+        """
+        manager = log_model._base_manager
+        if since is None:
+            since = stat_model._default_manager.filter(channel=channel).aggregate(day=Max("day"))["day"]
+        if since is None:
+            first = manager.aggregate(created=Min("created"))["created"]
+            if first is None:
+                return 0
+            since = timezone.localdate(first)
+
+        connection = connections[router.db_for_write(stat_model)]
+        today = timezone.localdate()
+        written = 0
+        day = since
+        while day <= today:
+            start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+            rows = (
+                manager.filter(created__gte=start, created__lt=start + timedelta(days=1))
+                .values_list("provider", "template_name", "status")
+                .annotate(count=Count("pk"))
+                .order_by()
+            )
+            buckets = [
+                stat_model(
+                    day=day,
+                    channel=channel,
+                    provider=provider,
+                    template_name=template_name or "",
+                    status=status,
+                    count=count,
+                )
+                for provider, template_name, status, count in rows
+            ]
+            if buckets and connection.features.supports_update_conflicts_with_target:
+                stat_model._default_manager.bulk_create(
+                    buckets,
+                    update_conflicts=True,
+                    unique_fields=["day", "channel", "provider", "template_name", "status"],
+                    update_fields=["count"],
+                )
+            else:
+                for bucket in buckets:
+                    stat_model._default_manager.update_or_create(
+                        day=bucket.day,
+                        channel=bucket.channel,
+                        provider=bucket.provider,
+                        template_name=bucket.template_name,
+                        status=bucket.status,
+                        defaults={"count": bucket.count},
+                    )
+            written += len(buckets)
+            day += timedelta(days=1)
+        logger.info("delivery_logs_rolled_up channel=%s since=%s buckets=%s", channel, since, written)
+        return written
+
+    @staticmethod
+    def prune(log_model, cutoff, batch_size=1000, pause=0.0, dry_run=False):
+        """
+        Delete log rows created before `cutoff`, `batch_size` primary keys per DELETE,
+        sleeping `pause` seconds between batches.
+        """
+        manager = log_model._base_manager
+        expired = manager.filter(created__lt=cutoff).order_by("pk")
+        removed = 0
+        last_pk = None
+        while True:
+            page = expired if last_pk is None else expired.filter(pk__gt=last_pk)
+            pks = list(page.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            last_pk = pks[-1]
+            removed += len(pks) if dry_run else manager.filter(pk__in=pks).delete()[0]
+            if pause:
+                time.sleep(pause)
+        logger.info(
+            "delivery_logs_pruned model=%s count=%s dry_run=%s", log_model._meta.label, removed, dry_run
+        )
+        return removed
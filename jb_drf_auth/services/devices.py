@@ -0,0 +1,232 @@
+import hashlib
+import logging
+import time
+
+from django.db import connections, router
+from django.db.models import Count, Max, Min
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import NotFound
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.revocation import bump_user_token_version, get_token_cache, revoke_device_pairs, revoke_devices
+from jb_drf_auth.services.tokens import TokensService
+from jb_drf_auth.utils import get_device_model_cls
+
+
+logger = logging.getLogger("jb_drf_auth.devices")
+
+LAST_SEEN_KEY = "jb_drf_auth:device_seen:{user_id}:{device}"
+
+
+class DeviceService:
+    @staticmethod
+    def _field_names(device_model):
+        return {field.name for field in device_model._meta.get_fields()}
+
+    @staticmethod
+    def register(user, device_data, device_model=None):
+        """
+        Register (or refresh) the device a user logged in from.
+
+        Devices with a client token are upserted on (user, token) in a single
+        INSERT ... ON CONFLICT DO UPDATE. Devices without a token are matched by
+        notification_token so repeated logins do not add rows. A signed-out
+        (soft deleted) device is restored when it logs in again.
+        """
+        device_model = device_model or get_device_model_cls()
+        field_names = DeviceService._field_names(device_model)
+        values = {
+            "platform": device_data.get("platform", "Unknown Platform"),
+            "name": device_data.get("name", "Unknown Device"),
+            "notification_token": device_data.get("notification_token"),
+        }
+        if "deleted" in field_names:
+            values["deleted"] = None
+        if "last_seen_at" in field_names:
+            values["last_seen_at"] = timezone.now()
+
+        token = device_data.get("token")
+        if token:
+            DeviceService._upsert(device_model, user, token, values)
+        else:
+            DeviceService._register_tokenless(device_model, user, values)
+
+    @staticmethod
+    def _upsert(device_model, user, token, values):
+        connection = connections[router.db_for_write(device_model)]
+        features = connection.features
+        if not features.supports_update_conflicts:
+            device_model._base_manager.update_or_create(user=user, token=token, defaults=values)
+            return
+
+        options = {"update_conflicts": True, "update_fields": [*values, "modified"]}
+        if features.supports_update_conflicts_with_target:
+            options["unique_fields"] = ["user", "token"]
+        device_model._base_manager.bulk_create(
+            [device_model(user=user, token=token, **values)], **options
+        )
+
+    @staticmethod
+    def _register_tokenless(device_model, user, values):
+        updated = device_model._base_manager.filter(
+            user=user,
+            token__isnull=True,
+            notification_token=values["notification_token"],
+        ).update(modified=timezone.now(), **values)
+        if not updated:
+            device_model._base_manager.create(user=user, token=None, **values)
+
+    @staticmethod
+    def get_user_devices(user):
+        return get_device_model_cls().objects.filter(user_id=user.pk)
+
+    @staticmethod
+    def _soft_delete(devices):
+        # One UPDATE instead of a safedelete delete() (SELECT + UPDATE) per device.
+        values = {"deleted": timezone.now()}
+        if "deleted_by_cascade" in DeviceService._field_names(devices.model):
+            values["deleted_by_cascade"] = False
+        return devices.update(**values)
+
+    @staticmethod
+    def revoke(user, device_ids):
+        """
+        Sign devices of the user out: revoke the tokens issued to them and soft delete
+        them. Two queries whatever the number of devices. Returns how many were revoked.
+        """
+        devices = DeviceService.get_user_devices(user).filter(pk__in=list(device_ids))
+        device_tokens = list(devices.filter(token__isnull=False).values_list("token", flat=True))
+        revoked = DeviceService._soft_delete(devices)
+        revoke_devices(user.pk, device_tokens)
+        logger.info("devices_revoked user_id=%s count=%s", user.pk, revoked)
+        return revoked
+
+    @staticmethod
+    def revoke_one(user, device_id):
+        if not DeviceService.revoke(user, [device_id]):
+            raise NotFound(_("Dispositivo no encontrado."))
+
+    @staticmethod
+    def sign_out_other_devices(user, profile, device_token=None):
+        """
+        Sign out every session but the current one. All devices except `device_token`
+        are soft deleted in one UPDATE, every issued token is revoked and fresh tokens
+        are returned for the current session.
+        """
+        devices = DeviceService.get_user_devices(user)
+        if device_token:
+            devices = devices.exclude(token=device_token)
+        revoked = DeviceService._soft_delete(devices)
+        bump_user_token_version(user.pk)
+        logger.info("signed_out_other_devices user_id=%s count=%s", user.pk, revoked)
+
+        device_data = {"token": device_token} if device_token else None
+        return {
+            "revoked": revoked,
+            "tokens": TokensService.get_tokens_for_user(user, profile, device_data),
+        }
+
+    @staticmethod
+    def touch(user, device_token):
+        """
+        Record that a device is still in use. Writes are coalesced across workers:
+        at most one UPDATE per device every DEVICE_LAST_SEEN_INTERVAL_SECONDS.
+        Returns True when last_seen_at was written.
+        """
+        if not device_token:
+            return False
+        interval = int(get_setting("DEVICE_LAST_SEEN_INTERVAL_SECONDS") or 0)
+        if interval > 0:
+            digest = hashlib.sha256(str(device_token).encode("utf-8")).hexdigest()[:32]
+            if not get_token_cache().add(LAST_SEEN_KEY.format(user_id=user.pk, device=digest), 1, timeout=interval):
+                return False
+        DeviceService.get_user_devices(user).filter(token=device_token).update(
+            last_seen_at=timezone.now()
+        )
+        return True
+
+    @staticmethod
+    def _remove(queryset, hard):
+        if hard:
+            return queryset.delete()[0]
+        return DeviceService._soft_delete(queryset.filter(deleted__isnull=True))
+
+    @staticmethod
+    def prune_stale(cutoff, hard=False, batch_size=1000, pause=0.0, dry_run=False):
+        """
+        Remove devices not seen (last_seen_at, or linked_at if never seen) since `cutoff`.
+        Soft deletes by default; `hard` also purges rows that were already soft deleted.
+        Tokens issued to the removed devices are revoked, like a sign-out. Works through
+        primary-key windows of `batch_size`, sleeping `pause` seconds between windows to
+        bound the write rate.
+        """
+        device_model = get_device_model_cls()
+        manager = device_model._base_manager
+        bounds = manager.aggregate(low=Min("pk"), high=Max("pk"))
+        if bounds["low"] is None:
+            return 0
+
+        stale = manager.annotate(seen_at=Coalesce("last_seen_at", "linked_at")).filter(seen_at__lt=cutoff)
+        removed = 0
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            window = stale.filter(pk__gte=start, pk__lt=start + batch_size)
+            if dry_run:
+                removed += (window if hard else window.filter(deleted__isnull=True)).count()
+            else:
+                # Soft deleted rows were revoked when they were signed out.
+                live = list(window.filter(deleted__isnull=True).values_list("user_id", "token"))
+                removed += DeviceService._remove(manager.filter(pk__in=window.values("pk")), hard)
+                revoke_device_pairs(live)
+            if pause:
+                time.sleep(pause)
+        logger.info("devices_pruned count=%s hard=%s dry_run=%s", removed, hard, dry_run)
+        return removed
+
+    @staticmethod
+    def dedupe_notification_tokens(hard=False, batch_size=1000, pause=0.0, dry_run=False):
+        """
+        Keep a single live device per notification_token across all users: the one seen
+        most recently. Push tokens move between accounts when people sign in with another
+        user on the same phone, and only the newest registration receives notifications.
+        """
+        device_model = get_device_model_cls()
+        live = device_model.objects.filter(notification_token__isnull=False)
+        groups = (
+            live.values("notification_token")
+            .annotate(rows=Count("pk"))
+            .filter(rows__gt=1)
+            .order_by("notification_token")
+        )
+
+        removed = 0
+        last_token = None
+        while True:
+            page = groups if last_token is None else groups.filter(notification_token__gt=last_token)
+            push_tokens = [row["notification_token"] for row in page[:batch_size]]
+            if not push_tokens:
+                break
+            last_token = push_tokens[-1]
+
+            rows = (
+                live.filter(notification_token__in=push_tokens)
+                .annotate(seen_at=Coalesce("last_seen_at", "linked_at"))
+                .order_by("notification_token", "-seen_at", "-pk")
+                .values_list("pk", "notification_token")
+            )
+            kept, duplicates = set(), []
+            for pk, push_token in rows:
+                if push_token in kept:
+                    duplicates.append(pk)
+                else:
+                    kept.add(push_token)
+
+            if dry_run:
+                removed += len(duplicates)
+            else:
+                removed += DeviceService._remove(device_model._base_manager.filter(pk__in=duplicates), hard)
+            if pause:
+                time.sleep(pause)
+        logger.info("device_push_tokens_deduplicated count=%s hard=%s dry_run=%s", removed, hard, dry_run)
+        return removed
@@ -0,0 +1,225 @@
+import hashlib
+import logging
+import re
+import unicodedata
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, router
+from django.utils import timezone
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.utils import get_duplicate_candidate_model_cls, normalize_phone_number
+
+
+logger = logging.getLogger("jb_drf_auth.duplicates")
+
+# Candidate columns per blocking key, first one present on the model wins.
+KEY_SOURCES = {
+    "phone": (("mobile_phone",), ("user__phone",)),
+    "email": (("contact_email",), ("user__email",)),
+    "national_id": (("national_id",),),
+    "name_birthday": (("first_name", "last_name_1", "last_name_2", "birthday"),),
+}
+KEY_TYPES = tuple(KEY_SOURCES)
+_NON_DIGITS = re.compile(r"\D")
+
+
+def _resolve_path(model, path):
+    try:
+        for name in path.split("__"):
+            field = model._meta.get_field(name)
+            model = field.related_model or model
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def _plain_text(value):
+    value = unicodedata.normalize("NFKD", str(value))
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return " ".join(value.lower().split())
+
+
+def _phone_key(phone):
+    try:
+        return normalize_phone_number(phone)
+    except ValueError:
+        return None
+
+
+def _phone_key_builder():
+    # Settings are read once per pass; E.164 values (the stored format) skip
+    # normalize_phone_number, which reads them for every call.
+    min_length = get_setting("PHONE_MIN_LENGTH")
+    max_length = get_setting("PHONE_MAX_LENGTH")
+
+    def build(phone):
+        phone = phone.strip()
+        if phone.startswith("+"):
+            digits = _NON_DIGITS.sub("", phone)
+            return f"+{digits}" if min_length <= len(digits) <= max_length else None
+        return _phone_key(phone)
+
+    return build
+
+
+def _email_key(email):
+    email = email.strip().lower()
+    return email if "@" in email else None
+
+
+def _national_id_key(national_id):
+    return re.sub(r"[\s.\-]", "", national_id).upper() or None
+
+
+def _name_birthday_key(first_name, last_name_1, last_name_2, birthday):
+    if not (first_name and last_name_1 and birthday):
+        return None
+    names = " ".join(_plain_text(part) for part in (first_name, last_name_1, last_name_2) if part)
+    return f"{names}|{birthday.isoformat()}"
+
+
+def _key_builder(key_type):
+    if key_type == "phone":
+        return _phone_key_builder()
+    return {
+        "email": _email_key,
+        "national_id": _national_id_key,
+        "name_birthday": _name_birthday_key,
+    }[key_type]
+
+
+def _key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class DuplicateDetectionService:
+    """
+    Finds person records that share a blocking key without comparing pairs.
+
+    Each pass streams `(pk, columns)` in primary-key windows and hash-joins the
+    normalized keys in a dict of 64-bit digests, so memory holds one integer per
+    row. `partitions` splits the digest space into that many passes to bound
+    memory further (grace hash join). Colliding digests are re-checked against
+    the real keys before a group is reported.
+    """
+
+    @staticmethod
+    def available_key_types(model):
+        return [key_type for key_type in KEY_TYPES if DuplicateDetectionService.key_columns(model, key_type)]
+
+    @staticmethod
+    def key_columns(model, key_type):
+        for columns in KEY_SOURCES[key_type]:
+            if all(_resolve_path(model, column) for column in columns):
+                return columns
+        return None
+
+    @staticmethod
+    def _stream_keys(queryset, key_type, chunk_size, pks=None):
+        columns = DuplicateDetectionService.key_columns(queryset.model, key_type)
+        build = _key_builder(key_type)
+        if pks is not None:
+            pks = sorted(pks)
+            for start in range(0, len(pks), chunk_size):
+                rows = queryset.filter(pk__in=pks[start : start + chunk_size]).values_list("pk", *columns)
+                for pk, *values in rows:
+                    yield pk, DuplicateDetectionService._build_key(build, values)
+            return
+
+        last_pk = None
+        while True:
+            window = queryset.order_by("pk")
+            if last_pk is not None:
+                window = window.filter(pk__gt=last_pk)
+            rows = list(window.values_list("pk", *columns)[:chunk_size])
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+            for pk, *values in rows:
+                yield pk, DuplicateDetectionService._build_key(build, values)
+
+    @staticmethod
+    def _build_key(build, values):
+        if len(values) == 1:
+            return build(values[0]) if values[0] else None
+        return build(*values)
+
+    @staticmethod
+    def find_groups(queryset, key_type, chunk_size=10000, partitions=1):
+        """Yield `(key, [pk, ...])` for every key shared by more than one record."""
+        for partition in range(partitions):
+            first_pk_by_hash = {}
+            colliding = {}
+            for pk, key in DuplicateDetectionService._stream_keys(queryset, key_type, chunk_size):
+                if key is None:
+                    continue
+                digest = _key_hash(key)
+                if partitions > 1 and digest % partitions != partition:
+                    continue
+                first_pk = first_pk_by_hash.setdefault(digest, pk)
+                if first_pk != pk:
+                    colliding.setdefault(digest, [first_pk]).append(pk)
+            del first_pk_by_hash
+
+            candidate_pks = [pk for pks in colliding.values() for pk in pks]
+            del colliding
+            groups = {}
+            for pk, key in DuplicateDetectionService._stream_keys(
+                queryset, key_type, chunk_size, pks=candidate_pks
+            ):
+                if key is not None:
+                    groups.setdefault(key, []).append(pk)
+            for key, pks in groups.items():
+                if len(pks) > 1:
+                    yield key, sorted(pks)
+
+    @staticmethod
+    def save_candidates(model, key_type, groups, batch_size=1000):
+        """Upsert review rows; the review status of existing groups is kept."""
+        candidate_model = get_duplicate_candidate_model_cls()
+        connection = connections[router.db_for_write(candidate_model)]
+        label = model._meta.label_lower
+        now = timezone.now()
+        saved = 0
+        batch = []
+
+        def flush():
+            if not batch:
+                return 0
+            if connection.features.supports_update_conflicts_with_target:
+                candidate_model._default_manager.bulk_create(
+                    batch,
+                    update_conflicts=True,
+                    unique_fields=["model_label", "key_type", "key_value"],
+                    update_fields=["record_ids", "record_count", "modified"],
+                )
+            else:
+                for row in batch:
+                    candidate_model._default_manager.update_or_create(
+                        model_label=row.model_label,
+                        key_type=row.key_type,
+                        key_value=row.key_value,
+                        defaults={"record_ids": row.record_ids, "record_count": row.record_count},
+                    )
+            count = len(batch)
+            batch.clear()
+            return count
+
+        for key, pks in groups:
+            batch.append(
+                candidate_model(
+                    model_label=label,
+                    key_type=key_type,
+                    key_value=key[:255],
+                    record_ids=pks,
+                    record_count=len(pks),
+                    created=now,
+                    modified=now,
+                )
+            )
+            if len(batch) >= batch_size:
+                saved += flush()
+        saved += flush()
+        logger.info("duplicates_saved model=%s key_type=%s groups=%s", label, key_type, saved)
+        return saved
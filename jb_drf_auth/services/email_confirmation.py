@@ -5,24 +5,30 @@ from django.utils.translation import gettext as _
 from rest_framework import serializers
 
 from jb_drf_auth.conf import get_setting
-from jb_drf_auth.utils import get_email_log_model_cls, get_email_provider, render_email_template
+from jb_drf_auth.services.delivery_logs import DeliveryLogService
+from jb_drf_auth.utils import (
+    get_delivery_log_sink,
+    get_email_log_model_cls,
+    get_email_provider,
+    render_email_template,
+)
 
 
 class EmailConfirmationService:
     @staticmethod
-    def send_verification_email(user, raise_on_fail: bool = True) -> bool:
+    def build_verification_context(user) -> dict:
         uid = urlsafe_base64_encode(force_bytes(user.pk))
         token = default_token_generator.make_token(user)
         frontend_url = get_setting("FRONTEND_URL") or ""
-        verify_url = f"{frontend_url}/verify-email/?uid={uid}&token={token}"
+        return {
+            "user_email": user.email,
+            "verify_url": f"{frontend_url}/verify-email/?uid={uid}&token={token}",
+        }
 
-        subject, text_body, html_body = render_email_template(
-            "email_confirmation",
-            {
-                "user_email": user.email,
-                "verify_url": verify_url,
-            },
-        )
+    @staticmethod
+    def send_verification_email(user, raise_on_fail: bool = True) -> bool:
+        context = EmailConfirmationService.build_verification_context(user)
+        subject, text_body, html_body = render_email_template("email_confirmation", context)
 
         try:
             email_log_model = get_email_log_model_cls()
@@ -36,26 +42,32 @@ class EmailConfirmationService:
         provider = get_email_provider()
         try:
             provider.send_email(user.email, subject, text_body, html_body)
-            email_log_model.objects.create(
-                to_email=user.email,
-                subject=subject,
-                text_body=text_body,
-                html_body=html_body,
-                provider=get_setting("EMAIL_PROVIDER"),
-                status="sent",
-                template_name="email_confirmation",
+            get_delivery_log_sink().write(
+                email_log_model,
+                DeliveryLogService.email_log_fields(
+                    user.email,
+                    subject,
+                    text_body,
+                    html_body,
+                    status="sent",
+                    template_name="email_confirmation",
+                    context=context,
+                ),
             )
             return True
         except Exception as exc:
-            email_log_model.objects.create(
-                to_email=user.email,
-                subject=subject,
-                text_body=text_body,
-                html_body=html_body,
-                provider=get_setting("EMAIL_PROVIDER"),
-                status="failed",
-                error_message=str(exc),
-                template_name="email_confirmation",
+            get_delivery_log_sink().write(
+                email_log_model,
+                DeliveryLogService.email_log_fields(
+                    user.email,
+                    subject,
+                    text_body,
+                    html_body,
+                    status="failed",
+                    template_name="email_confirmation",
+                    context=context,
+                    error_message=str(exc),
+                ),
             )
             if raise_on_fail:
                 raise serializers.ValidationError(
@@ -0,0 +1,160 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.services.delivery_logs import DeliveryLogService
+from jb_drf_auth.services.email_confirmation import EmailConfirmationService
+from jb_drf_auth.utils import (
+    get_email_log_model_cls,
+    get_email_outbox_model_cls,
+    get_email_provider,
+    render_email_template,
+)
+
+
+logger = logging.getLogger("jb_drf_auth.email_outbox")
+
+# Templates with a one-time link: the outbox only stores {"user_id": ...} and the context
+# (with a fresh token) is built when the email is sent, so no live link sits in the table.
+USER_CONTEXT_BUILDERS = {
+    "email_confirmation": EmailConfirmationService.build_verification_context,
+}
+
+
+class EmailOutboxService:
+    @staticmethod
+    def enqueue(messages, batch_size=1000):
+        """
+        Queue `(to_email, template_name, context)` tuples with one INSERT per batch.
+        Returns the number of queued emails.
+        """
+        outbox_model = get_email_outbox_model_cls()
+        rows = [
+            outbox_model(to_email=to_email, template_name=template_name, context=context)
+            for to_email, template_name, context in messages
+        ]
+        outbox_model.objects.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+    @staticmethod
+    def enqueue_for_users(users, template_name, batch_size=1000):
+        """
+        Queue `template_name` (a key of USER_CONTEXT_BUILDERS) for each user. Only the
+        user id is stored; the context is built at delivery.
+        """
+        return EmailOutboxService.enqueue(
+            ((user.email, template_name, {"user_id": user.pk}) for user in users),
+            batch_size=batch_size,
+        )
+
+    @staticmethod
+    def _render_contexts(batch):
+        """Context to render each email of `batch` with, one user query per batch."""
+        user_ids = {
+            email.context.get("user_id")
+            for email in batch
+            if email.template_name in USER_CONTEXT_BUILDERS and isinstance(email.context, dict)
+        }
+        users = get_user_model()._base_manager.in_bulk(user_ids - {None}) if user_ids else {}
+        contexts = {}
+        for email in batch:
+            build = USER_CONTEXT_BUILDERS.get(email.template_name)
+            if build is None:
+                contexts[email.id] = email.context
+                continue
+            user = users.get((email.context or {}).get("user_id"))
+            # Missing users fail the email instead of sending a link to nobody.
+            contexts[email.id] = build(user) if user is not None else None
+        return contexts
+
+    @staticmethod
+    def deliver(batch_size=100, limit=None):
+        """
+        Send pending emails in id order and record them in the email log.
+
+        Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED where the database
+        supports it, so several workers can drain the outbox. A failed email stays
+        pending until EMAIL_OUTBOX_MAX_ATTEMPTS and is retried on the next run.
+        """
+        outbox_model = get_email_outbox_model_cls()
+        try:
+            email_log_model = get_email_log_model_cls()
+        except RuntimeError:
+            email_log_model = None
+        using = router.db_for_write(outbox_model)
+        skip_locked = connections[using].features.has_select_for_update_skip_locked
+        max_attempts = get_setting("EMAIL_OUTBOX_MAX_ATTEMPTS")
+        provider = get_email_provider()
+        provider_path = get_setting("EMAIL_PROVIDER")
+
+        result = {"sent": 0, "failed": 0}
+        last_id = 0
+        while limit is None or result["sent"] + result["failed"] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - result["sent"] - result["failed"])
+            logs = []
+            with transaction.atomic(using=using):
+                pending = outbox_model.objects.using(using).filter(status="pending", id__gt=last_id).order_by("id")
+                if skip_locked:
+                    pending = pending.select_for_update(skip_locked=True)
+                batch = list(pending[:size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                contexts = EmailOutboxService._render_contexts(batch)
+                now = timezone.now()
+                for email in batch:
+                    email.attempts += 1
+                    email.modified = now
+                    subject, text_body, html_body = "", "", None
+                    try:
+                        if contexts[email.id] is None:
+                            raise LookupError(f"user {email.context.get('user_id')} not found")
+                        subject, text_body, html_body = render_email_template(
+                            email.template_name, contexts[email.id]
+                        )
+                        provider.send_email(email.to_email, subject, text_body, html_body)
+                    except Exception as exc:
+                        email.error_message = str(exc)
+                        email.status = "failed" if email.attempts >= max_attempts else "pending"
+                        result["failed"] += 1
+                        status = "failed"
+                        logger.warning(
+                            "email_outbox_send_failed id=%s template=%s attempts=%s",
+                            email.id,
+                            email.template_name,
+                            email.attempts,
+                        )
+                    else:
+                        email.status = "sent"
+                        email.sent_at = now
+                        email.error_message = None
+                        result["sent"] += 1
+                        status = "sent"
+                    if email_log_model is not None:
+                        logs.append(
+                            email_log_model(
+                                **DeliveryLogService.email_log_fields(
+                                    email.to_email,
+                                    subject,
+                                    text_body,
+                                    html_body,
+                                    status=status,
+                                    template_name=email.template_name,
+                                    context=email.context,
+                                    error_message=email.error_message,
+                                    provider=provider_path,
+                                )
+                            )
+                        )
+
+                outbox_model.objects.using(using).bulk_update(
+                    batch, ["status", "attempts", "sent_at", "error_message", "modified"]
+                )
+            # After the claim commits: the log table may be routed to another database.
+            if logs:
+                email_log_model.objects.bulk_create(logs)
+        return result
@@ -12,6 +12,12 @@ CLIENT_CHOICES = get_setting("CLIENT_CHOICES")
 
 
 class LoginService:
+    @staticmethod
+    def _remember_active_profile(user, profile):
+        set_active_profile = getattr(user, "set_active_profile", None)
+        if callable(set_active_profile):
+            set_active_profile(profile)
+
     @staticmethod
     def basic_login(login, password, client, device_data):
         auth_backend = EmailOrUsernameModelBackend()
@@ -36,7 +42,8 @@ class LoginService:
             raise AuthenticationFailed(_("Esta cuenta esta eliminada."))
 
         profile = user.get_default_profile()
-        tokens = TokensService.get_tokens_for_user(user=user, profile=profile)
+        LoginService._remember_active_profile(user, profile)
+        tokens = TokensService.get_tokens_for_user(user=user, profile=profile, device_data=device_data)
         return ClientService.response_for_client(
             normalized_client, user, profile, tokens, device_data
         )
@@ -52,5 +59,6 @@ class LoginService:
         except user.profiles.model.DoesNotExist:
             raise NotFound(_("Perfil no encontrado o no pertenece al usuario."))
 
-        tokens = TokensService.get_tokens_for_user(user, profile)
+        LoginService._remember_active_profile(user, profile)
+        tokens = TokensService.get_tokens_for_user(user, profile, device_data)
         return ClientService.response_for_client(client, user, profile, tokens, device_data)
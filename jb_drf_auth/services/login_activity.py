@@ -0,0 +1,143 @@
+import atexit
+import logging
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.utils import get_social_account_model_cls
+
+
+logger = logging.getLogger("jb_drf_auth.login_activity")
+
+KEY_PREFIX = "jb_drf_auth:touch"
+SEQUENCE_KEY = f"{KEY_PREFIX}:sequence"
+FLUSHED_KEY = f"{KEY_PREFIX}:flushed"
+FLUSH_DUE_KEY = f"{KEY_PREFIX}:flush_due"
+LOCK_KEY = f"{KEY_PREFIX}:lock"
+GAP_KEY = f"{KEY_PREFIX}:gap"
+# Buffered timestamps survive many missed flushes before the cache drops them.
+ENTRY_TIMEOUT = 24 * 60 * 60
+TOUCH_FIELDS = {"social_account": "last_login_at"}
+
+_exit_flush_registered = False
+
+
+def _value_key(kind, pk):
+    return f"{KEY_PREFIX}:{kind}:{pk}"
+
+
+def _pending_key(kind, pk):
+    return f"{KEY_PREFIX}:pending:{kind}:{pk}"
+
+
+def _slot_key(slot):
+    return f"{KEY_PREFIX}:slot:{slot}"
+
+
+def _model(kind):
+    return {"social_account": get_social_account_model_cls}[kind]()
+
+
+def _flush_at_exit():
+    try:
+        LoginActivityService.flush()
+    except Exception:
+        logger.exception("login_activity_exit_flush_failed")
+
+
+class LoginActivityService:
+    """
+    Write-behind `SocialAccount.last_login_at`.
+
+    A social login only stores `last_login_at` in the default cache; repeated logins of
+    the same account before the next flush overwrite one entry. The flush never deletes
+    those entries (they expire on their own), so a login racing a flush is written by
+    that flush or by the next one. Every
+    LOGIN_TOUCH_FLUSH_SECONDS the next login flushes the buffer with one bulk UPDATE per
+    batch, and each process flushes again at exit. Set LOGIN_TOUCH_FLUSH_SECONDS = 0 to
+    write on every login. Timestamps still buffered when the cache is cleared are lost.
+    """
+
+    @staticmethod
+    def touch_social_account(social_account, when=None):
+        when = when or timezone.now()
+        social_account.last_login_at = when
+        LoginActivityService.touch("social_account", social_account.pk, when)
+
+    @staticmethod
+    def touch(kind, pk, when):
+        interval = int(get_setting("LOGIN_TOUCH_FLUSH_SECONDS") or 0)
+        if interval <= 0:
+            _model(kind)._base_manager.filter(pk=pk).update(**{TOUCH_FIELDS[kind]: when})
+            return
+
+        cache.set(_value_key(kind, pk), when, ENTRY_TIMEOUT)
+        if cache.add(_pending_key(kind, pk), 1, ENTRY_TIMEOUT):
+            # First touch since the last flush: index it for the next flush.
+            cache.add(SEQUENCE_KEY, 0, None)
+            cache.set(_slot_key(cache.incr(SEQUENCE_KEY)), (kind, pk), ENTRY_TIMEOUT)
+
+        global _exit_flush_registered
+        if not _exit_flush_registered:
+            atexit.register(_flush_at_exit)
+            _exit_flush_registered = True
+        if cache.add(FLUSH_DUE_KEY, 1, interval):
+            LoginActivityService.flush()
+
+    @staticmethod
+    def flush(batch_size=500):
+        """
+        Write buffered timestamps, `batch_size` rows per UPDATE. Only one process
+        flushes at a time. Returns the number of rows updated.
+        """
+        if not cache.add(LOCK_KEY, 1, 300):
+            return 0
+        written = 0
+        try:
+            end = cache.get(SEQUENCE_KEY) or 0
+            start = cache.get(FLUSHED_KEY) or 0
+            if start > end:
+                # The sequence was evicted and restarted.
+                start = 0
+            gap = cache.get(GAP_KEY)
+            for first in range(start + 1, end + 1, batch_size):
+                last = min(first + batch_size - 1, end)
+                slots = cache.get_many([_slot_key(slot) for slot in range(first, last + 1)])
+                stalled = False
+                for slot in range(first, last + 1):
+                    if _slot_key(slot) not in slots and slot != gap:
+                        # Numbered by a touch that has not stored its slot yet: stop before
+                        # it. Still missing on the next flush, it is skipped (evicted).
+                        cache.set(GAP_KEY, slot, ENTRY_TIMEOUT)
+                        last, stalled = slot - 1, True
+                        break
+                slot_keys = [_slot_key(slot) for slot in range(first, last + 1)]
+                targets = {_value_key(*slots[key]): slots[key] for key in slot_keys if key in slots}
+                # Clear the markers before reading: a login after this point indexes its
+                # account again, so a value stored after the read is not lost.
+                cache.delete_many([_pending_key(*target) for target in targets.values()])
+                values = cache.get_many(list(targets))
+                cache.delete_many(slot_keys)
+
+                rows = {}
+                for key, when in values.items():
+                    kind, pk = targets[key]
+                    if kind in TOUCH_FIELDS:
+                        rows.setdefault(kind, []).append((pk, when))
+                for kind, batch in rows.items():
+                    written += LoginActivityService._write(kind, batch)
+                cache.set(FLUSHED_KEY, last, None)
+                if stalled:
+                    break
+        finally:
+            cache.delete(LOCK_KEY)
+        if written:
+            logger.info("login_activity_flushed rows=%s", written)
+        return written
+
+    @staticmethod
+    def _write(kind, batch):
+        model = _model(kind)
+        field = TOUCH_FIELDS[kind]
+        return model._base_manager.bulk_update([model(pk=pk, **{field: when}) for pk, when in batch], [field])
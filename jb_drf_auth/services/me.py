@@ -3,8 +3,8 @@ from rest_framework.exceptions import NotFound
 from django.utils.translation import gettext as _
 
 from jb_drf_auth.conf import get_setting
-from jb_drf_auth.serializers.profile import ProfileSerializer
-from jb_drf_auth.serializers.user import UserSerializer
+from jb_drf_auth.replicas import use_read_replica
+from jb_drf_auth.services.devices import DeviceService
 from jb_drf_auth.utils import get_device_model_cls, get_profile_model_cls
 
 
@@ -13,6 +13,14 @@ class MeService:
     def _settings_payload(value):
         return value if isinstance(value, dict) else {}
 
+    @staticmethod
+    def _user_settings_payload(user):
+        # AbstractJbUser memoizes the parsed settings for the request.
+        get_settings = getattr(user, "get_settings", None)
+        if callable(get_settings):
+            return get_settings()
+        return MeService._settings_payload(getattr(user, "settings", None))
+
     @staticmethod
     def profile_completion_required(profile):
         first_name = (getattr(profile, "first_name", "") or "").strip()
@@ -34,17 +42,23 @@ class MeService:
 
     @staticmethod
     def get_me_mobile(user, profile, tokens):
+        # Serializers import services, so they are imported here to avoid an import cycle.
+        from jb_drf_auth.serializers.profile import ProfileSerializer
+        from jb_drf_auth.serializers.user import UserSerializer
+
         response = UserSerializer(user).data
         if tokens:
             response["tokens"] = tokens
         response["active_profile"] = ProfileSerializer(profile).data
-        response["user_settings"] = MeService._settings_payload(getattr(user, "settings", None))
+        response["user_settings"] = MeService._user_settings_payload(user)
         response["profile_settings"] = MeService._settings_payload(getattr(profile, "settings", None))
         response["profile_completion_required"] = MeService.profile_completion_required(profile)
         return response
 
     @staticmethod
     def get_me_web(user, profile, tokens):
+        from jb_drf_auth.serializers.profile import ProfileSerializer
+
         role = ["admin"]
         status = "active"
 
@@ -66,7 +80,7 @@ class MeService:
         response = {
             "user": user_payload,
             "active_profile": ProfileSerializer(profile).data,
-            "user_settings": MeService._settings_payload(getattr(user, "settings", None)),
+            "user_settings": MeService._user_settings_payload(user),
             "profile_settings": MeService._settings_payload(getattr(profile, "settings", None)),
             "terms_and_conditions": getattr(user, "terms_and_conditions", None),
             "profile_completion_required": MeService.profile_completion_required(profile),
@@ -78,22 +92,28 @@ class MeService:
         return response
 
     @staticmethod
-    def get_me(user, client, profile_id, device_token=None):
-        profile_model = get_profile_model_cls()
-        try:
-            profile = profile_model.objects.get(id=profile_id)
-        except profile_model.DoesNotExist:
-            raise NotFound(_("Perfil no encontrado."))
-
-        if client == "web":
-            return MeService.get_me_web(
-                user=user,
-                profile=user.get_default_profile(),
-                tokens=None,
-            )
+    def get_me(user, client, profile_id, device_token=None, device_verified=False):
+        # Profile reads may use a replica; the device check below stays on the primary.
+        with use_read_replica(user):
+            get_active_profile = getattr(user, "get_active_profile", None)
+            if callable(get_active_profile):
+                profile = get_active_profile(profile_id)
+            else:
+                profile_model = get_profile_model_cls()
+                profile = profile_model.objects.filter(id=profile_id).first()
+            if profile is None:
+                raise NotFound(_("Perfil no encontrado."))
+
+            if client == "web":
+                return MeService.get_me_web(
+                    user=user,
+                    profile=user.get_default_profile(),
+                    tokens=None,
+                )
 
         if client == "mobile":
-            if get_setting("AUTH_SINGLE_SESSION_ON_MOBILE"):
+            # A token bound to this device was already checked against the revocation list.
+            if get_setting("AUTH_SINGLE_SESSION_ON_MOBILE") and not device_verified:
                 if device_token:
                     try:
                         device_model = get_device_model_cls()
@@ -102,7 +122,7 @@ class MeService:
                             {"device": _("Configura JB_DRF_AUTH_DEVICE_MODEL para validar dispositivos.")}
                         )
 
-                    device = device_model.objects.filter(token=device_token).first()
+                    device = device_model.objects.filter(user_id=user.pk, token=device_token).first()
                     if device is None:
                         raise NotFound(_("No se encontro el dispositivo con el token proporcionado."))
                 else:
@@ -110,6 +130,7 @@ class MeService:
                         {"device": _("Datos del dispositivo requeridos para cliente movil.")}
                     )
 
+            DeviceService.touch(user, device_token)
             return MeService.get_me_mobile(user=user, profile=profile, tokens=None)
 
         raise serializers.ValidationError({"detail": _("Parametro 'client' invalido")})
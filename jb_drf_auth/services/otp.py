@@ -1,20 +1,25 @@
 import random
 from django.contrib.auth import get_user_model
+from django.db import router, transaction
 from django.utils import timezone
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 from rest_framework.exceptions import APIException, AuthenticationFailed, Throttled
 
 from jb_drf_auth.conf import get_setting
+from jb_drf_auth.replicas import use_read_replica
 from jb_drf_auth.services.client import ClientService
+from jb_drf_auth.services.delivery_logs import DeliveryLogService
 from jb_drf_auth.services.tokens import TokensService
 from jb_drf_auth.utils import (
+    get_delivery_log_sink,
     get_otp_model_cls,
     get_profile_model_cls,
     get_sms_message,
     get_sms_log_model_cls,
     get_sms_provider,
     normalize_phone_number,
+    with_default_profile,
 )
 
 
@@ -53,10 +58,11 @@ class OtpService:
 
         otp_model = get_otp_model_cls()
         user_exist = False
-        if email and User.objects.filter(email=email).exists():
-            user_exist = True
-        elif phone and User.objects.filter(phone=phone).exists():
-            user_exist = True
+        with use_read_replica():
+            if email and User.objects.filter(email=email).exists():
+                user_exist = True
+            elif phone and User.objects.filter(phone=phone).exists():
+                user_exist = True
 
         cooldown_seconds = get_setting("OTP_RESEND_COOLDOWN_SECONDS")
         now = timezone.now()
@@ -85,6 +91,7 @@ class OtpService:
             sms_provider = get_sms_provider()
             ttl_minutes = max(1, int(get_setting("OTP_TTL_SECONDS") / 60))
             message = get_sms_message(code, ttl_minutes)
+            sms_context = {"code": code, "minutes": ttl_minutes}
             try:
                 sms_provider.send_sms(phone, message)
                 otp = otp_model.objects.create(
@@ -95,19 +102,23 @@ class OtpService:
                     valid_until=now + timezone.timedelta(seconds=get_setting("OTP_TTL_SECONDS")),
                     last_sent_at=now,
                 )
-                sms_log_model.objects.create(
-                    phone=phone,
-                    message=message,
-                    provider=get_setting("SMS_PROVIDER"),
-                    status="sent",
+                get_delivery_log_sink().write(
+                    sms_log_model,
+                    DeliveryLogService.sms_log_fields(
+                        phone, message, status="sent", template_name="otp", context=sms_context
+                    ),
                 )
             except Exception as exc:
-                sms_log_model.objects.create(
-                    phone=phone,
-                    message=message,
-                    provider=get_setting("SMS_PROVIDER"),
-                    status="failed",
-                    error_message=str(exc),
+                get_delivery_log_sink().write(
+                    sms_log_model,
+                    DeliveryLogService.sms_log_fields(
+                        phone,
+                        message,
+                        status="failed",
+                        template_name="otp",
+                        context=sms_context,
+                        error_message=str(exc),
+                    ),
                 )
                 raise SmsDeliveryError() from exc
         else:
@@ -166,37 +177,50 @@ class OtpService:
             otp.save(update_fields=["attempts"])
             raise AuthenticationFailed(_("Codigo invalido o expirado."))
 
+        # The code is consumed first so it cannot be replayed. The OTP table may live on
+        # another database (AuthLogRouter), so the user writes below cannot share its
+        # transaction: if they fail, the code is released again.
         otp.is_used = True
         otp.save(update_fields=["is_used"])
+        try:
+            user = OtpService._get_or_create_verified_user(otp, role)
+        except Exception:
+            otp.is_used = False
+            otp.save(update_fields=["is_used"])
+            raise
+
+        profile = user.get_default_profile()
+        tokens = TokensService.get_tokens_for_user(user, profile, device_data)
+        return ClientService.response_for_client(client, user, profile, tokens, device_data)
 
+    @staticmethod
+    def _get_or_create_verified_user(otp, role=None):
         email = (otp.email or "").strip() or None
         phone = (otp.phone or "").strip() or None
 
-        user = None
-        if email:
-            user = User.objects.filter(email=email).first()
-        elif phone:
-            user = User.objects.filter(phone=phone).first()
-
-        if not user:
-            create_email = email or OtpService._build_phone_fallback_email(phone)
-            user = User.objects.create_user(
-                email=create_email,
-                phone=phone,
-                is_active=True,
-            )
-
-            profile_model = get_profile_model_cls()
-            profile_model.objects.create(
-                user=user,
-                role=role or get_setting("DEFAULT_PROFILE_ROLE"),
-                is_default=True,
-            )
+        with transaction.atomic(using=router.db_for_write(User)):
+            user = None
+            if email:
+                user = with_default_profile(User.objects.filter(email=email)).first()
+            elif phone:
+                user = with_default_profile(User.objects.filter(phone=phone)).first()
+
+            if not user:
+                create_email = email or OtpService._build_phone_fallback_email(phone)
+                user = User.objects.create_user(
+                    email=create_email,
+                    phone=phone,
+                    is_active=True,
+                )
 
-        if not getattr(user, "is_verified", True):
-            user.is_verified = True
-            user.save(update_fields=["is_verified"])
+                profile_model = get_profile_model_cls()
+                profile_model.objects.create(
+                    user=user,
+                    role=role or get_setting("DEFAULT_PROFILE_ROLE"),
+                    is_default=True,
+                )
 
-        profile = user.get_default_profile()
-        tokens = TokensService.get_tokens_for_user(user, profile)
-        return ClientService.response_for_client(client, user, profile, tokens, device_data)
+            if not getattr(user, "is_verified", True):
+                user.is_verified = True
+                user.save(update_fields=["is_verified"])
+        return user
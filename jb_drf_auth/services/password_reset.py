@@ -9,7 +9,13 @@ from django.utils.translation import gettext as _
 from rest_framework import serializers
 
 from jb_drf_auth.conf import get_setting
-from jb_drf_auth.utils import get_email_log_model_cls, get_email_provider, render_email_template
+from jb_drf_auth.services.delivery_logs import DeliveryLogService
+from jb_drf_auth.utils import (
+    get_delivery_log_sink,
+    get_email_log_model_cls,
+    get_email_provider,
+    render_email_template,
+)
 
 
 User = get_user_model()
@@ -34,15 +40,18 @@ class PasswordResetService:
             user = User.objects.get(email=email)
         except User.DoesNotExist:
             logger.info("password_reset_user_not_found email=%s", email)
-            email_log_model.objects.create(
-                to_email=email,
-                subject="",
-                text_body="",
-                html_body=None,
-                provider=provider_path,
-                status="failed",
-                error_message="user_not_found",
-                template_name="password_reset",
+            get_delivery_log_sink().write(
+                email_log_model,
+                DeliveryLogService.email_log_fields(
+                    email,
+                    "",
+                    "",
+                    None,
+                    status="failed",
+                    template_name="password_reset",
+                    error_message="user_not_found",
+                    provider=provider_path,
+                ),
             )
             return False
 
@@ -51,39 +60,45 @@ class PasswordResetService:
         frontend_url = get_setting("FRONTEND_URL") or ""
         reset_url = f"{frontend_url}/reset-password/?uid={uid}&token={token}"
 
-        subject, text_body, html_body = render_email_template(
-            "password_reset",
-            {
-                "user_email": user.email,
-                "reset_url": reset_url,
-            },
-        )
+        context = {
+            "user_email": user.email,
+            "reset_url": reset_url,
+        }
+        subject, text_body, html_body = render_email_template("password_reset", context)
 
         try:
             provider = get_email_provider()
             provider.send_email(user.email, subject, text_body, html_body)
-            email_log_model.objects.create(
-                to_email=user.email,
-                subject=subject,
-                text_body=text_body,
-                html_body=html_body,
-                provider=provider_path,
-                status="sent",
-                template_name="password_reset",
+            get_delivery_log_sink().write(
+                email_log_model,
+                DeliveryLogService.email_log_fields(
+                    user.email,
+                    subject,
+                    text_body,
+                    html_body,
+                    status="sent",
+                    template_name="password_reset",
+                    context=context,
+                    provider=provider_path,
+                ),
             )
             logger.info("password_reset_email_sent email=%s", user.email)
             return True
         except Exception as exc:
             logger.exception("password_reset_email_failed email=%s", user.email)
-            email_log_model.objects.create(
-                to_email=user.email,
-                subject=subject,
-                text_body=text_body,
-                html_body=html_body,
-                provider=provider_path,
-                status="failed",
-                error_message=str(exc),
-                template_name="password_reset",
+            get_delivery_log_sink().write(
+                email_log_model,
+                DeliveryLogService.email_log_fields(
+                    user.email,
+                    subject,
+                    text_body,
+                    html_body,
+                    status="failed",
+                    template_name="password_reset",
+                    context=context,
+                    error_message=str(exc),
+                    provider=provider_path,
+                ),
             )
             if raise_on_fail:
                 raise serializers.ValidationError(
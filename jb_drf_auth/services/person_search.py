@@ -0,0 +1,131 @@
+"""Ranked person lookup for staff tools."""
+
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import Case, CharField, FloatField, Q, Value, When
+from django.db.models.functions import Concat, Greatest, Upper
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.utils import get_person_search_model_cls
+
+
+NAME_FIELDS = ("first_name", "last_name_1", "last_name_2")
+IDENTIFIER_FIELDS = ("national_id", "tax_id", "contact_email", "mobile_phone")
+_INDEX_SUFFIXES = {
+    "national_id": "nid",
+    "tax_id": "tax",
+    "contact_email": "email",
+    "mobile_phone": "phone",
+}
+
+
+def full_name_expression():
+    """`first_name last_name_1 last_name_2` with NULLs as empty strings (immutable on PostgreSQL)."""
+    parts = []
+    for name in NAME_FIELDS:
+        parts.extend([name, Value(" ")])
+    return Concat(*parts[:-1], output_field=CharField())
+
+
+def person_search_indexes(prefix, identifier_fields=IDENTIFIER_FIELDS):
+    """
+    PostgreSQL indexes used by PersonSearchService: a trigram GIN index on the full name
+    (for `%>` word similarity) and one on UPPER(<identifier>) (for case-insensitive prefix
+    LIKE). Add them to `Meta.indexes` of the searched model after a `TrigramExtension()`
+    migration operation. `prefix` should be at most 14 characters.
+    """
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+
+    indexes = [GinIndex(OpClass(full_name_expression(), name="gin_trgm_ops"), name=f"{prefix}_name_trgm")]
+    for field in identifier_fields:
+        indexes.append(
+            GinIndex(
+                OpClass(Upper(field), name="gin_trgm_ops"),
+                name=f"{prefix}_{_INDEX_SUFFIXES.get(field, field)}_trgm",
+            )
+        )
+    return indexes
+
+
+def _present_fields(model, names):
+    concrete = {field.name for field in model._meta.concrete_fields}
+    return [name for name in names if name in concrete]
+
+
+def _any_field(fields, lookup, value):
+    return reduce(or_, (Q(**{f"{field}__{lookup}": value}) for field in fields))
+
+
+def _identifier_rank(identifiers, term, default):
+    if not identifiers:
+        return Value(default, output_field=FloatField())
+    return Case(
+        When(_any_field(identifiers, "iexact", term), then=Value(1.0)),
+        When(_any_field(identifiers, "istartswith", term), then=Value(0.75)),
+        default=Value(default),
+        output_field=FloatField(),
+    )
+
+
+class PersonSearchService:
+    @staticmethod
+    def get_queryset():
+        return get_person_search_model_cls()._default_manager.all()
+
+    @staticmethod
+    def normalize_query(query):
+        term = " ".join(str(query or "").split())
+        min_length = get_setting("PERSON_SEARCH_MIN_LENGTH")
+        if len(term) < min_length:
+            raise serializers.ValidationError(
+                {"q": _("La busqueda debe tener al menos %(min)s caracteres.") % {"min": min_length}}
+            )
+        return term
+
+    @staticmethod
+    def search(query, queryset=None):
+        """
+        Return `queryset` filtered by `query` and annotated with `rank` (0..1, higher is
+        better). Identifier prefix matches rank 0.75 and exact matches 1.0. On PostgreSQL
+        names are ranked by trigram word similarity; other backends use prefix matching
+        on every word (for tests and small installations).
+        """
+        term = PersonSearchService.normalize_query(query)
+        if queryset is None:
+            queryset = PersonSearchService.get_queryset()
+
+        identifiers = _present_fields(queryset.model, IDENTIFIER_FIELDS)
+        if connections[queryset.db].vendor == "postgresql":
+            return PersonSearchService._search_trigram(queryset, term, identifiers)
+        return PersonSearchService._search_prefix(queryset, term, identifiers)
+
+    @staticmethod
+    def _search_trigram(queryset, term, identifiers):
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        full_name = full_name_expression()
+        condition = Q(TrigramWordSimilar(full_name, term))
+        if identifiers:
+            condition |= _any_field(identifiers, "istartswith", term)
+        rank = Greatest(
+            TrigramWordSimilarity(term, full_name),
+            _identifier_rank(identifiers, term, 0.0),
+            output_field=FloatField(),
+        )
+        return queryset.filter(condition).annotate(rank=rank)
+
+    @staticmethod
+    def _search_prefix(queryset, term, identifiers):
+        names = _present_fields(queryset.model, NAME_FIELDS)
+        condition = reduce(
+            lambda left, right: left & right,
+            (_any_field(names, "istartswith", word) for word in term.split()),
+        )
+        if identifiers:
+            condition |= _any_field(identifiers, "istartswith", term)
+        return queryset.filter(condition).annotate(rank=_identifier_rank(identifiers, term, 0.5))
@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, router, transaction
 from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from jb_drf_auth.conf import get_setting
+from jb_drf_auth.replicas import use_read_replica
 from jb_drf_auth.services.email_confirmation import EmailConfirmationService
 from jb_drf_auth.utils import get_profile_model_cls
 
@@ -28,17 +30,28 @@ class RegisterService:
         if password != password_confirm:
             raise ValueError(_("Las contraseñas no coinciden."))
 
-        if User.objects.filter(email=email).exists():
-            raise ValueError(_("El correo electrónico ya esta en uso."))
-        if username and User.objects.filter(username=username).exists():
-            raise ValueError(_("El nombre de usuario ya esta en uso."))
+        with use_read_replica():
+            if User.objects.filter(email=email).exists():
+                raise ValueError(_("El correo electrónico ya esta en uso."))
+            if username and User.objects.filter(username=username).exists():
+                raise ValueError(_("El nombre de usuario ya esta en uso."))
 
-        user = User.objects.create_user(
-            email=email,
-            username=username,
-            password=password,
-            is_active=False,
-        )
+        try:
+            # A lagging replica can miss a user created a moment ago; the unique
+            # constraint on the primary has the last word.
+            with transaction.atomic(using=router.db_for_write(User)):
+                user = User.objects.create_user(
+                    email=email,
+                    username=username,
+                    password=password,
+                    is_active=False,
+                )
+        except IntegrityError:
+            if User.objects.filter(email=email).exists():
+                raise ValueError(_("El correo electrónico ya esta en uso.")) from None
+            if username and User.objects.filter(username=username).exists():
+                raise ValueError(_("El nombre de usuario ya esta en uso.")) from None
+            raise
         if terms_and_conditions_accepted and hasattr(user, "terms_and_conditions"):
             user.terms_and_conditions = timezone.now()
             user.save(update_fields=["terms_and_conditions"])
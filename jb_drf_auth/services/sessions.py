@@ -0,0 +1,53 @@
+import logging
+
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from jb_drf_auth.revocation import (
+    bump_user_token_version,
+    revoke_token,
+    revoke_token_family,
+)
+from jb_drf_auth.tokens import FAMILY_CLAIM, RefreshToken
+
+
+logger = logging.getLogger("jb_drf_auth.sessions")
+
+
+class SessionService:
+    @staticmethod
+    def _revoke_session(payload):
+        revoke_token(payload)
+        family = payload.get(FAMILY_CLAIM)
+        if family:
+            revoke_token_family(family)
+
+    @staticmethod
+    def logout(user, access_payload=None, raw_refresh=None):
+        """
+        End the current session: the access token used for the request and the refresh
+        token family it belongs to stop working.
+        """
+        if access_payload:
+            SessionService._revoke_session(access_payload)
+
+        if raw_refresh:
+            try:
+                refresh = RefreshToken(raw_refresh)
+            except TokenError:
+                raise ValidationError({"refresh": _("Token de actualizacion invalido.")})
+            if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(user.pk):
+                raise ValidationError({"refresh": _("Token de actualizacion invalido.")})
+            SessionService._revoke_session(refresh.payload)
+
+        logger.info("logout user_id=%s", user.pk)
+
+    @staticmethod
+    def logout_all(user):
+        """
+        Revoke every access and refresh token issued to the user.
+        """
+        bump_user_token_version(user.pk)
+        logger.info("logout_all user_id=%s", user.pk)
@@ -1,28 +1,42 @@
-import uuid
+import hashlib
+import json
 import logging
-from urllib.error import URLError
-from urllib.request import urlopen
+import threading
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connections, router, transaction
 from django.utils import timezone
 from django.utils.translation import gettext as _
 from rest_framework import status
 
 from jb_drf_auth.conf import get_setting, get_social_settings
 from jb_drf_auth.exceptions import SocialAuthError
+from jb_drf_auth.replicas import use_read_replica
 from jb_drf_auth.services.client import ClientService
+from jb_drf_auth.services.login_activity import LoginActivityService
 from jb_drf_auth.services.tokens import TokensService
 from jb_drf_auth.utils import (
     get_profile_model_cls,
     get_social_account_model_cls,
     get_social_provider,
+    with_default_profile,
 )
 
 
 User = get_user_model()
 logger = logging.getLogger("jb_drf_auth.services.social_auth")
 
+# Per-token OIDC claims: they change on every sign in without the identity changing.
+VOLATILE_CLAIMS = ("iat", "exp", "nbf", "auth_time", "nonce", "at_hash", "c_hash", "jti")
+IDENTITY_CACHE_KEY_PREFIX = "jb_drf_auth:social_identity:"
+# Backends whose ON CONFLICT DO UPDATE accepts a WHERE clause and RETURNING.
+UPSERT_VENDORS = ("postgresql", "sqlite")
+
 
 class SocialAuthService:
     @staticmethod
@@ -75,26 +89,19 @@ class SocialAuthService:
         username = SocialAuthService._build_unique_username(
             identity.provider, identity.provider_user_id, identity.email
         )
+        # Set everything on the INSERT; a None password is stored as unusable.
+        extra_fields = {}
+        if hasattr(User, "is_verified"):
+            extra_fields["is_verified"] = bool(identity.email_verified)
+        if terms_accepted and hasattr(User, "terms_and_conditions"):
+            extra_fields["terms_and_conditions"] = timezone.now()
         user = User.objects.create_user(
             email=identity.email,
             username=username,
             password=None,
             is_active=True,
+            **extra_fields,
         )
-        user.set_unusable_password()
-
-        update_fields = []
-        if hasattr(user, "is_verified"):
-            user.is_verified = bool(identity.email_verified)
-            update_fields.append("is_verified")
-        if terms_accepted and hasattr(user, "terms_and_conditions"):
-            user.terms_and_conditions = timezone.now()
-            update_fields.append("terms_and_conditions")
-        if update_fields:
-            update_fields.append("password")
-            user.save(update_fields=update_fields)
-        else:
-            user.save()
 
         profile_model = get_profile_model_cls()
         profile_model.objects.create(
@@ -113,26 +120,81 @@ class SocialAuthService:
         return user
 
     @staticmethod
-    def _sync_profile_picture(profile, picture_url: str | None):
+    def _picture_sync_is_fresh(social_account, picture_url: str, resync_interval) -> bool:
+        if social_account is None or not resync_interval:
+            return False
+        if getattr(social_account, "picture_synced_url", None) != picture_url:
+            return False
+        synced_at = getattr(social_account, "picture_synced_at", None)
+        if not synced_at:
+            return False
+        return (timezone.now() - synced_at).total_seconds() < int(resync_interval)
+
+    @staticmethod
+    def _record_picture_sync(social_account, picture_url: str, **fields):
+        if social_account is None or not hasattr(social_account, "picture_synced_url"):
+            return
+        social_account.picture_synced_url = picture_url
+        social_account.picture_synced_at = timezone.now()
+        for name, value in fields.items():
+            setattr(social_account, name, value)
+        social_account.save(
+            update_fields=["picture_synced_url", "picture_synced_at", *fields.keys()]
+        )
+
+    @staticmethod
+    def _sync_profile_picture(profile, picture_url: str | None, social_account=None):
         social_settings = get_social_settings()
         if not social_settings.get("SYNC_PICTURE_ON_LOGIN", True):
             return
         if not picture_url or not hasattr(profile, "picture"):
             return
 
+        has_picture = bool(getattr(profile, "picture", None))
+        if has_picture and SocialAuthService._picture_sync_is_fresh(
+            social_account,
+            picture_url,
+            social_settings.get("PICTURE_RESYNC_INTERVAL_SECONDS"),
+        ):
+            return
+
         timeout = social_settings.get("PICTURE_DOWNLOAD_TIMEOUT_SECONDS", 5)
         max_bytes = int(social_settings.get("PICTURE_MAX_BYTES", 5 * 1024 * 1024))
         allowed_types = social_settings.get("PICTURE_ALLOWED_CONTENT_TYPES") or ()
         allowed_types = {str(value).lower() for value in allowed_types}
+
+        headers = {}
+        if has_picture and social_account is not None:
+            if getattr(social_account, "picture_etag", None):
+                headers["If-None-Match"] = social_account.picture_etag
+            if getattr(social_account, "picture_last_modified", None):
+                headers["If-Modified-Since"] = social_account.picture_last_modified
+
         try:
-            with urlopen(picture_url, timeout=timeout) as response:
+            with urlopen(Request(picture_url, headers=headers), timeout=timeout) as response:
                 content_type = response.headers.get("Content-Type", "").lower()
                 content_type = content_type.split(";")[0].strip()
                 if not content_type.startswith("image/"):
                     return
                 if allowed_types and content_type not in allowed_types:
                     return
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
                 payload = response.read(max_bytes + 1)
+        except HTTPError as exc:
+            if exc.code == 304:
+                SocialAuthService._record_picture_sync(social_account, picture_url)
+                logger.info(
+                    "social_picture_not_modified profile_id=%s",
+                    getattr(profile, "pk", None),
+                )
+                return
+            logger.warning(
+                "social_picture_download_failed profile_id=%s status=%s",
+                getattr(profile, "pk", None),
+                exc.code,
+            )
+            return
         except (URLError, TimeoutError, ValueError, OSError):
             logger.warning(
                 "social_picture_download_failed profile_id=%s picture_url_present=%s",
@@ -146,14 +208,31 @@ class SocialAuthService:
         if len(payload) > max_bytes:
             return
 
+        digest = hashlib.sha256(payload).hexdigest()
+        metadata = {
+            "picture_etag": (etag or "")[:255] or None,
+            "picture_last_modified": (last_modified or "")[:64] or None,
+            "picture_sha256": digest,
+        }
+        if has_picture and getattr(social_account, "picture_sha256", None) == digest:
+            SocialAuthService._record_picture_sync(social_account, picture_url, **metadata)
+            logger.info(
+                "social_picture_unchanged profile_id=%s",
+                getattr(profile, "pk", None),
+            )
+            return
+
         extension = "jpg"
         if "png" in content_type:
             extension = "png"
         elif "webp" in content_type:
             extension = "webp"
 
-        filename = f"social-{profile.pk}-{uuid.uuid4().hex[:10]}.{extension}"
-        profile.picture.save(filename, ContentFile(payload), save=True)
+        filename = f"social-{profile.pk}-{digest[:10]}.{extension}"
+        profile.picture.save(filename, ContentFile(payload), save=False)
+        # Only the picture column: the profile may have been edited since it was loaded.
+        profile.save(update_fields=["picture"])
+        SocialAuthService._record_picture_sync(social_account, picture_url, **metadata)
         logger.info(
             "social_picture_synced profile_id=%s bytes=%s content_type=%s",
             getattr(profile, "pk", None),
@@ -161,6 +240,216 @@ class SocialAuthService:
             content_type,
         )
 
+    @staticmethod
+    def _schedule_profile_picture_sync(profile, picture_url: str | None, social_account=None):
+        """
+        Sync the provider picture inline, or after commit on a background thread
+        when SOCIAL['PICTURE_SYNC_ASYNC'] is enabled.
+        """
+        if not picture_url:
+            return
+        if not get_social_settings().get("PICTURE_SYNC_ASYNC", False):
+            SocialAuthService._sync_profile_picture(profile, picture_url, social_account)
+            return
+
+        profile_id = profile.pk
+
+        def run():
+            try:
+                # Fresh row: the request's instance is a snapshot from before the commit.
+                current = get_profile_model_cls()._base_manager.filter(pk=profile_id).first()
+                if current is not None:
+                    SocialAuthService._sync_profile_picture(current, picture_url, social_account)
+            except Exception:
+                logger.exception("social_picture_sync_failed profile_id=%s", profile_id)
+            finally:
+                connections.close_all()
+
+        transaction.on_commit(
+            lambda: threading.Thread(target=run, name="jb-auth-picture-sync", daemon=True).start()
+        )
+
+    @staticmethod
+    def raw_response_sha256(raw_response):
+        stable = {key: value for key, value in (raw_response or {}).items() if key not in VOLATILE_CLAIMS}
+        payload = json.dumps(stable, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _save_social_account(social_account_model, social_account, user, identity):
+        """
+        Persist the social account of `user`. Existing accounts whose provider data did
+        not change (raw_response hash, email, email_verified, picture_url) are not written
+        at all; their `last_login_at` goes through LoginActivityService. Otherwise, on
+        PostgreSQL and SQLite, one INSERT ... ON CONFLICT DO UPDATE that only updates
+        rows owned by `user`; other backends get an UPDATE restricted to the owner or an
+        INSERT.
+
+        Returns `(social_account, created)`. When another user owns the identity (linked
+        by a concurrent request), the returned account is that user's row: callers must
+        check its `user_id`.
+        """
+        values = {
+            "email": identity.email,
+            "email_verified": bool(identity.email_verified),
+            "picture_url": identity.picture_url,
+            "raw_response_sha256": SocialAuthService.raw_response_sha256(identity.raw_response),
+        }
+        if social_account is not None and all(
+            getattr(social_account, name) == value for name, value in values.items()
+        ):
+            LoginActivityService.touch_social_account(social_account)
+            return social_account, False
+
+        values["raw_response"] = identity.raw_response or {}
+        values["last_login_at"] = timezone.now()
+        lookup = {"provider": identity.provider, "provider_user_id": identity.provider_user_id}
+        connection = connections[router.db_for_write(social_account_model)]
+        if connection.vendor in UPSERT_VENDORS and connection.features.can_return_columns_from_insert:
+            return SocialAuthService._upsert_social_account(
+                connection, social_account_model, social_account, user, lookup, values
+            )
+
+        if social_account is not None and SocialAuthService._update_social_account(
+            social_account_model, social_account, user, values
+        ):
+            return social_account, False
+        # New, or unlinked in the meantime.
+
+        try:
+            with transaction.atomic(using=connection.alias):
+                return social_account_model.objects.create(user=user, **lookup, **values), True
+        except IntegrityError:
+            # Linked by a concurrent request in the meantime.
+            existing = SocialAuthService._linked_social_account(social_account_model, lookup)
+            if existing is None:
+                raise
+            if existing.user_id != user.pk:
+                SocialAuthService._log_link_conflict(identity.provider, user, existing.user_id)
+                return existing, False
+            if not SocialAuthService._update_social_account(social_account_model, existing, user, values):
+                raise
+            return existing, False
+
+    @staticmethod
+    def _upsert_social_account(connection, social_account_model, social_account, user, lookup, values):
+        now = timezone.now()
+        row = {"user": user.pk, **lookup, **values, "created": now, "modified": now}
+        opts = social_account_model._meta
+        quote = connection.ops.quote_name
+        table = quote(opts.db_table)
+        fields = {name: opts.get_field(name) for name in row}
+        columns = {name: quote(field.column) for name, field in fields.items()}
+        updated = [columns[name] for name in (*values, "modified")]
+        sql = (
+            f"INSERT INTO {table} ({', '.join(columns.values())}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON CONFLICT ({columns['provider']}, {columns['provider_user_id']}) DO UPDATE SET "
+            f"{', '.join(f'{column} = EXCLUDED.{column}' for column in updated)} "
+            f"WHERE {table}.{columns['user']} = EXCLUDED.{columns['user']} "
+            f"RETURNING {quote(opts.pk.column)}, {columns['created']} = %s"
+        )
+        params = [fields[name].get_db_prep_save(value, connection) for name, value in row.items()]
+        params.append(fields["created"].get_db_prep_save(now, connection))
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            returned = cursor.fetchone()
+
+        if returned is None:
+            # The conflict update only matches rows of `user`: another user owns it.
+            existing = SocialAuthService._linked_social_account(social_account_model, lookup)
+            if existing is None:
+                # Unlinked in the meantime.
+                return SocialAuthService._upsert_social_account(
+                    connection, social_account_model, social_account, user, lookup, values
+                )
+            SocialAuthService._log_link_conflict(lookup["provider"], user, existing.user_id)
+            return existing, False
+
+        pk, created = returned[0], bool(returned[1])
+        if social_account is None or social_account.pk != pk:
+            if not created:
+                # Linked to `user` by a concurrent request: load its picture bookkeeping.
+                return SocialAuthService._linked_social_account(social_account_model, lookup), False
+            social_account = social_account_model(pk=pk, user=user, created=now, **lookup)
+            social_account._state.adding = False
+            social_account._state.db = connection.alias
+        # Keep the loaded row: it carries the picture sync bookkeeping.
+        for name, value in {**values, "modified": now}.items():
+            setattr(social_account, name, value)
+        return social_account, created
+
+    @staticmethod
+    def _linked_social_account(social_account_model, lookup):
+        return social_account_model.objects.filter(**lookup).defer("raw_response").first()
+
+    @staticmethod
+    def _log_link_conflict(provider, user, owner_user_id):
+        logger.warning(
+            "social_account_link_conflict provider=%s user_id=%s owner_user_id=%s",
+            provider,
+            getattr(user, "id", None),
+            owner_user_id,
+        )
+
+    @staticmethod
+    def _update_social_account(social_account_model, social_account, user, values) -> bool:
+        # Restricted to the owner: never rewrites another user's account.
+        updated = social_account_model.objects.filter(pk=social_account.pk, user=user).update(
+            modified=timezone.now(), **values
+        )
+        if updated:
+            # Keep the loaded row: it carries the picture sync bookkeeping.
+            for name, value in values.items():
+                setattr(social_account, name, value)
+        return bool(updated)
+
+    @staticmethod
+    def _identity_cache_key(provider_name: str, payload: dict) -> str | None:
+        if payload.get("id_token"):
+            parts = ("id_token", payload["id_token"])
+        elif payload.get("access_token"):
+            parts = ("access_token", payload["access_token"])
+        elif payload.get("authorization_code") and payload.get("code_verifier"):
+            # Without PKCE a replayed code would skip the provider's single-use check.
+            parts = (
+                "authorization_code",
+                payload["authorization_code"],
+                payload["code_verifier"],
+                payload.get("redirect_uri") or "",
+            )
+        else:
+            return None
+        digest = hashlib.sha256("\0".join((provider_name, *parts)).encode("utf-8")).hexdigest()
+        return f"{IDENTITY_CACHE_KEY_PREFIX}{digest}"
+
+    @staticmethod
+    def authenticate(provider_name: str, payload: dict):
+        """
+        Verify `payload` with the provider, reusing the identity of the same token (or
+        authorization_code + code_verifier) verified in the last
+        SOCIAL['IDENTITY_CACHE_SECONDS'], and never past the token's `exp`. This lets
+        precheck and the login that follows it validate (or exchange) a token once.
+        """
+        social_provider = get_social_provider(provider_name)
+        max_age = int(get_social_settings().get("IDENTITY_CACHE_SECONDS") or 0)
+        key = SocialAuthService._identity_cache_key(provider_name, payload) if max_age > 0 else None
+        if key:
+            identity = cache.get(key)
+            if identity is not None:
+                logger.info("social_identity_cache_hit provider=%s", provider_name)
+                return identity
+
+        identity = social_provider.authenticate(payload)
+        if key:
+            timeout = max_age
+            expires_at = (getattr(identity, "raw_response", None) or {}).get("exp")
+            if isinstance(expires_at, (int, float)):
+                timeout = min(timeout, int(expires_at - timezone.now().timestamp()))
+            if timeout > 0:
+                cache.set(key, identity, timeout)
+        return identity
+
     @staticmethod
     def login_or_register(
         provider_name: str,
@@ -175,8 +464,7 @@ class SocialAuthService:
             provider_name,
             client,
         )
-        social_provider = get_social_provider(provider_name)
-        identity = social_provider.authenticate(payload)
+        identity = SocialAuthService.authenticate(provider_name, payload)
 
         social_account_model = get_social_account_model_cls()
         social_settings = get_social_settings()
@@ -184,10 +472,15 @@ class SocialAuthService:
         user_created = False
         linked_existing = False
 
-        social_account = social_account_model.objects.filter(
-            provider=identity.provider,
-            provider_user_id=identity.provider_user_id,
-        ).select_related("user").first()
+        social_account = with_default_profile(
+            social_account_model.objects.filter(
+                provider=identity.provider,
+                provider_user_id=identity.provider_user_id,
+            )
+            .select_related("user")
+            .defer("raw_response"),
+            "user__default_profile",
+        ).first()
 
         if social_account:
             user = social_account.user
@@ -198,7 +491,9 @@ class SocialAuthService:
             )
         else:
             if social_settings.get("LINK_BY_EMAIL", True) and identity.email:
-                user = User.objects.filter(email__iexact=identity.email).first()
+                user = with_default_profile(
+                    User.objects.filter(email__iexact=identity.email)
+                ).first()
                 linked_existing = user is not None
                 if linked_existing:
                     logger.info(
@@ -207,32 +502,38 @@ class SocialAuthService:
                         getattr(user, "id", None),
                     )
 
+            if user is None and not social_settings.get("AUTO_CREATE_USER", True):
+                raise SocialAuthError(
+                    _("No account is linked for this social provider."),
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    code="social_account_not_linked",
+                )
+
+        with transaction.atomic(using=router.db_for_write(User)):
             if user is None:
-                if not social_settings.get("AUTO_CREATE_USER", True):
-                    raise SocialAuthError(
-                        _("No account is linked for this social provider."),
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        code="social_account_not_linked",
-                    )
                 user = SocialAuthService._create_user_from_identity(
                     identity=identity,
                     terms_accepted=terms_and_conditions_accepted,
                     role=role,
                 )
                 user_created = True
-
-        social_account, created_or_updated = social_account_model.objects.update_or_create(
-            provider=identity.provider,
-            provider_user_id=identity.provider_user_id,
-            defaults={
-                "user": user,
-                "email": identity.email,
-                "email_verified": bool(identity.email_verified),
-                "picture_url": identity.picture_url,
-                "raw_response": identity.raw_response or {},
-                "last_login_at": timezone.now(),
-            },
-        )
+            social_account, _created = SocialAuthService._save_social_account(
+                social_account_model, social_account, user, identity
+            )
+            linked_concurrently = social_account.user_id != user.pk
+            if linked_concurrently and user_created:
+                # Drop the user created for the login that lost the race.
+                transaction.set_rollback(True)
+        if linked_concurrently:
+            # A concurrent login linked the identity first: sign in its owner.
+            user = with_default_profile(User.objects.filter(pk=social_account.user_id)).get()
+            user_created = False
+            linked_existing = False
+            logger.info(
+                "social_account_found_concurrently provider=%s user_id=%s",
+                identity.provider,
+                getattr(user, "id", None),
+            )
 
         profile = user.get_default_profile()
         if profile is None:
@@ -245,11 +546,14 @@ class SocialAuthService:
                 is_default=True,
             )
 
-        SocialAuthService._sync_profile_picture(profile, identity.picture_url)
+        SocialAuthService._schedule_profile_picture_sync(
+            profile, identity.picture_url, social_account
+        )
 
         tokens = TokensService.get_tokens_for_user(
             user=user,
             profile=profile,
+            device_data=device_data,
         )
         response = ClientService.response_for_client(client, user, profile, tokens, device_data)
         response["social_provider"] = identity.provider
@@ -266,9 +570,9 @@ class SocialAuthService:
         return response
 
     @staticmethod
+    @use_read_replica()
     def precheck(provider_name: str, payload: dict):
-        social_provider = get_social_provider(provider_name)
-        identity = social_provider.authenticate(payload)
+        identity = SocialAuthService.authenticate(provider_name, payload)
 
         social_account_model = get_social_account_model_cls()
         social_settings = get_social_settings()
@@ -300,6 +604,20 @@ class SocialAuthService:
             "can_login": social_account_exists or linked_existing_user or auto_create_user,
         }
 
+    @staticmethod
+    def _raise_already_linked(identity, user, existing_user_id):
+        logger.warning(
+            "social_link_rejected provider=%s target_user_id=%s existing_user_id=%s",
+            identity.provider,
+            getattr(user, "id", None),
+            existing_user_id,
+        )
+        raise SocialAuthError(
+            _("This social account is already linked to another user."),
+            status_code=status.HTTP_400_BAD_REQUEST,
+            code="social_already_linked",
+        )
+
     @staticmethod
     def link_account(user, provider_name: str, payload: dict):
         logger.info(
@@ -307,44 +625,32 @@ class SocialAuthService:
             provider_name,
             getattr(user, "id", None),
         )
-        social_provider = get_social_provider(provider_name)
-        identity = social_provider.authenticate(payload)
+        identity = SocialAuthService.authenticate(provider_name, payload)
 
         social_account_model = get_social_account_model_cls()
 
-        existing = social_account_model.objects.filter(
-            provider=identity.provider,
-            provider_user_id=identity.provider_user_id,
-        ).select_related("user").first()
-        if existing and existing.user_id != user.id:
-            logger.warning(
-                "social_link_rejected provider=%s target_user_id=%s existing_user_id=%s",
-                identity.provider,
-                getattr(user, "id", None),
-                existing.user_id,
-            )
-            raise SocialAuthError(
-                _("This social account is already linked to another user."),
-                status_code=status.HTTP_400_BAD_REQUEST,
-                code="social_already_linked",
+        existing = (
+            social_account_model.objects.filter(
+                provider=identity.provider,
+                provider_user_id=identity.provider_user_id,
             )
+            .defer("raw_response")
+            .first()
+        )
+        if existing and existing.user_id != user.id:
+            SocialAuthService._raise_already_linked(identity, user, existing.user_id)
 
-        social_account, created = social_account_model.objects.update_or_create(
-            provider=identity.provider,
-            provider_user_id=identity.provider_user_id,
-            defaults={
-                "user": user,
-                "email": identity.email,
-                "email_verified": bool(identity.email_verified),
-                "picture_url": identity.picture_url,
-                "raw_response": identity.raw_response or {},
-                "last_login_at": timezone.now(),
-            },
+        social_account, created = SocialAuthService._save_social_account(
+            social_account_model, existing, user, identity
         )
+        if social_account.user_id != user.id:
+            SocialAuthService._raise_already_linked(identity, user, social_account.user_id)
 
         profile = user.get_default_profile()
         if profile is not None:
-            SocialAuthService._sync_profile_picture(profile, identity.picture_url)
+            SocialAuthService._schedule_profile_picture_sync(
+                profile, identity.picture_url, social_account
+            )
 
         logger.info(
             "social_link_success provider=%s user_id=%s created=%s",
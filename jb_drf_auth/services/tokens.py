@@ -1,11 +1,38 @@
-from rest_framework_simplejwt.tokens import RefreshToken
+import logging
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 
 from jb_drf_auth.conf import get_setting
+from jb_drf_auth.revocation import (
+    consume_refresh_token,
+    get_user_token_version,
+    is_token_revoked,
+    revoke_token_family,
+)
+from jb_drf_auth.utils import get_profile_model_cls
+from jb_drf_auth.tokens import (
+    DEVICE_CLAIM,
+    FAMILY_CLAIM,
+    IS_ACTIVE_CLAIM,
+    IS_VERIFIED_CLAIM,
+    ROLE_CLAIM,
+    TOKEN_VERSION_CLAIM,
+    RefreshToken,
+)
+
+
+logger = logging.getLogger("jb_drf_auth.tokens")
 
 
 class TokensService:
     @staticmethod
-    def get_tokens_for_user(user, profile):
+    def get_tokens_for_user(user, profile, device_data=None):
         if not profile:
             raise ValueError(
                 "Se debe proporcionar un perfil valido para el usuario para generar tokens."
@@ -13,7 +40,74 @@ class TokensService:
 
         refresh = RefreshToken.for_user(user)
         refresh[get_setting("PROFILE_ID_CLAIM")] = profile.id
+        refresh[ROLE_CLAIM] = getattr(profile, "role", None)
+        refresh[IS_ACTIVE_CLAIM] = bool(getattr(user, "is_active", True))
+        refresh[IS_VERIFIED_CLAIM] = bool(getattr(user, "is_verified", True))
+        refresh[TOKEN_VERSION_CLAIM] = get_user_token_version(user.pk)
+        refresh[FAMILY_CLAIM] = uuid.uuid4().hex
+        device_token = (device_data or {}).get("token")
+        if device_token:
+            refresh[DEVICE_CLAIM] = device_token
         return {
             "refreshToken": str(refresh),
             "accessToken": str(refresh.access_token),
         }
+
+    @staticmethod
+    def refresh_tokens(raw_refresh):
+        """
+        Issue a new access token (and a rotated refresh token) from a refresh token.
+        The user and the role of the active profile are read in one query, so a user
+        deactivated or deleted since login can no longer refresh. Rotation state
+        lives in the token cache: replaying a rotated refresh token revokes its whole
+        family. Nothing is written to the database.
+        """
+        refresh = RefreshToken(raw_refresh)
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = TokensService._get_refresh_user(refresh, user_id)
+
+        jti = refresh[api_settings.JTI_CLAIM]
+        family = refresh.get(FAMILY_CLAIM) or jti
+        # Refresh is rare enough to always ask the cache instead of the local filter.
+        if is_token_revoked(refresh.payload, use_filter=False):
+            raise AuthenticationFailed(_("El token fue revocado."), code="token_revoked")
+
+        refresh[ROLE_CLAIM] = user.refresh_profile_role
+        refresh[IS_ACTIVE_CLAIM] = bool(user.is_active)
+        refresh[IS_VERIFIED_CLAIM] = bool(getattr(user, "is_verified", True))
+
+        if not get_setting("ROTATE_REFRESH_TOKENS"):
+            return {"access": str(refresh.access_token)}
+
+        remaining = refresh["exp"] - int(timezone.now().timestamp())
+        if not consume_refresh_token(jti, remaining):
+            revoke_token_family(family, api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+            logger.warning("refresh_token_reused user_id=%s family=%s", user_id, family)
+            raise AuthenticationFailed(_("El token fue revocado."), code="token_revoked")
+
+        refresh[FAMILY_CLAIM] = family
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        return {
+            "access": str(refresh.access_token),
+            "refresh": str(refresh),
+        }
+
+    @staticmethod
+    def _get_refresh_user(refresh, user_id):
+        profile_id = refresh.payload.get(get_setting("PROFILE_ID_CLAIM"))
+        role = get_profile_model_cls()._default_manager.filter(
+            pk=profile_id, user=OuterRef("pk")
+        ).values("role")[:1]
+        user = (
+            get_user_model()
+            ._default_manager.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .annotate(refresh_profile_role=Subquery(role))
+            .first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(_("Usuario inactivo."), code="user_inactive")
+        if user.refresh_profile_role is None:
+            raise AuthenticationFailed(_("Perfil no encontrado."), code="profile_not_found")
+        return user
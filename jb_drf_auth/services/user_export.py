@@ -0,0 +1,138 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from jb_drf_auth.utils import get_social_account_model_cls
+
+
+# Explicit allow-lists: passwords, settings, raw provider payloads and tokens never leave the database.
+USER_FIELDS = (
+    "id",
+    "email",
+    "username",
+    "phone",
+    "is_active",
+    "is_verified",
+    "is_staff",
+    "date_joined",
+    "last_login",
+    "terms_and_conditions",
+)
+PROFILE_FIELDS = ("id", "first_name", "last_name_1", "last_name_2", "birthday", "gender", "role", "label")
+SOCIAL_ACCOUNT_FIELDS = ("provider", "email", "email_verified", "last_login_at", "created")
+EXPORT_FORMATS = ("jsonl", "csv")
+CONTENT_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+# Spreadsheets evaluate cells starting with these as formulas.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _concrete_names(model):
+    return {field.name for field in model._meta.concrete_fields}
+
+
+class UserExportService:
+    """
+    Streams users with their default profile and social accounts.
+
+    Users are read through a server-side cursor (`QuerySet.iterator`) as `values()`
+    tuples joined with the default profile, and the social accounts of each chunk are
+    fetched with one extra query, so memory stays flat regardless of the table size.
+    """
+
+    @staticmethod
+    def columns():
+        user_model = get_user_model()
+        user_fields = [name for name in USER_FIELDS if name in _concrete_names(user_model)]
+        profile_fields = []
+        if "default_profile" in _concrete_names(user_model):
+            profile_model = user_model._meta.get_field("default_profile").related_model
+            profile_fields = [name for name in PROFILE_FIELDS if name in _concrete_names(profile_model)]
+        return user_fields, profile_fields
+
+    @staticmethod
+    def iter_records(queryset=None, chunk_size=2000):
+        """Yield one dict per user: user fields, `default_profile` and `social_accounts`."""
+        user_fields, profile_fields = UserExportService.columns()
+        if queryset is None:
+            queryset = get_user_model().objects.all()
+        lookups = [*user_fields, *(f"default_profile__{name}" for name in profile_fields)]
+        rows = queryset.order_by("pk").values_list("pk", *lookups).iterator(chunk_size=chunk_size)
+        try:
+            social_account_model = get_social_account_model_cls()
+        except RuntimeError:
+            social_account_model = None
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield from UserExportService._build_records(chunk, user_fields, profile_fields, social_account_model)
+                chunk = []
+        if chunk:
+            yield from UserExportService._build_records(chunk, user_fields, profile_fields, social_account_model)
+
+    @staticmethod
+    def _build_records(chunk, user_fields, profile_fields, social_account_model):
+        social_accounts = {}
+        if social_account_model is not None:
+            rows = (
+                social_account_model.objects.filter(user_id__in=[row[0] for row in chunk])
+                .order_by("user_id", "provider")
+                .values_list("user_id", *SOCIAL_ACCOUNT_FIELDS)
+            )
+            for user_id, *values in rows:
+                social_accounts.setdefault(user_id, []).append(dict(zip(SOCIAL_ACCOUNT_FIELDS, values)))
+
+        split = 1 + len(user_fields)
+        for row in chunk:
+            record = dict(zip(user_fields, row[1:split]))
+            profile = row[split:]
+            record["default_profile"] = dict(zip(profile_fields, profile)) if profile and profile[0] else None
+            record["social_accounts"] = social_accounts.get(row[0], [])
+            yield record
+
+    @staticmethod
+    def iter_lines(export_format, queryset=None, chunk_size=2000):
+        """Yield the export as text lines (`jsonl` or `csv` with a header row)."""
+        records = UserExportService.iter_records(queryset, chunk_size=chunk_size)
+        if export_format == "jsonl":
+            for record in records:
+                yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+            return
+        if export_format != "csv":
+            raise ValueError(f"Unknown export format: {export_format}")
+
+        user_fields, profile_fields = UserExportService.columns()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def line(values):
+            writer.writerow([_csv_value(value) for value in values])
+            value = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return value
+
+        yield line([*user_fields, *(f"default_profile_{name}" for name in profile_fields), "social_providers"])
+        for record in records:
+            profile = record["default_profile"] or {}
+            yield line(
+                [
+                    *(record[name] for name in user_fields),
+                    *(profile.get(name) for name in profile_fields),
+                    "|".join(account["provider"] for account in record["social_accounts"]),
+                ]
+            )
@@ -0,0 +1,402 @@
+import csv
+import json
+import logging
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, router, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.services.email_outbox import EmailOutboxService
+from jb_drf_auth.utils import get_email_outbox_model_cls, get_profile_model_cls, normalize_phone_number
+
+
+logger = logging.getLogger("jb_drf_auth.user_import")
+
+PROFILE_FIELDS = ("first_name", "last_name_1", "last_name_2", "birthday", "gender", "role")
+TRUE_VALUES = {"1", "true", "yes", "y", "si", "t"}
+
+
+def _init_hash_worker():
+    import django
+
+    django.setup()
+
+
+def _hash_password(raw_password):
+    return make_password(raw_password)
+
+
+def _clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+class ImportConflict(Exception):
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class UserImportService:
+    """
+    Bulk creation of users with their default profile.
+
+    Rows are validated a batch at a time (one query per unique column instead of one
+    per user), passwords are either taken pre-hashed or hashed on a process pool, and
+    users and profiles are inserted with one bulk INSERT per batch. Confirmation
+    emails go to the email outbox instead of being sent inline.
+    """
+
+    @staticmethod
+    def read_rows(stream, file_format):
+        """Yield `(line_number, row, error)` from a CSV or JSON Lines stream without loading it."""
+        if file_format == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row, None
+            return
+
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None, "invalid_json"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "invalid_json"
+                continue
+            yield line_number, row, None
+
+    @staticmethod
+    def import_rows(
+        rows,
+        batch_size=1000,
+        hash_workers=0,
+        active=False,
+        verified=False,
+        send_confirmation=False,
+        dry_run=False,
+        on_conflict=None,
+    ):
+        """
+        Import `(line_number, row, error)` tuples. `on_conflict(line_number, email, reason)`
+        is called for every skipped row. Returns created/skipped/queued counters.
+        """
+        state = {
+            "seen_emails": set(),
+            "seen_usernames": set(),
+            "seen_phones": set(),
+            "active": active,
+            "verified": verified,
+            "send_confirmation": send_confirmation,
+            "dry_run": dry_run,
+            "on_conflict": on_conflict or (lambda line_number, email, reason: None),
+        }
+        if send_confirmation:
+            # Fail before the first insert: a rerun would skip the users as email_exists.
+            get_email_outbox_model_cls()
+        result = {"created": 0, "skipped": 0, "queued_emails": 0}
+        pool = None
+        if hash_workers and hash_workers > 1:
+            pool = ProcessPoolExecutor(max_workers=hash_workers, initializer=_init_hash_worker)
+        state["pool"] = pool
+        try:
+            batch = []
+            for item in rows:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    UserImportService._merge(result, UserImportService._import_batch(batch, state))
+                    batch = []
+            if batch:
+                UserImportService._merge(result, UserImportService._import_batch(batch, state))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return result
+
+    @staticmethod
+    def _merge(result, batch_result):
+        for key, value in batch_result.items():
+            result[key] += value
+
+    @staticmethod
+    def _skip(state, line_number, email, reason):
+        state["on_conflict"](line_number, email, reason)
+
+    @staticmethod
+    def _parse(line_number, row, user_fields):
+        email = _clean(row.get("email"))
+        if not email:
+            raise ImportConflict("missing_email")
+        email = get_user_model().objects.normalize_email(email)
+        try:
+            validate_email(email)
+        except ValidationError as exc:
+            raise ImportConflict("invalid_email") from exc
+
+        password = row.get("password") or None
+        password_hash = _clean(row.get("password_hash"))
+        if password and password_hash:
+            raise ImportConflict("password_and_hash")
+        if password_hash:
+            try:
+                identify_hasher(password_hash)
+            except ValueError as exc:
+                raise ImportConflict("invalid_password_hash") from exc
+
+        phone = _clean(row.get("phone"))
+        if phone and "phone" in user_fields:
+            try:
+                phone = normalize_phone_number(phone)
+            except ValueError as exc:
+                raise ImportConflict("invalid_phone") from exc
+
+        profile = {name: _clean(row.get(name)) for name in PROFILE_FIELDS}
+        if profile["birthday"]:
+            try:
+                profile["birthday"] = date.fromisoformat(profile["birthday"])
+            except ValueError as exc:
+                raise ImportConflict("invalid_birthday") from exc
+        if profile["gender"] and profile["gender"] not in dict(get_setting("PROFILE_GENDER_CHOICES")):
+            raise ImportConflict("invalid_gender")
+        if profile["role"] and profile["role"] not in dict(get_setting("PROFILE_ROLE_CHOICES")):
+            raise ImportConflict("invalid_role")
+
+        return {
+            "line_number": line_number,
+            "email": email,
+            "username": _clean(row.get("username")),
+            "phone": phone if "phone" in user_fields else None,
+            "password": password,
+            "password_hash": password_hash,
+            "is_verified": _flag(row["is_verified"]) if "is_verified" in row else None,
+            "terms": _flag(row.get("terms_and_conditions_accepted")),
+            "profile": profile,
+        }
+
+    @staticmethod
+    def _validate(batch, state):
+        """Parse a batch and drop rows that clash with the file or the database."""
+        user_model = get_user_model()
+        user_fields = {field.name for field in user_model._meta.concrete_fields}
+        parsed = []
+        for line_number, row, error in batch:
+            email = _clean((row or {}).get("email"))
+            if error:
+                UserImportService._skip(state, line_number, email, error)
+                continue
+            try:
+                parsed.append(UserImportService._parse(line_number, row, user_fields))
+            except ImportConflict as exc:
+                UserImportService._skip(state, line_number, email, exc.reason)
+
+        existing_emails = set(
+            user_model._base_manager.filter(email__in=[item["email"] for item in parsed]).values_list(
+                "email", flat=True
+            )
+        )
+        existing_usernames = set(
+            user_model._base_manager.filter(
+                username__in=[item["username"] for item in parsed if item["username"]]
+            ).values_list("username", flat=True)
+        )
+        existing_phones = set()
+        if "phone" in user_fields:
+            existing_phones = set(
+                user_model._base_manager.filter(
+                    phone__in=[item["phone"] for item in parsed if item["phone"]]
+                ).values_list("phone", flat=True)
+            )
+
+        valid = []
+        for item in parsed:
+            email_key = item["email"].lower()
+            reason = None
+            if item["email"] in existing_emails:
+                reason = "email_exists"
+            elif email_key in state["seen_emails"]:
+                reason = "duplicate_email"
+            elif item["username"] and (
+                item["username"] in existing_usernames or item["username"] in state["seen_usernames"]
+            ):
+                reason = "username_exists"
+            elif item["phone"] and (item["phone"] in existing_phones or item["phone"] in state["seen_phones"]):
+                reason = "phone_exists"
+            if reason:
+                UserImportService._skip(state, item["line_number"], item["email"], reason)
+                continue
+            state["seen_emails"].add(email_key)
+            if item["username"]:
+                state["seen_usernames"].add(item["username"])
+            if item["phone"]:
+                state["seen_phones"].add(item["phone"])
+            valid.append(item)
+
+        UserImportService._assign_usernames(valid, state)
+        return valid
+
+    @staticmethod
+    def _assign_usernames(items, state):
+        """Email-based usernames, resolved against the database with one query per round."""
+        user_model = get_user_model()
+        pending = [item for item in items if not item["username"]]
+        suffix = 0
+        for _round in range(3):
+            if not pending:
+                return
+            candidates = {}
+            for item in pending:
+                base = item["email"].split("@")[0][:140]
+                candidates[id(item)] = base if suffix == 0 else f"{base}{suffix}"
+            taken = set(
+                user_model._base_manager.filter(username__in=set(candidates.values())).values_list(
+                    "username", flat=True
+                )
+            )
+            unresolved = []
+            for item in pending:
+                candidate = candidates[id(item)]
+                if candidate in taken or candidate in state["seen_usernames"]:
+                    unresolved.append(item)
+                    continue
+                item["username"] = candidate
+                state["seen_usernames"].add(candidate)
+            pending = unresolved
+            suffix = suffix + 1 if suffix else 1
+        for item in pending:
+            item["username"] = f"{item['email'].split('@')[0][:130]}-{secrets.token_hex(4)}"
+            state["seen_usernames"].add(item["username"])
+
+    @staticmethod
+    def _hash_passwords(items, pool):
+        raw = [item for item in items if item["password"]]
+        if pool is not None and len(raw) > 1:
+            hashes = pool.map(_hash_password, [item["password"] for item in raw], chunksize=8)
+        else:
+            hashes = (make_password(item["password"]) for item in raw)
+        for item, password_hash in zip(raw, hashes):
+            item["password_hash"] = password_hash
+        for item in items:
+            item["password"] = None
+            if not item["password_hash"]:
+                item["password_hash"] = make_password(None)
+
+    @staticmethod
+    def _build_user(item, user_fields, state, now):
+        user_model = get_user_model()
+        verified = item["is_verified"] if item["is_verified"] is not None else state["verified"]
+        values = {
+            "email": item["email"],
+            "username": item["username"],
+            "password": item["password_hash"],
+            "is_active": state["active"] or verified,
+        }
+        if "is_verified" in user_fields:
+            values["is_verified"] = verified
+        if "phone" in user_fields:
+            values["phone"] = item["phone"]
+        if "terms_and_conditions" in user_fields and item["terms"]:
+            values["terms_and_conditions"] = now
+        return user_model(**values)
+
+    @staticmethod
+    def _insert(items, state):
+        user_model = get_user_model()
+        profile_model = get_profile_model_cls()
+        user_fields = {field.name for field in user_model._meta.concrete_fields}
+        profile_fields = {field.name for field in profile_model._meta.concrete_fields}
+        now = timezone.now()
+        default_role = get_setting("DEFAULT_PROFILE_ROLE")
+
+        users = [UserImportService._build_user(item, user_fields, state, now) for item in items]
+        using = router.db_for_write(user_model)
+        with transaction.atomic(using=using):
+            user_model.objects.bulk_create(users)
+            if any(user.pk is None for user in users):
+                ids = dict(
+                    user_model._base_manager.filter(email__in=[user.email for user in users]).values_list(
+                        "email", "pk"
+                    )
+                )
+                for user in users:
+                    user.pk = ids[user.email]
+
+            profiles = []
+            for user, item in zip(users, items):
+                values = {
+                    name: value
+                    for name, value in item["profile"].items()
+                    if name in profile_fields and value is not None
+                }
+                values.setdefault("role", default_role)
+                profiles.append(profile_model(user=user, is_default=True, **values))
+            profile_model.objects.bulk_create(profiles)
+
+            if "default_profile" in user_fields:
+                # One correlated UPDATE per batch instead of a CASE per row.
+                user_model._base_manager.filter(pk__in=[user.pk for user in users]).update(
+                    default_profile=Subquery(
+                        profile_model._base_manager.filter(user_id=OuterRef("pk"), is_default=True).values("pk")[
+                            :1
+                        ]
+                    )
+                )
+                for user, profile in zip(users, profiles):
+                    user.default_profile_id = profile.pk
+
+            queued = 0
+            if state["send_confirmation"]:
+                # Same transaction (unless the outbox is routed to another database): created
+                # users always have their confirmation queued.
+                pending = [user for user in users if not getattr(user, "is_verified", True)]
+                queued = EmailOutboxService.enqueue_for_users(pending, "email_confirmation")
+        return users, queued
+
+    @staticmethod
+    def _insert_one_by_one(items, state):
+        created, queued = [], 0
+        for item in items:
+            try:
+                users, item_queued = UserImportService._insert([item], state)
+            except IntegrityError:
+                UserImportService._skip(state, item["line_number"], item["email"], "conflict")
+                continue
+            created.extend(users)
+            queued += item_queued
+        return created, queued
+
+    @staticmethod
+    def _import_batch(batch, state):
+        items = UserImportService._validate(batch, state)
+        skipped = len(batch) - len(items)
+        if state["dry_run"] or not items:
+            return {"created": len(items) if state["dry_run"] else 0, "skipped": skipped, "queued_emails": 0}
+
+        UserImportService._hash_passwords(items, state["pool"])
+        try:
+            users, queued = UserImportService._insert(items, state)
+        except IntegrityError:
+            # A concurrent signup took an email/username/phone after validation.
+            users, queued = UserImportService._insert_one_by_one(items, state)
+        skipped += len(items) - len(users)
+
+        logger.info("user_import_batch created=%s skipped=%s queued=%s", len(users), skipped, queued)
+        return {"created": len(users), "skipped": skipped, "queued_emails": queued}
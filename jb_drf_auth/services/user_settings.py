@@ -12,6 +12,8 @@ class UserSettingsService:
     def _save_user_settings(user, payload):
         user.settings = payload
         user.save(update_fields=["settings"])
+        if hasattr(user, "clear_request_cache"):
+            user.clear_request_cache("settings")
         return user
 
     @classmethod
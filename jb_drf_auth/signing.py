@@ -0,0 +1,225 @@
+"""Asymmetric JWT signing keys, key rotation and JWKS publishing."""
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+import jwt
+from django.core.signals import setting_changed
+from django.utils.translation import gettext_lazy as _
+from jwt import ExpiredSignatureError, InvalidAlgorithmError, InvalidTokenError
+from jwt.algorithms import get_default_algorithms, has_crypto
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenBackendExpiredToken
+from rest_framework_simplejwt.settings import api_settings
+
+from jb_drf_auth.conf import get_setting
+
+
+ASYMMETRIC_ALGORITHMS = (
+    "RS256",
+    "RS384",
+    "RS512",
+    "PS256",
+    "PS384",
+    "PS512",
+    "ES256",
+    "ES384",
+    "ES512",
+    "EdDSA",
+)
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    public_key: Any
+    private_key: Any = None
+
+
+@dataclass(frozen=True)
+class KeySet:
+    keys: dict
+    active: SigningKey | None
+
+    def get(self, kid):
+        return self.keys.get(kid)
+
+
+_keyset = None
+_token_backend = None
+
+
+def _load_key(entry, index):
+    if not isinstance(entry, dict):
+        raise RuntimeError(f"JB_DRF_AUTH_JWT_SIGNING_KEYS[{index}] must be a dict.")
+
+    kid = str(entry.get("KID") or "").strip()
+    algorithm = entry.get("ALGORITHM") or "RS256"
+    if not kid:
+        raise RuntimeError(f"JB_DRF_AUTH_JWT_SIGNING_KEYS[{index}] is missing KID.")
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise RuntimeError(f"Unsupported JWT signing algorithm '{algorithm}' for kid '{kid}'.")
+    if not has_crypto:
+        raise RuntimeError("Install 'cryptography' to sign tokens with asymmetric keys.")
+
+    jws_algorithm = get_default_algorithms()[algorithm]
+    private_pem = entry.get("PRIVATE_KEY")
+    public_pem = entry.get("PUBLIC_KEY")
+    private_key = jws_algorithm.prepare_key(private_pem) if private_pem else None
+    if public_pem:
+        public_key = jws_algorithm.prepare_key(public_pem)
+    elif private_key is not None:
+        public_key = private_key.public_key()
+    else:
+        raise RuntimeError(f"JWT signing key '{kid}' needs PRIVATE_KEY or PUBLIC_KEY.")
+
+    return SigningKey(kid=kid, algorithm=algorithm, public_key=public_key, private_key=private_key)
+
+
+def get_keyset():
+    """
+    Parsed JWT_SIGNING_KEYS. The active key signs new tokens; every configured key
+    (active and retiring) verifies tokens and is published in the JWKS.
+    """
+    global _keyset
+    if _keyset is not None:
+        return _keyset
+
+    keys = {}
+    for index, entry in enumerate(get_setting("JWT_SIGNING_KEYS") or ()):
+        key = _load_key(entry, index)
+        if key.kid in keys:
+            raise RuntimeError(f"Duplicated JWT signing key id '{key.kid}'.")
+        keys[key.kid] = key
+
+    active_kid = get_setting("JWT_ACTIVE_KID")
+    if active_kid:
+        active = keys.get(active_kid)
+        if active is None or active.private_key is None:
+            raise RuntimeError(f"JWT_ACTIVE_KID '{active_kid}' has no configured private key.")
+    else:
+        active = next((key for key in keys.values() if key.private_key is not None), None)
+
+    _keyset = KeySet(keys=keys, active=active)
+    return _keyset
+
+
+def asymmetric_signing_enabled():
+    return bool(get_keyset().keys)
+
+
+def reset_signing_keys():
+    global _keyset, _token_backend
+    _keyset = None
+    _token_backend = None
+
+
+def _on_setting_changed(setting, **kwargs):
+    if setting in (
+        "JB_DRF_AUTH",
+        "JB_DRF_AUTH_JWT_SIGNING_KEYS",
+        "JB_DRF_AUTH_JWT_ACTIVE_KID",
+        "SIMPLE_JWT",
+    ):
+        reset_signing_keys()
+
+
+setting_changed.connect(_on_setting_changed)
+
+
+class JbTokenBackend(TokenBackend):
+    """
+    SimpleJWT backend that signs with the active key (adding its `kid` header)
+    and verifies with whichever configured key the token header names.
+    """
+
+    def __init__(self, keyset):
+        default_key = keyset.active or next(iter(keyset.keys.values()))
+        super().__init__(
+            default_key.algorithm,
+            audience=api_settings.AUDIENCE,
+            issuer=api_settings.ISSUER,
+            leeway=api_settings.LEEWAY,
+            json_encoder=api_settings.JSON_ENCODER,
+        )
+        self.keyset = keyset
+
+    def encode(self, payload):
+        active = self.keyset.active
+        if active is None:
+            raise TokenBackendError(_("No active signing key configured."))
+
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            active.private_key,
+            algorithm=active.algorithm,
+            headers={"kid": active.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify=True):
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except InvalidTokenError as exc:
+            raise TokenBackendError(_("Token is invalid")) from exc
+
+        key = self.keyset.get(kid)
+        if key is None:
+            raise TokenBackendError(_("Token is invalid"))
+
+        try:
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    "verify_aud": self.audience is not None,
+                    "verify_signature": verify,
+                },
+            )
+        except InvalidAlgorithmError as exc:
+            raise TokenBackendError(_("Invalid algorithm specified")) from exc
+        except ExpiredSignatureError as exc:
+            raise TokenBackendExpiredToken(_("Token is expired")) from exc
+        except InvalidTokenError as exc:
+            raise TokenBackendError(_("Token is invalid")) from exc
+
+
+def get_token_backend():
+    """
+    Backend used by jb_drf_auth tokens: JbTokenBackend when signing keys are
+    configured, SimpleJWT's own backend otherwise.
+    """
+    global _token_backend
+    if _token_backend is None:
+        keyset = get_keyset()
+        if keyset.keys:
+            _token_backend = JbTokenBackend(keyset)
+        else:
+            from rest_framework_simplejwt.state import token_backend
+
+            _token_backend = token_backend
+    return _token_backend
+
+
+def build_jwks():
+    """
+    Public JWK set for every configured key, ready to be served as JSON.
+    """
+    keys = []
+    for key in get_keyset().keys.values():
+        jwk = json.loads(get_default_algorithms()[key.algorithm].to_jwk(key.public_key))
+        jwk.update({"kid": key.kid, "alg": key.algorithm, "use": "sig"})
+        keys.append(jwk)
+    return {"keys": keys}
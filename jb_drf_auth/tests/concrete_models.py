@@ -0,0 +1,41 @@
+"""Helpers for tests that need real database queries."""
+
+from django.core.management import call_command
+
+from jb_drf_auth.tests.testapp.models import (
+    DeliveryStat,
+    Device,
+    DuplicateCandidate,
+    EmailLog,
+    EmailOutbox,
+    OtpCode,
+    Person,
+    Profile,
+    SmsLog,
+    SocialAccount,
+    User,
+)
+
+__all__ = [
+    "DeliveryStat",
+    "Device",
+    "DuplicateCandidate",
+    "EmailLog",
+    "EmailOutbox",
+    "OtpCode",
+    "Person",
+    "Profile",
+    "SmsLog",
+    "SocialAccount",
+    "User",
+    "ensure_schema",
+]
+
+_schema_ready = False
+
+
+def ensure_schema():
+    global _schema_ready
+    if not _schema_ready:
+        call_command("migrate", run_syncdb=True, verbosity=0)
+        _schema_ready = True
@@ -1,5 +1,6 @@
 SECRET_KEY = "test-secret-key"
 DEBUG = True
+ALLOWED_HOSTS = ["testserver"]
 USE_TZ = True
 TIME_ZONE = "UTC"
 LANGUAGE_CODE = "en-us"
@@ -10,13 +11,23 @@ INSTALLED_APPS = [
     "rest_framework",
     "safedelete",
     "jb_drf_auth",
+    "jb_drf_auth.tests.testapp",
 ]
 
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+    },
+    # Only used by the AuthLogRouter and ReadReplicaRouter tests.
+    "logs": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
 }
 
 MIDDLEWARE = []
@@ -25,10 +36,16 @@ ROOT_URLCONF = "jb_drf_auth.urls"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+AUTH_USER_MODEL = "testapp.User"
+
 JB_DRF_AUTH = {
-    "PROFILE_MODEL": "auth.User",
-    "DEVICE_MODEL": "auth.User",
-    "OTP_MODEL": "auth.User",
-    "SMS_LOG_MODEL": "auth.User",
-    "EMAIL_LOG_MODEL": "auth.User",
+    "PROFILE_MODEL": "testapp.Profile",
+    "DEVICE_MODEL": "testapp.Device",
+    "OTP_MODEL": "testapp.OtpCode",
+    "SMS_LOG_MODEL": "testapp.SmsLog",
+    "EMAIL_LOG_MODEL": "testapp.EmailLog",
+    "EMAIL_OUTBOX_MODEL": "testapp.EmailOutbox",
+    "DELIVERY_STAT_MODEL": "testapp.DeliveryStat",
+    "SOCIAL_ACCOUNT_MODEL": "testapp.SocialAccount",
+    "DUPLICATE_CANDIDATE_MODEL": "testapp.DuplicateCandidate",
 }
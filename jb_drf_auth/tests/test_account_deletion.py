@@ -0,0 +1,132 @@
+import os
+import unittest
+from datetime import timedelta
+from io import StringIO
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from safedelete.models import SOFT_DELETE_CASCADE
+
+from jb_drf_auth.services.account_deletion import CASCADE_CHECKPOINT_KEY, AccountDeletionService
+from jb_drf_auth.tests.concrete_models import (
+    Device,
+    OtpCode,
+    Profile,
+    SocialAccount,
+    User,
+    ensure_schema,
+)
+from jb_drf_auth.views.account_management import delete_account
+
+
+class AccountDeletionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        cache.delete(CASCADE_CHECKPOINT_KEY)
+        for model in (SocialAccount, OtpCode, Device, Profile, User):
+            model._base_manager.all().delete()
+        self.user = self._user("ana")
+        self.other = self._user("luis")
+
+    def _user(self, name):
+        user = User.objects.create(username=name, email=f"{name}@example.com")
+        Profile.objects.create(user=user, first_name=name, is_default=True)
+        Profile.objects.create(user=user, first_name=f"{name} work")
+        Device.objects.create(user=user, token=f"{name}-phone")
+        OtpCode.objects.create(user=user, code="123456", channel="email", valid_until=timezone.now())
+        return user
+
+    def test_delete_account_only_marks_the_user(self):
+        request = APIRequestFactory().delete("/auth/account/delete/", {"confirmation": True}, format="json")
+        force_authenticate(request, user=self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = delete_account(request)
+
+        self.assertEqual(response.status_code, 200)
+        writes = [query["sql"] for query in ctx.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(writes), 1)
+        user = User._base_manager.get(pk=self.user.pk)
+        self.assertIsNotNone(user.deleted)
+        self.assertFalse(user.is_active)
+        self.assertEqual(Profile.objects.filter(user=self.user).count(), 2)
+
+    def test_cascade_soft_deletes_owned_records_in_batches(self):
+        AccountDeletionService.mark_deleted(self.user)
+        third = self._user("eva")
+        AccountDeletionService.mark_deleted(third)
+
+        counts = AccountDeletionService.cascade(batch_size=1)
+
+        self.assertEqual(
+            counts, {"testapp.Profile": 4, "testapp.Device": 2, "testapp.OtpCode": 2}
+        )
+        self.assertFalse(Profile.objects.filter(user__in=[self.user, third]).exists())
+        self.assertTrue(Profile._base_manager.filter(user=self.user, deleted_by_cascade=True).exists())
+        self.assertEqual(Profile.objects.filter(user=self.other).count(), 2)
+        self.assertEqual(Device.objects.filter(user=self.other).count(), 1)
+
+    def test_cascade_resumes_from_checkpoint(self):
+        AccountDeletionService.mark_deleted(self.user)
+        AccountDeletionService.cascade()
+        Profile._base_manager.filter(user=self.user).update(deleted=None)
+
+        self.assertEqual(AccountDeletionService.cascade()["testapp.Profile"], 0)
+        AccountDeletionService.mark_deleted(self.other)
+        self.assertEqual(AccountDeletionService.cascade()["testapp.Profile"], 2)
+        self.assertEqual(AccountDeletionService.cascade(restart=True)["testapp.Profile"], 2)
+
+    def test_undelete_restores_cascaded_records(self):
+        AccountDeletionService.mark_deleted(self.user)
+        AccountDeletionService.cascade()
+
+        User._base_manager.get(pk=self.user.pk).undelete(force_policy=SOFT_DELETE_CASCADE)
+
+        self.assertEqual(Profile.objects.filter(user=self.user).count(), 2)
+
+    def test_purge_hard_deletes_only_expired_records(self):
+        SocialAccount.objects.create(user=self.user, provider="google", provider_user_id="g-1")
+        AccountDeletionService.mark_deleted(self.user)
+        AccountDeletionService.cascade()
+        User._base_manager.filter(pk=self.user.pk).update(deleted=timezone.now() - timedelta(days=40))
+        Device.objects.filter(user=self.other).delete()
+        progress = []
+
+        counts = AccountDeletionService.purge(
+            timezone.now() - timedelta(days=30), batch_size=1, on_progress=lambda *step: progress.append(step)
+        )
+
+        self.assertEqual(counts["testapp.User"], 1)
+        self.assertEqual(counts["testapp.Profile"], 0)
+        self.assertFalse(User._base_manager.filter(pk=self.user.pk).exists())
+        self.assertFalse(Profile._base_manager.filter(user_id=self.user.pk).exists())
+        self.assertFalse(SocialAccount.objects.exists())
+        self.assertTrue(Device._base_manager.filter(user=self.other).exists())
+        self.assertEqual(progress, [("testapp.User", self.user.pk, 1)])
+
+    def test_command_runs_cascade_and_purge(self):
+        AccountDeletionService.mark_deleted(self.user)
+        out = StringIO()
+
+        call_command("jb_auth_process_deletions", days=0, pause=0, stdout=out)
+
+        self.assertIn("Soft deleted testapp.Profile: 2", out.getvalue())
+        self.assertIn("testapp.User: 1", out.getvalue())
+        self.assertFalse(User._base_manager.filter(pk=self.user.pk).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
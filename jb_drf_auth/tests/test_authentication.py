@@ -0,0 +1,123 @@
+import os
+import unittest
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from jb_drf_auth.authentication import JbTokenUser, StatelessJWTAuthentication
+from jb_drf_auth.revocation import bump_user_token_version, get_token_cache
+from jb_drf_auth.services.me import MeService
+from jb_drf_auth.services.tokens import TokensService
+from jb_drf_auth.tests.concrete_models import Profile, User, ensure_schema
+from jb_drf_auth.tokens import AccessToken
+
+
+class StatelessJWTAuthenticationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        get_token_cache().clear()
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.user = User.objects.create_user(
+            email="stateless@example.com", password="secret-pass", is_verified=True
+        )
+        self.profile = Profile.objects.create(user=self.user, role="ADMIN", is_default=True)
+        self.factory = APIRequestFactory()
+        self.auth = StatelessJWTAuthentication()
+
+    def _request(self, method="get", user=None):
+        tokens = TokensService.get_tokens_for_user(user or self.user, self.profile)
+        return getattr(self.factory, method)(
+            "/auth/me/", HTTP_AUTHORIZATION=f"Bearer {tokens['accessToken']}"
+        )
+
+    def test_tokens_carry_principal_claims(self):
+        tokens = TokensService.get_tokens_for_user(self.user, self.profile)
+        access = AccessToken(tokens["accessToken"])
+
+        self.assertEqual(access["profile_id"], self.profile.pk)
+        self.assertEqual(access["role"], "ADMIN")
+        self.assertTrue(access["is_active"])
+        self.assertTrue(access["is_verified"])
+        self.assertEqual(access["ver"], 0)
+
+    def test_safe_request_builds_principal_without_queries(self):
+        request = self._request()
+
+        with CaptureQueriesContext(connection) as ctx:
+            user, _token = self.auth.authenticate(request)
+            self.assertIsInstance(user, JbTokenUser)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user.profile_id, self.profile.pk)
+            self.assertEqual(user.role, "ADMIN")
+            self.assertTrue(user.is_active and user.is_verified and user.is_authenticated)
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertFalse(user.is_loaded)
+
+    def test_principal_loads_model_lazily_once(self):
+        user, _token = self.auth.authenticate(self._request())
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(user.email, "stateless@example.com")
+            self.assertFalse(user.is_staff)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertTrue(user.is_loaded)
+
+    def test_principal_username_comes_from_the_model(self):
+        self.user.username = "stateless"
+        self.user.save(update_fields=["username"])
+        user, _token = self.auth.authenticate(self._request())
+
+        self.assertEqual(user.get_username(), self.user.get_username())
+        self.assertEqual(str(user), str(self.user))
+        for client in ("mobile", "web"):
+            response = MeService.get_me(user, client, self.profile.pk)
+            data = response["user"]["data"] if client == "web" else response
+            self.assertEqual(data["username"], "stateless")
+            self.assertEqual(data["email"], "stateless@example.com")
+
+    def test_unsafe_request_gets_model_instance(self):
+        user, _token = self.auth.authenticate(self._request("post"))
+
+        self.assertIsInstance(user, User)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_bumped_token_version_rejects_older_tokens(self):
+        request = self._request()
+        bump_user_token_version(self.user.pk)
+
+        with self.assertRaises(AuthenticationFailed) as ctx:
+            self.auth.authenticate(request)
+        self.assertEqual(ctx.exception.get_codes(), "token_revoked")
+
+        user, _token = self.auth.authenticate(self._request())
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_deactivating_user_revokes_issued_tokens(self):
+        request = self._request()
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(request)
+
+    def test_unrelated_user_update_keeps_tokens_valid(self):
+        request = self._request()
+        user = User.objects.get(pk=self.user.pk)
+        user.username = "renamed"
+        user.save()
+
+        authenticated, _token = self.auth.authenticate(request)
+        self.assertEqual(authenticated.pk, self.user.pk)
@@ -0,0 +1,148 @@
+import os
+import unittest
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from jb_drf_auth.services.delivery_logs import DeliveryLogService
+from jb_drf_auth.services.password_reset import PasswordResetService
+from jb_drf_auth.tests.concrete_models import DeliveryStat, EmailLog, SmsLog, User, ensure_schema
+
+
+class DeliveryLogTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        EmailLog.objects.all().delete()
+        SmsLog.objects.all().delete()
+        DeliveryStat.objects.all().delete()
+        User.objects.all().delete()
+
+    def _email(self, **kwargs):
+        return EmailLog.objects.create(
+            **DeliveryLogService.email_log_fields(
+                "ana@example.com",
+                "Confirma tu correo",
+                "text https://example.com/verify?token=secret",
+                "<p>html</p>",
+                status=kwargs.pop("status", "sent"),
+                template_name=kwargs.pop("template_name", "email_confirmation"),
+                context=kwargs.pop("context", {"verify_url": "https://example.com/verify?token=secret"}),
+            )
+        )
+
+    def _age(self, model, days):
+        model.objects.update(created=timezone.now() - timedelta(days=days))
+
+    def test_digest_mode_keeps_template_and_context_digest_only(self):
+        log = self._email()
+
+        self.assertEqual((log.text_body, log.html_body, log.body_compressed), ("", None, None))
+        self.assertEqual(log.subject, "Confirma tu correo")
+        self.assertEqual(len(log.context_digest), 64)
+        self.assertEqual(
+            log.context_digest,
+            DeliveryLogService.context_digest({"verify_url": "https://example.com/verify?token=secret"}),
+        )
+        self.assertNotEqual(log.context_digest, DeliveryLogService.context_digest({"verify_url": "other"}))
+
+    def test_compressed_and_full_modes_keep_bodies(self):
+        with override_settings(JB_DRF_AUTH_DELIVERY_LOG_BODY_MODE="compressed"):
+            compressed = self._email()
+        with override_settings(JB_DRF_AUTH_DELIVERY_LOG_BODY_MODE="full"):
+            full = self._email()
+
+        compressed.refresh_from_db()
+        self.assertEqual(compressed.text_body, "")
+        self.assertEqual(
+            DeliveryLogService.decompress_body(compressed),
+            {"text": "text https://example.com/verify?token=secret", "html": "<p>html</p>"},
+        )
+        self.assertEqual(full.html_body, "<p>html</p>")
+        self.assertIsNone(DeliveryLogService.decompress_body(full))
+
+    def test_sms_logs_do_not_store_the_otp_code(self):
+        fields = DeliveryLogService.sms_log_fields(
+            "+525512345678", "Tu codigo es 123456", status="sent", template_name="otp", context={"code": "123456"}
+        )
+
+        log = SmsLog.objects.create(**fields)
+        self.assertEqual(log.message, "")
+        self.assertNotIn("123456", log.context_digest)
+        self.assertEqual(log.template_name, "otp")
+
+    def test_password_reset_logs_the_template(self):
+        User.objects.create(username="ana", email="ana@example.com")
+
+        with patch("jb_drf_auth.services.password_reset.get_email_provider"):
+            self.assertTrue(PasswordResetService.send_reset_email("ana@example.com"))
+
+        log = EmailLog.objects.get()
+        self.assertEqual((log.template_name, log.status, log.text_body), ("password_reset", "sent", ""))
+        self.assertIsNotNone(log.context_digest)
+
+    def test_rollup_counts_per_day_provider_template_and_status(self):
+        self._email()
+        self._email(status="failed")
+        self._age(EmailLog, 2)
+        self._email()
+        self._email(template_name=None)
+
+        DeliveryLogService.rollup("email", EmailLog, DeliveryStat)
+        self._email()
+        DeliveryLogService.rollup("email", EmailLog, DeliveryStat)
+
+        today = timezone.localdate()
+        counts = {
+            (row.day, row.template_name, row.status): row.count
+            for row in DeliveryStat.objects.filter(channel="email")
+        }
+        self.assertEqual(
+            counts,
+            {
+                (today - timedelta(days=2), "email_confirmation", "sent"): 1,
+                (today - timedelta(days=2), "email_confirmation", "failed"): 1,
+                (today, "email_confirmation", "sent"): 2,
+                (today, "", "sent"): 1,
+            },
+        )
+
+    def test_prune_deletes_expired_rows_in_batches(self):
+        for _ in range(3):
+            self._email()
+        self._age(EmailLog, 100)
+        kept = self._email()
+
+        removed = DeliveryLogService.prune(EmailLog, timezone.now() - timedelta(days=90), batch_size=2)
+
+        self.assertEqual(removed, 3)
+        self.assertEqual(list(EmailLog.objects.values_list("pk", flat=True)), [kept.pk])
+
+    def test_command_rolls_up_before_pruning(self):
+        self._email()
+        self._age(EmailLog, 100)
+        SmsLog.objects.create(**DeliveryLogService.sms_log_fields("+525512345678", "x", status="sent"))
+        out = StringIO()
+
+        call_command("jb_auth_prune_logs", pause=0, stdout=out)
+
+        self.assertIn("email: Deleted 1 logs older than 90 days, 1 daily buckets updated.", out.getvalue())
+        self.assertIn("sms: Deleted 0 logs", out.getvalue())
+        self.assertFalse(EmailLog.objects.exists())
+        self.assertEqual(DeliveryStat.objects.get(channel="email").count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
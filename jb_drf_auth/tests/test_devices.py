@@ -0,0 +1,359 @@
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from io import StringIO
+
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from jb_drf_auth.authentication import StatelessJWTAuthentication
+from jb_drf_auth.revocation import get_token_cache, is_token_revoked
+from jb_drf_auth.services.devices import DeviceService
+from jb_drf_auth.services.tokens import TokensService
+from jb_drf_auth.tests.concrete_models import Device, Profile, User, ensure_schema
+from jb_drf_auth.tokens import AccessToken
+from jb_drf_auth.views import (
+    BulkRevokeDevicesView,
+    DeviceListView,
+    SignOutOtherDevicesView,
+)
+
+
+def data_queries(ctx):
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"] not in ("BEGIN", "COMMIT") and "SAVEPOINT" not in query["sql"]
+    ]
+
+
+class DeviceTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        Device.all_objects.all().delete()
+        User.objects.all().delete()
+        self.user = User.objects.create(username="device-owner", email="devices@example.com")
+
+
+class DeviceRegistrationTests(DeviceTestCase):
+    def test_login_with_token_is_a_single_upsert(self):
+        DeviceService.register(self.user, {"token": "t-1", "name": "Phone", "notification_token": "n-1"})
+
+        with CaptureQueriesContext(connection) as ctx:
+            DeviceService.register(
+                self.user, {"token": "t-1", "name": "Renamed", "notification_token": "n-2"}
+            )
+
+        self.assertEqual(len(data_queries(ctx)), 1)
+        device = Device.objects.get(user=self.user)
+        self.assertEqual((device.token, device.name, device.notification_token), ("t-1", "Renamed", "n-2"))
+
+    def test_signed_out_device_is_restored_on_login(self):
+        DeviceService.register(self.user, {"token": "t-1", "notification_token": "n-1"})
+        Device.objects.get(user=self.user).delete()
+
+        DeviceService.register(self.user, {"token": "t-1", "notification_token": "n-1"})
+
+        self.assertEqual(Device.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Device.all_objects.filter(user=self.user).count(), 1)
+
+    def test_same_token_for_two_users_creates_two_devices(self):
+        other = User.objects.create(username="other", email="other@example.com")
+        DeviceService.register(self.user, {"token": "t-1", "notification_token": "n-1"})
+        DeviceService.register(other, {"token": "t-1", "notification_token": "n-1"})
+
+        self.assertEqual(Device.objects.filter(token="t-1").count(), 2)
+
+    def test_tokenless_logins_are_deduplicated_by_notification_token(self):
+        for _ in range(3):
+            DeviceService.register(self.user, {"name": "Tablet", "notification_token": "n-1"})
+        DeviceService.register(self.user, {"name": "Tablet", "notification_token": "n-2"})
+
+        self.assertEqual(
+            sorted(Device.objects.filter(user=self.user).values_list("notification_token", flat=True)),
+            ["n-1", "n-2"],
+        )
+
+    def test_user_token_pair_is_unique(self):
+        Device.objects.create(user=self.user, token="t-1")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Device.objects.create(user=self.user, token="t-1")
+
+
+class DevicesApiTests(DeviceTestCase):
+    def setUp(self):
+        super().setUp()
+        get_token_cache().clear()
+        Profile.all_objects.all().delete()
+        self.profile = Profile.objects.create(user=self.user, is_default=True)
+        self.factory = APIRequestFactory()
+
+    def _create_devices(self, count, user=None):
+        start = Device.all_objects.count()
+        Device.objects.bulk_create(
+            [
+                Device(user=user or self.user, token=f"t-{index}", notification_token=f"n-{index}")
+                for index in range(start, start + count)
+            ]
+        )
+
+    def _call(self, view, method="get", path="/auth/devices/", data=None, tokens=None):
+        request = getattr(self.factory, method)(path, data, format="json" if method == "post" else None)
+        tokens = tokens or TokensService.get_tokens_for_user(self.user, self.profile)
+        force_authenticate(request, user=self.user, token=AccessToken(tokens["accessToken"]))
+        return view.as_view()(request)
+
+    def _list_all(self, page_size):
+        seen, path = [], f"/auth/devices/?page_size={page_size}"
+        while path:
+            response = self._call(DeviceListView, path=path)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            path = response.data["next"]
+        return seen
+
+    def test_list_walks_every_device_once_in_keyset_order(self):
+        self._create_devices(7)
+        # Ties on linked_at are broken by id.
+        Device.objects.filter(pk__in=list(Device.objects.values_list("pk", flat=True)[:4])).update(
+            linked_at=timezone.now()
+        )
+        self._create_devices(2, user=User.objects.create(username="other", email="o@example.com"))
+
+        seen = self._list_all(page_size=3)
+
+        expected = list(
+            Device.objects.filter(user=self.user).order_by("-linked_at", "-id").values_list("pk", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_list_query_count_does_not_grow_with_devices(self):
+        self._create_devices(3)
+        with CaptureQueriesContext(connection) as small:
+            self._call(DeviceListView, path="/auth/devices/?page_size=50")
+        self._create_devices(40)
+        with CaptureQueriesContext(connection) as large:
+            response = self._call(DeviceListView, path="/auth/devices/?page_size=50")
+
+        self.assertEqual(len(response.data["results"]), 43)
+        self.assertEqual(len(data_queries(small)), len(data_queries(large)))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self._call(DeviceListView, path="/auth/devices/?cursor=not-a-cursor")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_revoke_uses_constant_queries_and_ignores_foreign_devices(self):
+        self._create_devices(30)
+        other = User.objects.create(username="other", email="o@example.com")
+        foreign = Device.objects.create(user=other, token="foreign")
+        ids = list(Device.objects.filter(user=self.user).values_list("pk", flat=True)[:20])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._call(
+                BulkRevokeDevicesView, "post", "/auth/devices/revoke/", {"ids": [*ids, foreign.pk]}
+            )
+
+        self.assertEqual(response.data, {"revoked": 20})
+        self.assertEqual(len(data_queries(ctx)), 2)
+        self.assertEqual(Device.objects.filter(user=self.user).count(), 10)
+        self.assertTrue(Device.objects.filter(pk=foreign.pk).exists())
+
+    def test_sign_out_others_keeps_current_device(self):
+        self._create_devices(5)
+        current = TokensService.get_tokens_for_user(self.user, self.profile, {"token": "t-0"})
+        other_session = TokensService.get_tokens_for_user(self.user, self.profile, {"token": "t-1"})
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._call(
+                SignOutOtherDevicesView, "post", "/auth/devices/sign-out-others/", {}, tokens=current
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["revoked"], 4)
+        self.assertEqual(len([sql for sql in data_queries(ctx) if sql.startswith("UPDATE")]), 1)
+        self.assertEqual(list(Device.objects.filter(user=self.user).values_list("token", flat=True)), ["t-0"])
+
+        auth = StatelessJWTAuthentication()
+        for tokens, revoked in ((other_session, True), (current, True), (response.data["tokens"], False)):
+            request = self.factory.get(
+                "/auth/me/", HTTP_AUTHORIZATION=f"Bearer {tokens['accessToken']}"
+            )
+            if revoked:
+                with self.assertRaises(AuthenticationFailed):
+                    auth.authenticate(request)
+            else:
+                self.assertEqual(auth.authenticate(request)[0].pk, self.user.pk)
+
+
+class DevicePruningTests(DeviceTestCase):
+    def setUp(self):
+        super().setUp()
+        get_token_cache().clear()
+        self.now = timezone.now()
+        self.other = User.objects.create(username="other", email="o@example.com")
+
+    def _device(self, token, days_linked, days_seen=None, user=None, notification_token=None):
+        device = Device.objects.create(
+            user=user or self.user, token=token, notification_token=notification_token or f"n-{token}"
+        )
+        Device.objects.filter(pk=device.pk).update(
+            linked_at=self.now - timedelta(days=days_linked),
+            last_seen_at=None if days_seen is None else self.now - timedelta(days=days_seen),
+        )
+        return device
+
+    def test_login_records_last_seen(self):
+        DeviceService.register(self.user, {"token": "t-1", "notification_token": "n-1"})
+
+        self.assertIsNotNone(Device.objects.get(user=self.user).last_seen_at)
+
+    def test_touch_coalesces_writes(self):
+        device = self._device("t-1", days_linked=10, days_seen=5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(DeviceService.touch(self.user, "t-1"))
+            self.assertFalse(DeviceService.touch(self.user, "t-1"))
+            self.assertFalse(DeviceService.touch(self.user, "t-1"))
+
+        self.assertEqual(len(data_queries(ctx)), 1)
+        device.refresh_from_db()
+        self.assertGreater(device.last_seen_at, self.now - timedelta(minutes=1))
+
+    def test_prune_soft_deletes_devices_not_seen_since_cutoff(self):
+        never_seen = self._device("t-1", days_linked=200)
+        stale = self._device("t-2", days_linked=200, days_seen=120)
+        active = self._device("t-3", days_linked=200, days_seen=3)
+        recent = self._device("t-4", days_linked=2)
+
+        removed = DeviceService.prune_stale(self.now - timedelta(days=90), batch_size=2)
+
+        self.assertEqual(removed, 2)
+        self.assertEqual(set(Device.objects.values_list("pk", flat=True)), {active.pk, recent.pk})
+        self.assertEqual(
+            set(Device.deleted_objects.values_list("pk", flat=True)), {never_seen.pk, stale.pk}
+        )
+
+    def test_pruned_devices_are_signed_out(self):
+        self._device("t-1", days_linked=200)
+        self._device("t-2", days_linked=200, user=self.other)
+        self._device("t-3", days_linked=1)
+        profiles = {user.pk: Profile.objects.create(user=user, is_default=True) for user in (self.user, self.other)}
+        tokens = {
+            token: TokensService.get_tokens_for_user(user, profiles[user.pk], {"token": token})
+            for token, user in (("t-1", self.user), ("t-2", self.other), ("t-3", self.user))
+        }
+
+        with patch("jb_drf_auth.revocation.time.time", return_value=time.time() + 1):
+            DeviceService.prune_stale(self.now - timedelta(days=90))
+
+        revoked = {token: is_token_revoked(AccessToken(pair["accessToken"]).payload) for token, pair in tokens.items()}
+        self.assertEqual(revoked, {"t-1": True, "t-2": True, "t-3": False})
+
+    def test_prune_hard_also_purges_soft_deleted_rows(self):
+        signed_out = self._device("t-1", days_linked=200)
+        DeviceService.revoke(self.user, [signed_out.pk])
+        self._device("t-2", days_linked=200)
+        kept = self._device("t-3", days_linked=1)
+
+        removed = DeviceService.prune_stale(self.now - timedelta(days=90), hard=True)
+
+        self.assertEqual(removed, 2)
+        self.assertEqual(list(Device.all_objects.values_list("pk", flat=True)), [kept.pk])
+
+    def test_dedupe_keeps_most_recently_seen_push_token_across_users(self):
+        old = self._device("t-1", days_linked=30, days_seen=20, notification_token="push-1")
+        newest = self._device("t-2", days_linked=30, days_seen=1, user=self.other, notification_token="push-1")
+        unique = self._device("t-3", days_linked=30, notification_token="push-2")
+
+        removed = DeviceService.dedupe_notification_tokens(batch_size=1)
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(set(Device.objects.values_list("pk", flat=True)), {newest.pk, unique.pk})
+        self.assertTrue(Device.deleted_objects.filter(pk=old.pk).exists())
+
+    def test_command_dry_run_reports_without_writing(self):
+        self._device("t-1", days_linked=200)
+        self._device("t-2", days_linked=10, notification_token="push-1")
+        self._device("t-3", days_linked=5, user=self.other, notification_token="push-1")
+
+        stdout = StringIO()
+        call_command("jb_auth_prune_devices", "--dry-run", "--pause", "0", stdout=stdout)
+
+        self.assertIn("Would remove 1 stale devices and 1 duplicated notification tokens.", stdout.getvalue())
+        self.assertEqual(Device.objects.count(), 3)
+
+
+class DedupeDevicesCommandTests(DeviceTestCase):
+    def setUp(self):
+        super().setUp()
+        # Recreate a table from before the unique (user, token) constraint existed.
+        self.constraint = Device._meta.constraints[0]
+        # SQLite rebuilds the table from the model state, so hide the constraint meanwhile.
+        with patch.object(Device._meta, "constraints", []):
+            with connection.schema_editor() as editor:
+                editor.remove_constraint(Device, self.constraint)
+
+    def tearDown(self):
+        Device._base_manager.all().delete()
+        with connection.schema_editor() as editor:
+            editor.add_constraint(Device, self.constraint)
+        super().tearDown()
+
+    def test_collapses_duplicates_keeping_newest_row(self):
+        other = User.objects.create(username="other", email="other@example.com")
+        token_rows = [Device.objects.create(user=self.user, token="t-1") for _ in range(3)]
+        tokenless_rows = [
+            Device.objects.create(user=self.user, notification_token="n-1") for _ in range(4)
+        ]
+        kept_other = Device.objects.create(user=other, token="t-1")
+
+        stdout = StringIO()
+        call_command("jb_auth_dedupe_devices", "--batch-size", "1", stdout=stdout)
+
+        self.assertEqual(
+            set(Device.all_objects.values_list("pk", flat=True)),
+            {token_rows[-1].pk, tokenless_rows[-1].pk, kept_other.pk},
+        )
+        self.assertIn("Duplicate devices removed: 5 (by token: 2, by notification token: 3).", stdout.getvalue())
+
+    def test_prefers_the_newest_live_row(self):
+        live = Device.objects.create(user=self.user, token="t-1")
+        signed_out = Device.objects.create(user=self.user, token="t-1")
+        signed_out.delete()
+
+        call_command("jb_auth_dedupe_devices", stdout=StringIO())
+
+        self.assertEqual(list(Device.all_objects.values_list("pk", flat=True)), [live.pk])
+
+    def test_dry_run_only_counts(self):
+        for _ in range(2):
+            Device.objects.create(user=self.user, token="t-1")
+
+        stdout = StringIO()
+        call_command("jb_auth_dedupe_devices", "--dry-run", stdout=stdout)
+
+        self.assertEqual(Device.all_objects.count(), 2)
+        self.assertIn("Duplicate devices found: 1", stdout.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import unittest
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from jb_drf_auth.services.duplicates import DuplicateDetectionService
+from jb_drf_auth.tests.concrete_models import DuplicateCandidate, Person, Profile, ensure_schema
+
+
+class DuplicateDetectionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        Person.objects.all().delete()
+        DuplicateCandidate.objects.all().delete()
+        self.ana = Person.objects.create(
+            first_name="José", last_name_1="Pérez", birthday=date(1990, 4, 12),
+            mobile_phone="+52 55 1234-5678", contact_email="Jose@Example.com", national_id="ABC-123",
+        )
+        self.ana_otp = Person.objects.create(mobile_phone="+525512345678")
+        self.ana_social = Person.objects.create(
+            first_name="jose", last_name_1="perez", birthday=date(1990, 4, 12), contact_email="jose@example.com "
+        )
+        self.ana_clinic = Person.objects.create(first_name="Jose", national_id="abc123")
+        Person.objects.create(
+            first_name="Jose", last_name_1="Perez", birthday=date(1991, 4, 12),
+            mobile_phone="+525500000000", contact_email="other@example.com", national_id="XYZ",
+        )
+
+    def _groups(self, key_type, **kwargs):
+        return list(DuplicateDetectionService.find_groups(Person.objects.all(), key_type, **kwargs))
+
+    def test_groups_records_by_normalized_blocking_keys(self):
+        self.assertEqual(self._groups("phone"), [("+525512345678", [self.ana.pk, self.ana_otp.pk])])
+        self.assertEqual(self._groups("email"), [("jose@example.com", [self.ana.pk, self.ana_social.pk])])
+        self.assertEqual(self._groups("national_id"), [("ABC123", [self.ana.pk, self.ana_clinic.pk])])
+        self.assertEqual(
+            self._groups("name_birthday"), [("jose perez|1990-04-12", [self.ana.pk, self.ana_social.pk])]
+        )
+
+    def test_partitions_and_small_chunks_find_the_same_groups(self):
+        expected = self._groups("email")
+
+        self.assertEqual(self._groups("email", chunk_size=2, partitions=3), expected)
+
+    def test_digest_collisions_are_verified_against_real_keys(self):
+        with patch("jb_drf_auth.services.duplicates._key_hash", return_value=7):
+            groups = self._groups("national_id")
+
+        self.assertEqual(groups, [("ABC123", [self.ana.pk, self.ana_clinic.pk])])
+
+    def test_saving_again_keeps_the_review_status(self):
+        DuplicateDetectionService.save_candidates(Person, "email", self._groups("email"))
+        DuplicateCandidate.objects.update(status="dismissed")
+        third = Person.objects.create(contact_email="JOSE@example.com")
+
+        DuplicateDetectionService.save_candidates(Person, "email", self._groups("email"))
+
+        candidate = DuplicateCandidate.objects.get()
+        self.assertEqual(candidate.status, "dismissed")
+        self.assertEqual(candidate.record_ids, [self.ana.pk, self.ana_social.pk, third.pk])
+        self.assertEqual(candidate.model_label, "testapp.person")
+
+    def test_command_writes_review_table(self):
+        out = StringIO()
+        call_command("jb_auth_find_duplicates", model="testapp.Person", stdout=out)
+
+        self.assertEqual(DuplicateCandidate.objects.count(), 4)
+        self.assertIn("phone: 1, email: 1, national_id: 1, name_birthday: 1", out.getvalue())
+
+    def test_command_requires_the_review_model(self):
+        with override_settings(JB_DRF_AUTH={**settings.JB_DRF_AUTH, "DUPLICATE_CANDIDATE_MODEL": None}):
+            with patch.object(DuplicateDetectionService, "find_groups") as find_groups:
+                with self.assertRaisesRegex(CommandError, "JB_DRF_AUTH_DUPLICATE_CANDIDATE_MODEL"):
+                    call_command("jb_auth_find_duplicates", model="testapp.Person", stdout=StringIO())
+
+        find_groups.assert_not_called()
+
+    def test_command_dry_run_prints_groups_only(self):
+        out = StringIO()
+        call_command("jb_auth_find_duplicates", model="testapp.Person", keys="national_id", dry_run=True, stdout=out)
+
+        self.assertEqual(DuplicateCandidate.objects.count(), 0)
+        self.assertIn("ABC123", out.getvalue())
+        self.assertIn(f"{self.ana.pk}, {self.ana_clinic.pk}", out.getvalue())
+
+    def test_profile_model_uses_user_columns(self):
+        self.assertEqual(DuplicateDetectionService.key_columns(Profile, "phone"), ("user__phone",))
+        self.assertIsNone(DuplicateDetectionService.key_columns(Profile, "national_id"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
 django.setup()
 
 from rest_framework import status
+from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory, force_authenticate
 
 from jb_drf_auth.exceptions import SocialAuthError
@@ -47,10 +48,6 @@ class DummyUser:
         self.is_authenticated = kwargs.get("is_authenticated", True)
         self.is_verified = kwargs.get("is_verified", True)
         self.deleted = kwargs.get("deleted", None)
-        self.deleted_called = False
-
-    def delete(self):
-        self.deleted_called = True
 
 
 class EndpointTests(unittest.TestCase):
@@ -135,6 +132,7 @@ class EndpointTests(unittest.TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("device", response.data)
 
+    @patch("jb_drf_auth.services.client.DeviceService.register")
     @patch("jb_drf_auth.services.client.MeService.get_me_mobile")
     @patch("jb_drf_auth.services.client.get_device_model_cls")
     @patch("jb_drf_auth.services.login.TokensService.get_tokens_for_user")
@@ -145,6 +143,7 @@ class EndpointTests(unittest.TestCase):
         get_tokens_for_user,
         get_device_model_cls,
         get_me_mobile,
+        register_device,
     ):
         user = DummyUser()
         user.get_default_profile = MagicMock(return_value=MagicMock())
@@ -172,14 +171,15 @@ class EndpointTests(unittest.TestCase):
         response = BasicLoginView.as_view()(request)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data.get("device_registered"), True)
-        device_model.objects.update_or_create.assert_called_once_with(
-            user=user,
-            token="t",
-            defaults={
+        register_device.assert_called_once_with(
+            user,
+            {
                 "platform": "ios",
                 "name": "iPhone",
+                "token": "t",
                 "notification_token": "push-123",
             },
+            device_model=device_model,
         )
 
     @patch("jb_drf_auth.views.login.SwitchProfileSerializer")
@@ -540,12 +540,13 @@ class EndpointTests(unittest.TestCase):
         response = AccountUpdateView.as_view()(request)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-    def test_delete_account_success(self):
+    @patch("jb_drf_auth.views.account_management.AccountDeletionService.mark_deleted")
+    def test_delete_account_success(self, mark_deleted):
         request = self.factory.delete("/auth/account/delete/", {"confirmation": True}, format="json")
         force_authenticate(request, user=self.user)
         response = delete_account(request)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(self.user.deleted_called)
+        mark_deleted.assert_called_once_with(self.user)
 
     def test_delete_account_missing_confirmation(self):
         request = self.factory.delete("/auth/account/delete/", {}, format="json")
@@ -589,12 +590,12 @@ class EndpointTests(unittest.TestCase):
     def test_profile_viewset_queryset_filtered_by_user(self, get_profile_model_cls):
         profile_model = MagicMock()
         get_profile_model_cls.return_value = profile_model
-        request = self.factory.get("/auth/profiles/")
+        request = Request(self.factory.get("/auth/profiles/"))
         view = ProfileViewSet()
         view.request = request
         view.request.user = self.user
         view.get_queryset()
-        profile_model.objects.filter.assert_called_once_with(user=self.user)
+        profile_model.objects.filter.assert_called_once_with(user_id=self.user.pk)
 
     def test_profile_viewset_permissions_authenticated(self):
         view = ProfileViewSet()
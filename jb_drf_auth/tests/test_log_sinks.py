@@ -0,0 +1,159 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.test import override_settings
+
+from jb_drf_auth.log_sinks import BufferedDatabaseLogSink, DatabaseLogSink
+from jb_drf_auth.services.delivery_logs import DeliveryLogService
+from jb_drf_auth.services.password_reset import PasswordResetService
+from jb_drf_auth.tests.concrete_models import EmailLog, SmsLog, User, ensure_schema
+from jb_drf_auth.utils import get_delivery_log_sink
+
+
+def email_fields(index=0):
+    return DeliveryLogService.email_log_fields(
+        f"user{index}@example.com", "Subject", "text", None, status="sent", template_name="password_reset"
+    )
+
+
+class RecordingSink(BufferedDatabaseLogSink):
+    """Records batches written by the background thread (its own SQLite connection has no tables)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+        self.written = threading.Event()
+
+    def _write_batch(self, model, batch):
+        self.batches.append((threading.current_thread().name, model, len(batch)))
+        self.written.set()
+
+
+class LogSinkTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        EmailLog.objects.all().delete()
+        SmsLog.objects.all().delete()
+        User.objects.all().delete()
+
+    def test_default_sink_writes_synchronously_and_is_shared(self):
+        sink = get_delivery_log_sink()
+
+        sink.write(EmailLog, email_fields())
+
+        self.assertIsInstance(sink, DatabaseLogSink)
+        self.assertIs(get_delivery_log_sink(), sink)
+        self.assertEqual(EmailLog.objects.count(), 1)
+
+    def test_logging_sink_skips_the_database(self):
+        User.objects.create(username="ana", email="ana@example.com")
+
+        with override_settings(JB_DRF_AUTH_DELIVERY_LOG_SINK="jb_drf_auth.log_sinks.LoggingLogSink"):
+            with patch("jb_drf_auth.services.password_reset.get_email_provider"):
+                with self.assertLogs("jb_drf_auth.delivery", level="INFO") as logs:
+                    PasswordResetService.send_reset_email("ana@example.com")
+
+        self.assertIsInstance(get_delivery_log_sink(), DatabaseLogSink)
+        self.assertFalse(EmailLog.objects.exists())
+        self.assertIn("model=testapp.EmailLog to_email=ana@example.com", logs.output[0])
+        self.assertIn("status=sent template_name=password_reset", logs.output[0])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork()")
+    def test_fork_while_the_start_lock_is_held_does_not_deadlock_the_child(self):
+        sink = RecordingSink(batch_size=100, flush_interval_ms=60000)
+        with BufferedDatabaseLogSink._start_lock:
+            pid = os.fork()
+            if pid == 0:
+                # Child: the lock copied from the parent was held; the first write must not block.
+                acquired = BufferedDatabaseLogSink._start_lock.acquire(timeout=5)
+                if acquired:
+                    BufferedDatabaseLogSink._start_lock.release()
+                    sink.write(EmailLog, email_fields())
+                os._exit(0 if acquired and sink._queue.qsize() == 1 else 1)
+        _pid, status = os.waitpid(pid, 0)
+
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+    def test_concurrent_first_writes_share_one_queue(self):
+        sink = RecordingSink(batch_size=100, flush_interval_ms=60000)
+        self.addCleanup(sink.close)
+        start = sink._start
+        started = []
+        barrier = threading.Barrier(4)
+
+        def slow_start():
+            started.append(1)
+            threading.Event().wait(0.05)
+            start()
+
+        def first_write(index):
+            barrier.wait()
+            sink.write(EmailLog, email_fields(index))
+
+        with patch.object(sink, "_start", side_effect=slow_start):
+            threads = [threading.Thread(target=first_write, args=(index,)) for index in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        sink.close()
+        self.assertEqual(len(started), 1)
+        self.assertEqual(sum(size for _thread, _model, size in sink.batches), 4)
+
+    def test_buffered_sink_flushes_full_batches_from_the_background_thread(self):
+        sink = RecordingSink(batch_size=3, flush_interval_ms=60000)
+        self.addCleanup(sink.close)
+
+        for index in range(3):
+            sink.write(EmailLog, email_fields(index))
+
+        self.assertTrue(sink.written.wait(2))
+        self.assertEqual(sink.batches, [("jb-drf-auth-log-sink", EmailLog, 3)])
+
+    def test_buffered_sink_flushes_partial_batches_after_the_interval(self):
+        sink = RecordingSink(batch_size=100, flush_interval_ms=20)
+        self.addCleanup(sink.close)
+
+        sink.write(EmailLog, email_fields())
+        sink.write(SmsLog, DeliveryLogService.sms_log_fields("+525512345678", "hola", status="sent"))
+
+        self.assertTrue(sink.written.wait(2))
+        sink.flush()
+        self.assertEqual(sorted(model.__name__ for _thread, model, _rows in sink.batches), ["EmailLog", "SmsLog"])
+
+    def test_buffered_sink_writes_pending_rows_on_close(self):
+        sink = BufferedDatabaseLogSink(batch_size=100, flush_interval_ms=60000)
+        for index in range(5):
+            sink.write(EmailLog, email_fields(index))
+        self.assertEqual(EmailLog.objects.count(), 0)
+
+        sink.close()
+
+        self.assertEqual(EmailLog.objects.count(), 5)
+        self.assertFalse(sink._thread.is_alive())
+
+    def test_buffered_sink_writes_synchronously_when_the_buffer_is_full(self):
+        sink = BufferedDatabaseLogSink(batch_size=100, flush_interval_ms=60000, max_pending=2)
+        self.addCleanup(sink.close)
+
+        with self.assertLogs("jb_drf_auth.log_sinks", level="WARNING"):
+            for index in range(3):
+                sink.write(EmailLog, email_fields(index))
+
+        self.assertEqual(list(EmailLog.objects.values_list("to_email", flat=True)), ["user2@example.com"])
+
+
+if __name__ == "__main__":
+    unittest.main()
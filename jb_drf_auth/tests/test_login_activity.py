@@ -0,0 +1,195 @@
+import io
+import os
+import unittest
+from datetime import timedelta
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from jb_drf_auth.providers.base import SocialIdentity
+from jb_drf_auth.services import login_activity
+from jb_drf_auth.services.login_activity import FLUSH_DUE_KEY, LoginActivityService
+from jb_drf_auth.services.social_auth import SocialAuthService
+from jb_drf_auth.tests.concrete_models import Profile, SocialAccount, User, ensure_schema
+
+
+def updates(ctx, table):
+    return [query["sql"] for query in ctx.captured_queries if query["sql"].startswith(f'UPDATE "{table}"')]
+
+
+def writes(ctx, table):
+    return updates(ctx, table) + [
+        query["sql"] for query in ctx.captured_queries if query["sql"].startswith(f'INSERT INTO "{table}"')
+    ]
+
+
+class LoginActivityTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        SocialAccount.objects.all().delete()
+        Profile.all_objects.all().delete()
+        User._base_manager.all().delete()
+        cache.clear()
+        # Start inside a flush window: touches are only buffered.
+        cache.add(FLUSH_DUE_KEY, 1, 60)
+        self.ana = User.objects.create(username="ana", email="ana@example.com")
+        self.bob = User.objects.create(username="bob", email="bob@example.com")
+
+
+class LoginActivityTests(LoginActivityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ana_account = SocialAccount.objects.create(user=self.ana, provider="google", provider_user_id="g-ana")
+        self.bob_account = SocialAccount.objects.create(user=self.bob, provider="google", provider_user_id="g-bob")
+
+    def last_login_at(self, account):
+        return SocialAccount.objects.get(pk=account.pk).last_login_at
+
+    def test_touches_are_coalesced_and_flushed_in_one_update(self):
+        first = timezone.now() - timedelta(minutes=5)
+        for minutes in range(3):
+            LoginActivityService.touch_social_account(self.ana_account, first + timedelta(minutes=minutes))
+        LoginActivityService.touch_social_account(self.bob_account, first)
+
+        self.assertIsNone(self.last_login_at(self.ana_account))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(LoginActivityService.flush(), 2)
+
+        self.assertEqual(len(updates(ctx, "testapp_socialaccount")), 1)
+        self.assertEqual(self.last_login_at(self.ana_account), first + timedelta(minutes=2))
+        self.assertEqual(self.last_login_at(self.bob_account), first)
+        self.assertEqual(LoginActivityService.flush(), 0)
+
+    def test_the_first_login_after_the_interval_flushes(self):
+        LoginActivityService.touch_social_account(self.ana_account)
+        cache.delete(FLUSH_DUE_KEY)
+
+        LoginActivityService.touch_social_account(self.bob_account)
+
+        self.assertEqual(SocialAccount.objects.filter(last_login_at__isnull=False).count(), 2)
+
+    def test_pending_touches_are_written_at_exit(self):
+        login_activity._exit_flush_registered = False
+        when = timezone.now()
+        with patch("jb_drf_auth.services.login_activity.atexit.register") as register:
+            LoginActivityService.touch_social_account(self.ana_account, when)
+            LoginActivityService.touch_social_account(self.bob_account, when)
+
+        register.assert_called_once_with(login_activity._flush_at_exit)
+        login_activity._flush_at_exit()
+
+        self.assertEqual(SocialAccount.objects.filter(last_login_at=when).count(), 2)
+
+    def test_flush_waits_for_a_slot_that_is_not_stored_yet(self):
+        when = timezone.now()
+        # A concurrent touch between numbering its slot and storing it.
+        cache.set(login_activity._value_key("social_account", self.ana_account.pk), when)
+        cache.add(login_activity._pending_key("social_account", self.ana_account.pk), 1)
+        cache.add(login_activity.SEQUENCE_KEY, 0, None)
+        slot = cache.incr(login_activity.SEQUENCE_KEY)
+        LoginActivityService.touch_social_account(self.bob_account, when)
+
+        self.assertEqual(LoginActivityService.flush(), 0)
+        cache.set(login_activity._slot_key(slot), ("social_account", self.ana_account.pk))
+
+        self.assertEqual(LoginActivityService.flush(), 2)
+        self.assertEqual(self.last_login_at(self.ana_account), when)
+        self.assertEqual(self.last_login_at(self.bob_account), when)
+
+    def test_flush_skips_a_slot_still_missing_on_the_next_flush(self):
+        cache.add(login_activity.SEQUENCE_KEY, 0, None)
+        cache.incr(login_activity.SEQUENCE_KEY)
+        LoginActivityService.touch_social_account(self.bob_account)
+
+        self.assertEqual(LoginActivityService.flush(), 0)
+        self.assertEqual(LoginActivityService.flush(), 1)
+        self.assertIsNotNone(self.last_login_at(self.bob_account))
+
+    def test_login_during_a_flush_is_not_lost(self):
+        first = timezone.now() - timedelta(minutes=5)
+        later = first + timedelta(minutes=1)
+        LoginActivityService.touch_social_account(self.ana_account, first)
+        get_many = cache.get_many
+
+        def racing_get_many(keys, *args, **kwargs):
+            values = get_many(keys, *args, **kwargs)
+            if login_activity._value_key("social_account", self.ana_account.pk) in keys:
+                # A login lands between the flush reading the value and clearing the slot.
+                LoginActivityService.touch_social_account(self.ana_account, later)
+            return values
+
+        with patch.object(cache, "get_many", side_effect=racing_get_many):
+            self.assertEqual(LoginActivityService.flush(), 1)
+        self.assertEqual(self.last_login_at(self.ana_account), first)
+
+        self.assertEqual(LoginActivityService.flush(), 1)
+        self.assertEqual(self.last_login_at(self.ana_account), later)
+
+    def test_command_flushes_the_buffer(self):
+        LoginActivityService.touch_social_account(self.ana_account)
+        output = io.StringIO()
+
+        call_command("jb_auth_flush_login_activity", "--batch-size", "1", stdout=output)
+
+        self.assertIn("Login timestamps written: 1.", output.getvalue())
+        self.assertIsNotNone(self.last_login_at(self.ana_account))
+
+    def test_zero_interval_writes_on_every_login(self):
+        with override_settings(JB_DRF_AUTH_LOGIN_TOUCH_FLUSH_SECONDS=0):
+            LoginActivityService.touch_social_account(self.ana_account)
+
+        self.assertIsNotNone(self.last_login_at(self.ana_account))
+
+
+class SocialAccountWriteTests(LoginActivityTestCase):
+    def _login(self, raw_response):
+        identity = SocialIdentity(
+            provider="google",
+            provider_user_id="g-1",
+            email="ana@example.com",
+            email_verified=True,
+            raw_response=raw_response,
+        )
+        with patch("jb_drf_auth.services.social_auth.get_social_provider") as get_provider:
+            get_provider.return_value.authenticate.return_value = identity
+            with CaptureQueriesContext(connection) as ctx:
+                SocialAuthService.login_or_register(
+                    "google", {"id_token": f"token-{raw_response.get('iat')}"}, "web", None
+                )
+        return writes(ctx, "testapp_socialaccount")
+
+    def test_unchanged_provider_data_is_not_rewritten(self):
+        Profile.objects.create(user=self.ana, first_name="Ana", is_default=True)
+        self._login({"sub": "g-1", "name": "Ana", "iat": 1})
+        account = SocialAccount.objects.get()
+        self.assertEqual(account.raw_response_sha256, SocialAuthService.raw_response_sha256({"sub": "g-1", "name": "Ana"}))
+
+        self.assertEqual(self._login({"sub": "g-1", "name": "Ana", "iat": 2}), [])
+        self.assertEqual(SocialAccount.objects.get().raw_response["iat"], 1)
+
+        self.assertEqual(len(self._login({"sub": "g-1", "name": "Ana B", "iat": 3})), 1)
+        self.assertEqual(SocialAccount.objects.get().raw_response["name"], "Ana B")
+
+        LoginActivityService.flush()
+        account = SocialAccount.objects.get()
+        self.assertGreater(account.last_login_at, account.created)
+        # Password reset and email confirmation tokens hash last_login: logins leave it alone.
+        self.assertIsNone(User.objects.get(pk=self.ana.pk).last_login)
+
+
+if __name__ == "__main__":
+    unittest.main()
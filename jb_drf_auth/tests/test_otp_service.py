@@ -85,6 +85,7 @@ class OtpServiceTests(unittest.TestCase):
         get_otp_model_cls.return_value = otp_model
 
         user_qs = MagicMock()
+        user_qs.select_related.return_value = user_qs
         user_qs.first.return_value = None
         user_cls.objects.filter.return_value = user_qs
 
@@ -0,0 +1,113 @@
+import os
+import unittest
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from jb_drf_auth.services.person_search import (
+    IDENTIFIER_FIELDS,
+    PersonSearchService,
+    person_search_indexes,
+)
+from jb_drf_auth.tests.concrete_models import Person, Profile, User, ensure_schema
+from jb_drf_auth.views import PersonSearchView
+
+
+class PersonSearchTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        Person.objects.all().delete()
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.staff = User.objects.create(username="staff", email="staff@example.com", is_staff=True)
+        self.factory = APIRequestFactory()
+        settings_override = override_settings(JB_DRF_AUTH_PERSON_SEARCH_MODEL="testapp.Person")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _search(self, query, user=None):
+        request = self.factory.get("/auth/admin/persons/search/", {"q": query} if query is not None else {})
+        force_authenticate(request, user=user or self.staff)
+        return PersonSearchView.as_view()(request)
+
+    def test_identifier_exact_match_ranks_before_prefix_and_names(self):
+        exact = Person.objects.create(first_name="Luis", national_id="ABC123")
+        prefix = Person.objects.create(first_name="Mario", national_id="ABC1234")
+        Person.objects.create(first_name="Abcdario", last_name_1="Ruiz")
+        Person.objects.create(first_name="Pedro", national_id="XYZ999")
+
+        response = self._search("abc123")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.data["results"]], [exact.pk, prefix.pk])
+        self.assertEqual([row["rank"] for row in response.data["results"]], [1.0, 0.75])
+
+    def test_every_word_must_prefix_a_name(self):
+        match = Person.objects.create(first_name="Ana", last_name_1="Lopez", last_name_2="Diaz")
+        Person.objects.create(first_name="Ana", last_name_1="Martinez")
+
+        response = self._search("  ana   lop ")
+
+        self.assertEqual([row["id"] for row in response.data["results"]], [match.pk])
+        self.assertNotIn("address_line_1", response.data["results"][0])
+
+    def test_results_are_keyset_paginated_by_rank(self):
+        Person.objects.bulk_create(
+            [Person(first_name=f"Ana{index}", contact_email=f"ana{index}@example.com") for index in range(5)]
+        )
+        Person.objects.create(first_name="Zoe", contact_email="ana@example.com")
+        seen, path = [], "/auth/admin/persons/search/?q=ana&page_size=2"
+        while path:
+            request = self.factory.get(path)
+            force_authenticate(request, user=self.staff)
+            response = PersonSearchView.as_view()(request)
+            seen.extend((row["rank"], row["id"]) for row in response.data["results"])
+            path = response.data["next"]
+
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(seen, sorted(seen, key=lambda item: (-item[0], item[1])))
+
+    def test_defaults_to_the_profile_model(self):
+        settings_override = override_settings(JB_DRF_AUTH_PERSON_SEARCH_MODEL=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        profile = Profile.objects.create(user=self.staff, first_name="Carla", last_name_1="Nunez")
+
+        response = self._search("carla nu")
+
+        self.assertEqual([row["id"] for row in response.data["results"]], [profile.pk])
+        self.assertEqual(response.data["results"][0]["user"], self.staff.pk)
+
+    def test_short_queries_are_rejected(self):
+        self.assertEqual(self._search("ab").status_code, 400)
+        self.assertEqual(self._search(None).status_code, 400)
+
+    def test_requires_staff(self):
+        user = User.objects.create(username="plain", email="plain@example.com")
+
+        self.assertEqual(self._search("ana", user=user).status_code, 403)
+
+    def test_postgresql_strategy_uses_indexable_operators(self):
+        queryset = PersonSearchService._search_trigram(Person.objects.all(), "ana lopez", list(IDENTIFIER_FIELDS))
+
+        lookups = [child for child in queryset.query.where.children[0].children if isinstance(child, TrigramWordSimilar)]
+        self.assertEqual(len(lookups), 1)
+        self.assertIn("rank", queryset.query.annotations)
+
+        names = [index.name for index in person_search_indexes("testapp_person")]
+        self.assertEqual(len(names), 5)
+        self.assertTrue(all(len(name) <= 30 for name in names))
+
+
+if __name__ == "__main__":
+    unittest.main()
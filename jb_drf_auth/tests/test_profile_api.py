@@ -0,0 +1,138 @@
+import os
+import unittest
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from jb_drf_auth.serializers import ProfileSerializer
+from jb_drf_auth.tests.concrete_models import Profile, User, ensure_schema
+from jb_drf_auth.views import ProfileViewSet
+
+
+def data_queries(ctx):
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"] not in ("BEGIN", "COMMIT") and "SAVEPOINT" not in query["sql"]
+    ]
+
+
+class ProfileWithUserSerializer(ProfileSerializer):
+    class Meta(ProfileSerializer.Meta):
+        exclude = ("deleted", "deleted_by_cascade", "settings")
+
+
+class ProfileApiTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.user = User.objects.create(username="profiles", email="profiles@example.com")
+        self.default = Profile.objects.create(user=self.user, first_name="Ana", is_default=True)
+        self.factory = APIRequestFactory()
+
+    def _create_profiles(self, count):
+        Profile.objects.bulk_create(
+            [Profile(user=self.user, first_name=f"P{index}", last_name_1="X") for index in range(count)]
+        )
+
+    def _list(self, path="/auth/profiles/"):
+        request = self.factory.get(path)
+        force_authenticate(request, user=self.user)
+        return ProfileViewSet.as_view({"get": "list"})(request)
+
+    def test_requests_do_not_mutate_the_shared_serializer(self):
+        depth = getattr(ProfileSerializer.Meta, "depth", None)
+        narrow = ProfileSerializer(self.default, fields=["id"])
+
+        self._list("/auth/profiles/?fields=id,first_name")
+        wide = ProfileSerializer(self.default)
+
+        self.assertEqual(getattr(ProfileSerializer.Meta, "depth", None), depth)
+        self.assertEqual(set(narrow.data), {"id"})
+        self.assertIn("last_name_1", wide.data)
+
+    def test_sparse_fieldset_narrows_the_select(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._list("/auth/profiles/?fields=id,first_name")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{"id": self.default.pk, "first_name": "Ana"}])
+        (sql,) = data_queries(ctx)
+        self.assertNotIn("last_name_1", sql)
+        self.assertNotIn("national_id", sql)
+
+    def test_unknown_fields_and_relations_are_rejected(self):
+        response = self._list("/auth/profiles/?fields=id,password&expand=user")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {"fields", "expand"})
+
+    def test_list_is_unpaginated_unless_requested(self):
+        self._create_profiles(3)
+
+        response = self._list()
+
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 4)
+
+    def test_cursor_pagination_walks_every_profile_default_first(self):
+        self._create_profiles(6)
+        seen, path = [], "/auth/profiles/?page_size=3&fields=id"
+        while path:
+            response = self._list(path)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            path = response.data["next"]
+
+        expected = list(Profile.objects.filter(user=self.user).order_by("-is_default", "id").values_list("pk", flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(seen[0], self.default.pk)
+
+    def test_pagination_can_be_enabled_by_setting(self):
+        settings_override = override_settings(JB_DRF_AUTH_PROFILE_PAGINATION_ENABLED=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        response = self._list()
+
+        self.assertEqual(set(response.data), {"next", "results"})
+
+    def test_list_query_count_does_not_grow_with_profiles(self):
+        with CaptureQueriesContext(connection) as small:
+            self._list("/auth/profiles/?page_size=50")
+        self._create_profiles(30)
+        with CaptureQueriesContext(connection) as large:
+            response = self._list("/auth/profiles/?page_size=50")
+
+        self.assertEqual(len(response.data["results"]), 31)
+        self.assertEqual(len(data_queries(small)), len(data_queries(large)))
+
+    def test_expand_renders_nested_relation_in_one_query(self):
+        queryset = ProfileWithUserSerializer.optimize_queryset(
+            Profile.objects.filter(user=self.user), fields=["id", "user"], expand=["user"]
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = ProfileWithUserSerializer(queryset, many=True, fields=["id", "user"], expand=["user"]).data
+
+        self.assertEqual(len(data_queries(ctx)), 1)
+        self.assertEqual(data[0]["user"]["email"], "profiles@example.com")
+        self.assertNotIn("password", data[0]["user"])
+        collapsed = ProfileWithUserSerializer(self.default, fields=["user"]).data
+        self.assertEqual(collapsed, {"user": self.user.pk})
+
+
+if __name__ == "__main__":
+    unittest.main()
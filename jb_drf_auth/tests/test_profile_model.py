@@ -0,0 +1,154 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from jb_drf_auth.tests.concrete_models import Profile, ensure_schema
+
+
+User = get_user_model()
+
+
+def data_queries(ctx):
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"] not in ("BEGIN", "COMMIT") and "SAVEPOINT" not in query["sql"]
+    ]
+
+
+class ProfileModelSaveTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.user = User.objects.create(username="profile-owner", email="owner@example.com")
+
+    def test_patching_loaded_profile_issues_single_update(self):
+        Profile.objects.create(user=self.user, first_name="A", is_default=True)
+        profile = Profile.objects.get(user=self.user)
+
+        profile.first_name = "B"
+        with CaptureQueriesContext(connection) as ctx:
+            profile.save()
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertTrue(ctx.captured_queries[0]["sql"].startswith("UPDATE"))
+
+    def test_switching_default_clears_other_defaults(self):
+        first = Profile.objects.create(user=self.user, first_name="A", is_default=True)
+        second = Profile.objects.create(user=self.user, first_name="B", is_default=False)
+        second = Profile.objects.get(pk=second.pk)
+
+        second.is_default = True
+        with CaptureQueriesContext(connection) as ctx:
+            second.save()
+
+        # Clear the previous default, save the profile, move the user pointer.
+        self.assertEqual(len(data_queries(ctx)), 3)
+        first.refresh_from_db()
+        self.assertFalse(first.is_default)
+        self.assertEqual(User.objects.get(pk=self.user.pk).default_profile_id, second.pk)
+
+    def test_picture_change_deletes_old_file_without_select(self):
+        profile = Profile.objects.create(user=self.user, picture="old.jpg")
+        profile = Profile.objects.get(pk=profile.pk)
+
+        profile.picture = "new.jpg"
+        with patch.object(profile.picture.storage, "delete") as delete:
+            with CaptureQueriesContext(connection) as ctx:
+                profile.save()
+            delete.assert_called_once_with("old.jpg")
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_unchanged_picture_is_not_deleted_on_repeated_saves(self):
+        profile = Profile.objects.create(user=self.user, picture="same.jpg")
+
+        with patch.object(profile.picture.storage, "delete") as delete:
+            profile.save()
+            profile.save(update_fields=["first_name"])
+            delete.assert_not_called()
+
+
+class DefaultProfilePointerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.user = User.objects.create(username="pointer-owner", email="pointer@example.com")
+
+    def test_creating_default_profile_sets_user_pointer(self):
+        profile = Profile.objects.create(user=self.user, is_default=True)
+
+        self.assertEqual(User.objects.get(pk=self.user.pk).default_profile_id, profile.pk)
+        self.assertEqual(profile.user.default_profile_id, profile.pk)
+
+    def test_unsetting_or_soft_deleting_default_clears_pointer(self):
+        profile = Profile.objects.create(user=self.user, is_default=True)
+        profile.delete()
+        self.assertIsNone(User.objects.get(pk=self.user.pk).default_profile_id)
+
+        other = Profile.objects.create(user=self.user, is_default=True)
+        other.is_default = False
+        other.save(update_fields=["is_default"])
+        self.assertIsNone(User.objects.get(pk=self.user.pk).default_profile_id)
+
+    def test_only_one_live_default_profile_per_user(self):
+        Profile.objects.create(user=self.user, is_default=True)
+        second = Profile.objects.create(user=self.user)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Profile.objects.filter(pk=second.pk).update(is_default=True)
+
+    def test_get_default_profile_uses_joined_pointer_without_queries(self):
+        profile = Profile.objects.create(user=self.user, is_default=True)
+        user = User.objects.select_related("default_profile").get(pk=self.user.pk)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(user.get_default_profile(), profile)
+            self.assertEqual(user.get_default_profile(), profile)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_get_default_profile_falls_back_when_pointer_missing(self):
+        profile = Profile.objects.create(user=self.user, is_default=True)
+        User.objects.filter(pk=self.user.pk).update(default_profile=None)
+        user = User.objects.get(pk=self.user.pk)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(user.get_default_profile(), profile)
+            self.assertEqual(user.get_default_profile(), profile)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_backfill_command_links_defaults_and_clears_stale_pointers(self):
+        other_user = User.objects.create(username="pointer-other", email="other@example.com")
+        profile = Profile.objects.create(user=self.user, is_default=True)
+        stale = Profile.objects.create(user=other_user)
+        User.objects.filter(pk=self.user.pk).update(default_profile=None)
+        User.objects.filter(pk=other_user.pk).update(default_profile=stale.pk)
+
+        out = StringIO()
+        call_command("jb_auth_backfill_default_profiles", batch_size=1, stdout=out)
+
+        self.assertEqual(User.objects.get(pk=self.user.pk).default_profile_id, profile.pk)
+        self.assertIsNone(User.objects.get(pk=other_user.pk).default_profile_id)
+        self.assertIn("Default profiles linked: 1. Stale pointers cleared: 1.", out.getvalue())
@@ -0,0 +1,163 @@
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import connections, router
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from jb_drf_auth.checks import read_replicas_check
+from jb_drf_auth.replicas import use_read_replica
+from jb_drf_auth.serializers import UserUpdateSerializer
+from jb_drf_auth.services.otp import OtpService
+from jb_drf_auth.services.register import RegisterService
+from jb_drf_auth.services.social_auth import SocialAuthService
+from jb_drf_auth.tests.concrete_models import OtpCode, Profile, SocialAccount, User, ensure_schema
+from jb_drf_auth.views import ProfileViewSet
+
+
+def new_request():
+    request_started.send(sender=None)
+
+
+class ReadReplicaRouterTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+        # The replica gets the full schema (migrated before the router refuses it).
+        if "testapp_user" not in connections["replica"].introspection.table_names():
+            call_command("migrate", database="replica", run_syncdb=True, verbosity=0)
+
+    def setUp(self):
+        routing = override_settings(
+            DATABASE_ROUTERS=["jb_drf_auth.routers.ReadReplicaRouter"],
+            JB_DRF_AUTH_READ_REPLICAS=("replica",),
+        )
+        routing.enable()
+        self.addCleanup(routing.disable)
+        for alias in ("default", "replica"):
+            for model in (SocialAccount, OtpCode, Profile, User):
+                model._base_manager.using(alias).all().delete()
+        cache.clear()
+        new_request()
+        self.addCleanup(new_request)
+
+    def _replicated_user(self, email="ana@example.com"):
+        user = User.objects.create(username=email.split("@")[0], email=email)
+        User._base_manager.using("replica").bulk_create([User(pk=user.pk, username=user.username, email=email)])
+        new_request()
+        return user
+
+    def test_reads_use_a_replica_only_inside_a_replica_block(self):
+        self.assertEqual(router.db_for_read(User), "default")
+        with use_read_replica():
+            self.assertEqual(router.db_for_read(User), "replica")
+        self.assertEqual(router.db_for_read(User), "default")
+        self.assertFalse(router.allow_migrate_model("replica", User))
+        self.assertTrue(router.allow_migrate_model("default", User))
+
+    def test_a_write_pins_the_request_and_makes_the_user_sticky(self):
+        user = self._replicated_user()
+
+        with use_read_replica(user):
+            user.save(update_fields=["modified"])
+            self.assertEqual(router.db_for_read(User), "default")
+
+        new_request()
+        with use_read_replica():
+            self.assertEqual(router.db_for_read(User), "replica")
+        with use_read_replica(user):
+            self.assertEqual(router.db_for_read(User), "default")
+
+        new_request()
+        cache.clear()
+        with use_read_replica(user):
+            self.assertEqual(router.db_for_read(User), "replica")
+
+    def test_rows_read_from_a_replica_are_saved_on_the_primary(self):
+        user = self._replicated_user()
+        with use_read_replica():
+            replica_user = User.objects.get(pk=user.pk)
+
+        self.assertEqual(replica_user._state.db, "replica")
+        self.assertEqual(router.db_for_write(User, instance=replica_user), "default")
+        self.assertTrue(router.allow_relation(replica_user, Profile(user=user)))
+
+    def test_profile_list_reads_from_the_replica_until_the_user_writes(self):
+        user = self._replicated_user()
+        Profile._base_manager.using("replica").bulk_create([Profile(user_id=user.pk, first_name="Replica")])
+        view = ProfileViewSet.as_view({"get": "list"})
+
+        def names():
+            new_request()
+            request = APIRequestFactory().get("/auth/profiles/")
+            force_authenticate(request, user=user)
+            return [profile["first_name"] for profile in view(request).data]
+
+        self.assertEqual(names(), ["Replica"])
+
+        Profile.objects.create(user=user, first_name="Primary", is_default=True)
+        self.assertEqual(names(), ["Primary"])
+
+    def test_otp_user_exist_check_reads_from_the_replica(self):
+        User._base_manager.using("replica").create(username="ghost", email="ghost@example.com")
+
+        with patch("builtins.print"):
+            result = OtpService.request_otp_code({"channel": "email", "email": "ghost@example.com"})
+
+        self.assertTrue(result["user_exist"])
+        self.assertFalse(User.objects.using("default").filter(email="ghost@example.com").exists())
+
+    def test_register_maps_a_conflict_missed_by_the_replica_to_the_usual_error(self):
+        User.objects.create(username="taken", email="taken@example.com")
+        new_request()
+
+        with self.assertRaisesRegex(ValueError, "correo"):
+            RegisterService.register_user(
+                "taken@example.com", "other", "Secret123!", "Secret123!", "Ana", "Lopez", None, None, None, None, True
+            )
+
+        self.assertEqual(User.objects.filter(email="taken@example.com").count(), 1)
+
+    def test_account_update_checks_the_email_on_the_primary(self):
+        user = self._replicated_user()
+        User.objects.create(username="taken", email="taken@example.com")
+        new_request()
+
+        serializer = UserUpdateSerializer(instance=user, data={"email": "taken@example.com"}, partial=True)
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("email", serializer.errors)
+
+    def test_precheck_reads_from_the_replica(self):
+        User._base_manager.using("replica").create(username="ghost", email="ghost@example.com")
+        identity = SimpleNamespace(
+            provider="google", provider_user_id="g-1", email="ghost@example.com", email_verified=True
+        )
+        provider = SimpleNamespace(authenticate=lambda payload: identity)
+
+        with patch("jb_drf_auth.services.social_auth.get_social_provider", return_value=provider):
+            result = SocialAuthService.precheck("google", {"id_token": "token"})
+
+        self.assertTrue(result["linked_existing_user"])
+
+    def test_check_reports_unknown_aliases_and_missing_router(self):
+        self.assertEqual(read_replicas_check(None), [])
+        with override_settings(DATABASE_ROUTERS=[]):
+            self.assertEqual([issue.id for issue in read_replicas_check(None)], ["jb_drf_auth.W006"])
+        with override_settings(JB_DRF_AUTH_READ_REPLICAS=("missing",)):
+            self.assertEqual([issue.id for issue in read_replicas_check(None)], ["jb_drf_auth.E007"])
+
+
+if __name__ == "__main__":
+    unittest.main()
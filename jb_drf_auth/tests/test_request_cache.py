@@ -0,0 +1,88 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from jb_drf_auth.services.login import LoginService
+from jb_drf_auth.services.me import MeService
+from jb_drf_auth.services.user_settings import UserSettingsService
+from jb_drf_auth.tests.concrete_models import Device, Profile, User, ensure_schema
+
+
+def profile_queries(ctx):
+    table = Profile._meta.db_table
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+    ]
+
+
+class UserRequestCacheTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        Device.all_objects.all().delete()
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.user = User.objects.create_user(
+            email="cache@example.com",
+            password="secret-pass",
+            is_verified=True,
+            settings={"language": "es", "timezone": "America/Mexico_City"},
+        )
+        self.profile = Profile.objects.create(user=self.user, first_name="Ana", is_default=True)
+
+    def test_mobile_login_loads_profile_and_settings_once(self):
+        with patch.object(
+            User, "_load_settings", autospec=True, side_effect=User._load_settings
+        ) as load:
+            with CaptureQueriesContext(connection) as ctx:
+                response = LoginService.basic_login(
+                    login="cache@example.com",
+                    password="secret-pass",
+                    client="mobile",
+                    device_data={"token": "device-1", "notification_token": "push-1"},
+                )
+
+        self.assertEqual(response["language"], "es")
+        self.assertEqual(response["user_settings"]["timezone"], "America/Mexico_City")
+        self.assertEqual(load.call_count, 1)
+        # Only UserSerializer.profiles lists profiles; the default one comes from the login join.
+        self.assertEqual(len(profile_queries(ctx)), 1)
+
+    def test_me_reuses_active_profile_as_default(self):
+        user = User.objects.get(pk=self.user.pk)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = MeService.get_me(user=user, client="web", profile_id=self.profile.pk)
+            user.get_default_profile()
+            user.get_active_profile(self.profile.pk)
+
+        self.assertEqual(response["active_profile"]["id"], self.profile.pk)
+        self.assertEqual(len(profile_queries(ctx)), 1)
+
+    def test_switching_default_profile_updates_memoized_default(self):
+        self.assertEqual(self.user.get_default_profile(), self.profile)
+
+        other = Profile.objects.create(user=self.user, first_name="Bea", is_default=True)
+
+        self.assertEqual(self.user.get_default_profile(), other)
+
+    def test_settings_service_invalidates_memoized_settings(self):
+        self.assertEqual(self.user.language, "es")
+
+        UserSettingsService.set_user_setting(self.user, "language", "en")
+
+        self.assertEqual(self.user.language, "en")
+        self.assertEqual(self.user.get_settings()["language"], "en")
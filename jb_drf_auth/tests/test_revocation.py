@@ -0,0 +1,214 @@
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.test import override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from jb_drf_auth.authentication import StatelessJWTAuthentication
+from jb_drf_auth.revocation import (
+    BloomFilter,
+    get_revocation_filter,
+    get_token_cache,
+    is_token_revoked,
+    reset_revocation_filter,
+    revoke_device,
+    revoke_token,
+)
+from jb_drf_auth.services.tokens import TokensService
+from jb_drf_auth.tests.concrete_models import Device, Profile, User, ensure_schema
+from jb_drf_auth.tokens import AccessToken
+from jb_drf_auth.views import LogoutAllView, LogoutView, RevokeDeviceView
+
+
+class RevocationTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        get_token_cache().clear()
+        reset_revocation_filter()
+        Device.all_objects.all().delete()
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.user = User.objects.create(
+            username="revoke", email="revoke@example.com", is_verified=True
+        )
+        self.profile = Profile.objects.create(user=self.user, is_default=True)
+        self.factory = APIRequestFactory()
+        self.auth = StatelessJWTAuthentication()
+
+    def _tokens(self, device_token=None):
+        device_data = {"token": device_token} if device_token else None
+        return TokensService.get_tokens_for_user(self.user, self.profile, device_data)
+
+    def _one_second_later(self):
+        # Device revocations only reject tokens issued in an earlier second.
+        return patch("jb_drf_auth.revocation.time.time", return_value=time.time() + 1)
+
+    def _access_payload(self, tokens):
+        return AccessToken(tokens["accessToken"]).payload
+
+    def _authenticate(self, tokens):
+        request = self.factory.get(
+            "/auth/me/", HTTP_AUTHORIZATION=f"Bearer {tokens['accessToken']}"
+        )
+        return self.auth.authenticate(request)
+
+
+class DenylistTests(RevocationTestCase):
+    def test_revoked_jti_only_affects_that_token(self):
+        first, second = self._tokens(), self._tokens()
+        revoke_token(self._access_payload(first))
+
+        self.assertTrue(is_token_revoked(self._access_payload(first)))
+        self.assertFalse(is_token_revoked(self._access_payload(second)))
+
+    def test_revoked_device_rejects_tokens_issued_before(self):
+        phone, tablet = self._tokens("phone-1"), self._tokens("tablet-1")
+        with self._one_second_later():
+            revoke_device(self.user.pk, "phone-1")
+
+        self.assertTrue(is_token_revoked(self._access_payload(phone)))
+        self.assertFalse(is_token_revoked(self._access_payload(tablet)))
+
+    def test_device_can_log_in_again_after_revocation(self):
+        with patch("jb_drf_auth.revocation.time.time", return_value=time.time() - 10):
+            revoke_device(self.user.pk, "phone-1")
+
+        self.assertFalse(is_token_revoked(self._access_payload(self._tokens("phone-1"))))
+
+    def test_device_can_log_in_again_in_the_same_second(self):
+        now = int(time.time())
+        with patch("jb_drf_auth.revocation.time.time", return_value=now + 0.9):
+            revoke_device(self.user.pk, "phone-1")
+        tokens = self._tokens("phone-1")
+        payload = self._access_payload(tokens)
+
+        self.assertFalse(is_token_revoked({**payload, "iat": now}))
+        self.assertTrue(is_token_revoked({**payload, "iat": now - 1}))
+
+
+class SessionEndpointTests(RevocationTestCase):
+    def _post(self, view, tokens, data=None, **kwargs):
+        request = self.factory.post("/auth/logout/", data or {}, format="json")
+        force_authenticate(request, user=self.user, token=AccessToken(tokens["accessToken"]))
+        return view.as_view()(request, **kwargs)
+
+    def test_logout_revokes_access_and_refresh_family(self):
+        tokens, other = self._tokens(), self._tokens()
+
+        response = self._post(LogoutView, tokens, {"refresh": tokens["refreshToken"]})
+
+        self.assertEqual(response.status_code, 204)
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(tokens)
+        with self.assertRaises(AuthenticationFailed):
+            TokensService.refresh_tokens(tokens["refreshToken"])
+        user, _token = self._authenticate(other)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_logout_rejects_refresh_token_of_another_user(self):
+        stranger = User.objects.create(username="stranger", email="stranger@example.com")
+        stranger_profile = Profile.objects.create(user=stranger, is_default=True)
+        stranger_tokens = TokensService.get_tokens_for_user(stranger, stranger_profile)
+
+        response = self._post(LogoutView, self._tokens(), {"refresh": stranger_tokens["refreshToken"]})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_logout_all_revokes_every_session(self):
+        first, second = self._tokens(), self._tokens("phone-1")
+
+        response = self._post(LogoutAllView, first)
+
+        self.assertEqual(response.status_code, 204)
+        for tokens in (first, second):
+            with self.assertRaises(AuthenticationFailed):
+                self._authenticate(tokens)
+
+    def test_revoke_device_signs_out_that_device(self):
+        device = Device.objects.create(user=self.user, token="phone-1", notification_token="n-1")
+        phone, tablet = self._tokens("phone-1"), self._tokens("tablet-1")
+
+        with self._one_second_later():
+            response = self._post(RevokeDeviceView, tablet, device_id=device.pk)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Device.objects.filter(pk=device.pk).exists())
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(phone)
+        self._authenticate(tablet)
+
+    def test_revoke_device_of_another_user_is_not_found(self):
+        stranger = User.objects.create(username="stranger", email="stranger@example.com")
+        device = Device.objects.create(user=stranger, token="phone-9", notification_token="n-9")
+
+        response = self._post(RevokeDeviceView, self._tokens(), device_id=device.pk)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Device.objects.filter(pk=device.pk).exists())
+
+
+class RevocationFilterTests(RevocationTestCase):
+    def setUp(self):
+        settings_override = override_settings(
+            JB_DRF_AUTH_REVOCATION_FILTER_ENABLED=True,
+            JB_DRF_AUTH_REVOCATION_FILTER_SYNC_SECONDS=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(4096, 5)
+        items = [f"jti:{index}" for index in range(200)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(bloom.might_contain(item) for item in items))
+
+    def test_unknown_tokens_skip_the_cache(self):
+        payload = self._access_payload(self._tokens("phone-1"))
+        revoke_device(self.user.pk, "tablet-1")
+        get_revocation_filter().sync(force=True)
+        cache = get_token_cache()
+
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            with patch.object(get_revocation_filter(), "sync"):
+                self.assertFalse(is_token_revoked(payload))
+        get_many.assert_not_called()
+
+    def test_filter_picks_up_revocations_from_the_shared_log(self):
+        tokens = self._tokens("phone-1")
+        payload = self._access_payload(tokens)
+        self.assertFalse(is_token_revoked(payload))
+
+        # Another worker revokes the device; this worker learns it on the next sync.
+        with self._one_second_later():
+            revoke_device(self.user.pk, "phone-1")
+
+        self.assertTrue(is_token_revoked(payload))
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(tokens)
+
+    def test_filter_replays_user_token_version_bumps(self):
+        tokens = self._tokens()
+        request = self.factory.post("/auth/logout/all/")
+        force_authenticate(request, user=self.user)
+        LogoutAllView.as_view()(request)
+
+        self.assertTrue(is_token_revoked(self._access_payload(tokens)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.core.management import call_command
+from django.db import connections, router
+from django.test import override_settings
+from django.utils import timezone
+
+from jb_drf_auth.checks import log_database_check
+from jb_drf_auth.services.email_outbox import EmailOutboxService
+from jb_drf_auth.services.otp import OtpService
+from jb_drf_auth.services.password_reset import PasswordResetService
+from jb_drf_auth.tests.concrete_models import (
+    EmailLog,
+    EmailOutbox,
+    OtpCode,
+    Profile,
+    SmsLog,
+    User,
+    ensure_schema,
+)
+
+
+ROUTED = (OtpCode, SmsLog, EmailLog, EmailOutbox)
+
+
+class AuthLogRouterTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        routing = override_settings(
+            DATABASE_ROUTERS=["jb_drf_auth.routers.AuthLogRouter"],
+            JB_DRF_AUTH_LOG_DATABASE="logs",
+        )
+        routing.enable()
+        self.addCleanup(routing.disable)
+        if "testapp_otpcode" not in connections["logs"].introspection.table_names():
+            call_command("migrate", database="logs", run_syncdb=True, verbosity=0)
+            # testapp.OtpCode keeps its CASCADE user foreign key for the deletion tests;
+            # a routed project declares it with db_constraint=False (check W005).
+            connections["logs"].disable_constraint_checking()
+        for model in ROUTED:
+            model._base_manager.all().delete()
+        Profile.all_objects.all().delete()
+        User._base_manager.all().delete()
+
+    def test_routes_log_models_to_the_log_database(self):
+        for model in ROUTED:
+            self.assertEqual(router.db_for_write(model), "logs")
+            self.assertEqual(router.db_for_read(model), "logs")
+        self.assertEqual(router.db_for_write(User), "default")
+        self.assertFalse(router.allow_migrate_model("logs", User))
+        self.assertFalse(router.allow_migrate_model("default", OtpCode))
+
+        tables = set(connections["logs"].introspection.table_names())
+        self.assertIn("testapp_emaillog", tables)
+        self.assertNotIn("testapp_user", tables)
+
+    def test_without_alias_every_model_stays_on_default(self):
+        with override_settings(JB_DRF_AUTH_LOG_DATABASE=None):
+            self.assertEqual(router.db_for_write(OtpCode), "default")
+            self.assertTrue(router.allow_migrate_model("default", OtpCode))
+
+    def _otp(self, email="new@example.com"):
+        return OtpCode.objects.create(
+            email=email,
+            code="123456",
+            channel="email",
+            valid_until=timezone.now() + timezone.timedelta(minutes=5),
+        )
+
+    def test_verify_otp_creates_the_user_on_default_and_consumes_the_code_on_logs(self):
+        otp = self._otp()
+
+        result = OtpService.verify_otp_code({"email": "new@example.com", "code": "123456", "client": "web"})
+
+        user = User.objects.using("default").get(email="new@example.com")
+        self.assertEqual(result["user"]["data"]["email"], user.email)
+        self.assertTrue(user.is_verified)
+        self.assertTrue(Profile.objects.filter(user=user, is_default=True).exists())
+        self.assertTrue(OtpCode.objects.using("logs").get(pk=otp.pk).is_used)
+        self.assertFalse(OtpCode._base_manager.using("default").exists())
+
+    def test_verify_otp_releases_the_code_when_creating_the_user_fails(self):
+        otp = self._otp()
+
+        with patch("jb_drf_auth.services.otp.get_profile_model_cls", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                OtpService.verify_otp_code({"email": "new@example.com", "code": "123456", "client": "web"})
+
+        self.assertFalse(OtpCode.objects.get(pk=otp.pk).is_used)
+        self.assertFalse(User.objects.filter(email="new@example.com").exists())
+
+    def test_delivery_logs_are_written_to_the_log_database(self):
+        User.objects.create(username="ana", email="ana@example.com")
+        bob = User.objects.create(username="bob", email="bob@example.com")
+        EmailOutboxService.enqueue_for_users([bob], "email_confirmation")
+
+        with patch("jb_drf_auth.services.password_reset.get_email_provider"), patch(
+            "jb_drf_auth.services.email_outbox.get_email_provider"
+        ):
+            PasswordResetService.send_reset_email("ana@example.com")
+            result = EmailOutboxService.deliver()
+
+        self.assertEqual(result, {"sent": 1, "failed": 0})
+        self.assertEqual(EmailLog.objects.using("logs").count(), 2)
+        self.assertFalse(EmailLog.objects.using("default").exists())
+        self.assertEqual(EmailOutbox.objects.using("logs").get().status, "sent")
+
+    def test_check_reports_missing_alias_and_cross_database_otp_foreign_key(self):
+        ids = [issue.id for issue in log_database_check(None)]
+        self.assertEqual(ids, ["jb_drf_auth.W005"])
+
+        with override_settings(DATABASE_ROUTERS=[]):
+            self.assertIn("jb_drf_auth.W004", [issue.id for issue in log_database_check(None)])
+        with override_settings(JB_DRF_AUTH_LOG_DATABASE="missing"):
+            self.assertEqual([issue.id for issue in log_database_check(None)], ["jb_drf_auth.E006"])
+
+
+if __name__ == "__main__":
+    unittest.main()
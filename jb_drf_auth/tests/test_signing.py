@@ -0,0 +1,100 @@
+import os
+import unittest
+from types import SimpleNamespace
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from django.conf import settings
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import TokenError
+
+from jb_drf_auth.services.tokens import TokensService
+from jb_drf_auth.tokens import AccessToken
+from jb_drf_auth.views.tokens import JwksView
+
+
+def private_pem(key):
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def signing_settings(keys, active_kid=None):
+    return {**settings.JB_DRF_AUTH, "JWT_SIGNING_KEYS": keys, "JWT_ACTIVE_KID": active_kid}
+
+
+class AsymmetricSigningTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.rsa_pem = private_pem(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        cls.rsa_old_pem = private_pem(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        cls.ec_pem = private_pem(ec.generate_private_key(ec.SECP256R1()))
+        cls.ed_pem = private_pem(ed25519.Ed25519PrivateKey.generate())
+
+    def setUp(self):
+        self.user = SimpleNamespace(id=7, pk=7, is_active=True)
+        self.profile = SimpleNamespace(id=70)
+
+    def _published_jwks(self):
+        request = APIRequestFactory().get("/auth/.well-known/jwks.json")
+        response = JwksView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=3600", response["Cache-Control"])
+        return response.data
+
+    def test_issued_tokens_verify_with_published_jwks_only(self):
+        for algorithm, pem in (
+            ("RS256", self.rsa_pem),
+            ("ES256", self.ec_pem),
+            ("EdDSA", self.ed_pem),
+        ):
+            with self.subTest(algorithm=algorithm):
+                keys = ({"KID": f"{algorithm}-1", "ALGORITHM": algorithm, "PRIVATE_KEY": pem},)
+                with override_settings(JB_DRF_AUTH=signing_settings(keys)):
+                    tokens = TokensService.get_tokens_for_user(self.user, self.profile)
+                    jwks = jwt.PyJWKSet.from_dict(self._published_jwks())
+
+                access = tokens["accessToken"]
+                kid = jwt.get_unverified_header(access)["kid"]
+                jwk = jwks[kid]
+                self.assertNotIn("d", jwk._jwk_data)
+                payload = jwt.decode(access, jwk.key, algorithms=[jwk.algorithm_name])
+                self.assertEqual(payload["profile_id"], 70)
+                self.assertEqual(payload["token_type"], "access")
+
+    def test_retiring_key_still_verifies_after_rotation(self):
+        old_key = {"KID": "2025-12", "ALGORITHM": "RS256", "PRIVATE_KEY": self.rsa_old_pem}
+        new_key = {"KID": "2026-01", "ALGORITHM": "RS256", "PRIVATE_KEY": self.rsa_pem}
+
+        with override_settings(JB_DRF_AUTH=signing_settings((old_key,))):
+            old_access = TokensService.get_tokens_for_user(self.user, self.profile)["accessToken"]
+
+        with override_settings(JB_DRF_AUTH=signing_settings((new_key, old_key), "2026-01")):
+            new_access = TokensService.get_tokens_for_user(self.user, self.profile)["accessToken"]
+            self.assertEqual(AccessToken(old_access)["profile_id"], 70)
+            self.assertEqual(jwt.get_unverified_header(new_access)["kid"], "2026-01")
+            self.assertEqual(
+                sorted(key["kid"] for key in self._published_jwks()["keys"]), ["2025-12", "2026-01"]
+            )
+
+        with override_settings(JB_DRF_AUTH=signing_settings((new_key,))):
+            with self.assertRaises(TokenError):
+                AccessToken(old_access)
+
+    def test_without_signing_keys_falls_back_to_simplejwt_backend(self):
+        with override_settings(JB_DRF_AUTH=signing_settings(())):
+            access = TokensService.get_tokens_for_user(self.user, self.profile)["accessToken"]
+            self.assertEqual(AccessToken(access)["profile_id"], 70)
+            self.assertEqual(jwt.get_unverified_header(access)["alg"], "HS256")
+            self.assertEqual(self._published_jwks(), {"keys": []})
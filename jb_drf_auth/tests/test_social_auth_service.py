@@ -1,6 +1,9 @@
+import hashlib
 import os
 import unittest
+from datetime import timedelta
 from types import SimpleNamespace
+from urllib.error import HTTPError
 from unittest.mock import MagicMock, patch
 
 import django
@@ -8,6 +11,8 @@ import django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
 django.setup()
 
+from django.utils import timezone
+
 from jb_drf_auth.exceptions import SocialAuthError
 from jb_drf_auth.providers.base import SocialIdentity
 from jb_drf_auth.services.social_auth import SocialAuthService
@@ -33,7 +38,7 @@ class SocialAuthServiceTests(unittest.TestCase):
 
         existing_account = SimpleNamespace(user=SimpleNamespace(id=10))
         qs = MagicMock()
-        qs.select_related.return_value.first.return_value = existing_account
+        qs.defer.return_value.first.return_value = existing_account
         model_cls = MagicMock()
         model_cls.objects.filter.return_value = qs
         get_social_account_model_cls.return_value = model_cls
@@ -129,7 +134,9 @@ class SocialAuthServiceTests(unittest.TestCase):
         )
 
         qs = MagicMock()
-        qs.select_related.return_value.first.return_value = None
+        qs.select_related.return_value = qs
+        qs.defer.return_value = qs
+        qs.first.return_value = None
         model_cls = MagicMock()
         model_cls.objects.filter.return_value = qs
         get_social_account_model_cls.return_value = model_cls
@@ -158,7 +165,7 @@ class SocialAuthServiceTests(unittest.TestCase):
 
         existing = SimpleNamespace(user_id=99)
         qs = MagicMock()
-        qs.select_related.return_value.first.return_value = existing
+        qs.defer.return_value.first.return_value = existing
         model_cls = MagicMock()
         model_cls.objects.filter.return_value = qs
         get_social_account_model_cls.return_value = model_cls
@@ -196,3 +203,145 @@ class SocialAuthServiceTests(unittest.TestCase):
         profile = SimpleNamespace(pk=1, picture=MagicMock())
         SocialAuthService._sync_profile_picture(profile, "https://img.example/a.jpg")
         profile.picture.save.assert_not_called()
+
+    @staticmethod
+    def _picture_settings(**overrides):
+        return {
+            "SYNC_PICTURE_ON_LOGIN": True,
+            "PICTURE_DOWNLOAD_TIMEOUT_SECONDS": 5,
+            "PICTURE_MAX_BYTES": 1024,
+            "PICTURE_ALLOWED_CONTENT_TYPES": ("image/jpeg",),
+            "PICTURE_RESYNC_INTERVAL_SECONDS": 3600,
+            **overrides,
+        }
+
+    @staticmethod
+    def _picture_response(payload, etag='"v2"'):
+        response = MagicMock()
+        response.headers = {"Content-Type": "image/jpeg", "ETag": etag}
+        response.read.return_value = payload
+        return response
+
+    @patch("jb_drf_auth.services.social_auth.urlopen")
+    @patch("jb_drf_auth.services.social_auth.get_social_settings")
+    def test_sync_profile_picture_skips_recently_synced_url(self, get_social_settings, urlopen):
+        get_social_settings.return_value = self._picture_settings()
+        social_account = SimpleNamespace(
+            picture_synced_url="https://img.example/a.jpg",
+            picture_synced_at=timezone.now(),
+        )
+        profile = SimpleNamespace(pk=1, picture=MagicMock())
+
+        SocialAuthService._sync_profile_picture(
+            profile, "https://img.example/a.jpg", social_account=social_account
+        )
+        urlopen.assert_not_called()
+        profile.picture.save.assert_not_called()
+
+    @patch("jb_drf_auth.services.social_auth.urlopen")
+    @patch("jb_drf_auth.services.social_auth.get_social_settings")
+    def test_sync_profile_picture_sends_conditional_get_and_handles_not_modified(
+        self, get_social_settings, urlopen
+    ):
+        get_social_settings.return_value = self._picture_settings()
+        urlopen.side_effect = HTTPError("https://img.example/a.jpg", 304, "Not Modified", {}, None)
+        social_account = SimpleNamespace(
+            picture_synced_url="https://img.example/a.jpg",
+            picture_synced_at=timezone.now() - timedelta(days=2),
+            picture_etag='"v1"',
+            picture_last_modified="Tue, 01 Oct 2024 10:00:00 GMT",
+            picture_sha256="abc",
+            save=MagicMock(),
+        )
+        profile = SimpleNamespace(pk=1, picture=MagicMock())
+
+        SocialAuthService._sync_profile_picture(
+            profile, "https://img.example/a.jpg", social_account=social_account
+        )
+        request = urlopen.call_args.args[0]
+        self.assertEqual(request.get_header("If-none-match"), '"v1"')
+        self.assertEqual(request.get_header("If-modified-since"), "Tue, 01 Oct 2024 10:00:00 GMT")
+        profile.picture.save.assert_not_called()
+        social_account.save.assert_called_once_with(
+            update_fields=["picture_synced_url", "picture_synced_at"]
+        )
+
+    @patch("jb_drf_auth.services.social_auth.urlopen")
+    @patch("jb_drf_auth.services.social_auth.get_social_settings")
+    def test_sync_profile_picture_does_not_rewrite_identical_bytes(self, get_social_settings, urlopen):
+        get_social_settings.return_value = self._picture_settings()
+        payload = b"same-bytes"
+        urlopen.return_value.__enter__.return_value = self._picture_response(payload)
+        social_account = SimpleNamespace(
+            picture_synced_url="https://img.example/old.jpg",
+            picture_synced_at=None,
+            picture_etag=None,
+            picture_last_modified=None,
+            picture_sha256=hashlib.sha256(payload).hexdigest(),
+            save=MagicMock(),
+        )
+        profile = SimpleNamespace(pk=1, picture=MagicMock())
+
+        SocialAuthService._sync_profile_picture(
+            profile, "https://img.example/new.jpg", social_account=social_account
+        )
+        profile.picture.save.assert_not_called()
+        self.assertEqual(social_account.picture_synced_url, "https://img.example/new.jpg")
+        self.assertEqual(social_account.picture_etag, '"v2"')
+
+    @patch("jb_drf_auth.services.social_auth.urlopen")
+    @patch("jb_drf_auth.services.social_auth.get_social_settings")
+    def test_sync_profile_picture_saves_changed_bytes(self, get_social_settings, urlopen):
+        get_social_settings.return_value = self._picture_settings()
+        payload = b"new-bytes"
+        urlopen.return_value.__enter__.return_value = self._picture_response(payload)
+        social_account = SimpleNamespace(
+            picture_synced_url=None,
+            picture_synced_at=None,
+            picture_etag=None,
+            picture_last_modified=None,
+            picture_sha256="old",
+            save=MagicMock(),
+        )
+        profile = SimpleNamespace(pk=1, picture=MagicMock(), save=MagicMock())
+
+        SocialAuthService._sync_profile_picture(
+            profile, "https://img.example/a.jpg", social_account=social_account
+        )
+        profile.picture.save.assert_called_once()
+        self.assertFalse(profile.picture.save.call_args.kwargs["save"])
+        profile.save.assert_called_once_with(update_fields=["picture"])
+        self.assertEqual(social_account.picture_sha256, hashlib.sha256(payload).hexdigest())
+
+    @patch("jb_drf_auth.services.social_auth.transaction.on_commit")
+    @patch("jb_drf_auth.services.social_auth.SocialAuthService._sync_profile_picture")
+    @patch("jb_drf_auth.services.social_auth.get_social_settings")
+    def test_schedule_profile_picture_sync_defers_when_async(
+        self, get_social_settings, sync_profile_picture, on_commit
+    ):
+        get_social_settings.return_value = self._picture_settings(PICTURE_SYNC_ASYNC=True)
+        profile = SimpleNamespace(pk=1, picture=MagicMock())
+
+        SocialAuthService._schedule_profile_picture_sync(profile, "https://img.example/a.jpg")
+        sync_profile_picture.assert_not_called()
+        on_commit.assert_called_once()
+
+    @patch("jb_drf_auth.services.social_auth.connections")
+    @patch("jb_drf_auth.services.social_auth.get_profile_model_cls")
+    @patch("jb_drf_auth.services.social_auth.threading.Thread")
+    @patch("jb_drf_auth.services.social_auth.transaction.on_commit", side_effect=lambda callback: callback())
+    @patch("jb_drf_auth.services.social_auth.SocialAuthService._sync_profile_picture")
+    @patch("jb_drf_auth.services.social_auth.get_social_settings")
+    def test_async_picture_sync_uses_a_fresh_profile(
+        self, get_social_settings, sync_profile_picture, _on_commit, thread, get_profile_model_cls, _connections
+    ):
+        get_social_settings.return_value = self._picture_settings(PICTURE_SYNC_ASYNC=True)
+        fresh = SimpleNamespace(pk=1)
+        profile_model = get_profile_model_cls.return_value
+        profile_model._base_manager.filter.return_value.first.return_value = fresh
+
+        SocialAuthService._schedule_profile_picture_sync(SimpleNamespace(pk=1), "https://img.example/a.jpg")
+        thread.call_args.kwargs["target"]()
+
+        profile_model._base_manager.filter.assert_called_once_with(pk=1)
+        sync_profile_picture.assert_called_once_with(fresh, "https://img.example/a.jpg", None)
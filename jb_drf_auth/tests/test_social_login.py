@@ -0,0 +1,249 @@
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from jb_drf_auth.exceptions import SocialAuthError
+from jb_drf_auth.providers.base import SocialIdentity
+from jb_drf_auth.services.login_activity import FLUSH_DUE_KEY
+from jb_drf_auth.services.social_auth import SocialAuthService
+from jb_drf_auth.tests.concrete_models import Profile, SocialAccount, User, ensure_schema
+from jb_drf_auth.utils import with_default_profile
+
+
+def data_queries(ctx):
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"] not in ("BEGIN", "COMMIT") and "SAVEPOINT" not in query["sql"]
+    ]
+
+
+class SocialLoginQueryTests(unittest.TestCase):
+    """Query budget of the social account resolution (web client, no picture sync)."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        SocialAccount.objects.all().delete()
+        Profile.all_objects.all().delete()
+        User._base_manager.all().delete()
+        cache.clear()
+        cache.add(FLUSH_DUE_KEY, 1, 60)
+
+    def _identity(self, provider_user_id="g-1", email="ana@example.com", raw_response=None):
+        return SocialIdentity(
+            provider="google",
+            provider_user_id=provider_user_id,
+            email=email,
+            email_verified=True,
+            first_name="Ana",
+            raw_response=raw_response or {"sub": provider_user_id},
+        )
+
+    def _run(self, call, identity):
+        with patch("jb_drf_auth.services.social_auth.get_social_provider") as get_provider:
+            get_provider.return_value.authenticate.return_value = identity
+            with CaptureQueriesContext(connection) as ctx:
+                result = call()
+        return result, data_queries(ctx)
+
+    def _login(self, identity, token="token"):
+        return self._run(
+            lambda: SocialAuthService.login_or_register(
+                "google", {"id_token": token}, "web", None, terms_and_conditions_accepted=True
+            ),
+            identity,
+        )
+
+    def _existing_user(self):
+        user = User.objects.create(username="ana", email="ana@example.com")
+        profile = Profile.objects.create(user=user, first_name="Ana", is_default=True)
+        return user, profile
+
+    def test_new_user(self):
+        result, queries = self._login(self._identity())
+
+        # Account and email lookups, username check, user INSERT, default profile
+        # (demote others, INSERT, user pointer) and the social account INSERT.
+        self.assertEqual(len(queries), 8, queries)
+        self.assertTrue(queries[-1].startswith('INSERT INTO "testapp_socialaccount"'))
+        account = SocialAccount.objects.select_related("user").get()
+        self.assertTrue(result["user_created"])
+        self.assertEqual(result["social_account_id"], account.pk)
+        self.assertTrue(account.user.is_verified)
+        self.assertFalse(account.user.has_usable_password())
+        self.assertIsNotNone(account.user.terms_and_conditions)
+        self.assertEqual(account.user.default_profile.first_name, "Ana")
+
+    def test_user_linked_by_email(self):
+        user, _profile = self._existing_user()
+
+        result, queries = self._login(self._identity())
+
+        # Account lookup, user + default profile lookup and the social account INSERT.
+        self.assertEqual(len(queries), 3, queries)
+        self.assertIn('LEFT OUTER JOIN "testapp_profile"', queries[1])
+        self.assertTrue(result["linked_existing_user"])
+        self.assertEqual(SocialAccount.objects.get(pk=result["social_account_id"]).user_id, user.pk)
+
+    def test_existing_account(self):
+        self._existing_user()
+        self._login(self._identity())
+
+        result, queries = self._login(self._identity(), token="token-2")
+
+        # One SELECT joining the social account, its user and the default profile
+        # (last_login_at is buffered).
+        self.assertEqual(len(queries), 1, queries)
+        self.assertIn('INNER JOIN "testapp_user"', queries[0])
+        self.assertFalse(result["user_created"])
+
+        _result, queries = self._login(
+            self._identity(raw_response={"sub": "g-1", "name": "Ana B"}), token="token-3"
+        )
+        # The lookup and one upsert that only updates the row when it belongs to the user.
+        self.assertEqual(len(queries), 2, queries)
+        self.assertTrue(queries[1].startswith('INSERT INTO "testapp_socialaccount"'))
+        self.assertIn('WHERE "testapp_socialaccount"."user_id" = EXCLUDED."user_id"', queries[1])
+        self.assertEqual(SocialAccount.objects.get().raw_response["name"], "Ana B")
+        self.assertEqual(SocialAccount.objects.count(), 1)
+
+    @patch("jb_drf_auth.services.social_auth.UPSERT_VENDORS", ())
+    def test_existing_account_without_upsert_support(self):
+        self._existing_user()
+        self._login(self._identity())
+
+        _result, queries = self._login(
+            self._identity(raw_response={"sub": "g-1", "name": "Ana B"}), token="token-2"
+        )
+
+        self.assertEqual(len(queries), 2, queries)
+        self.assertTrue(queries[1].startswith('UPDATE "testapp_socialaccount"'))
+        self.assertIn('"user_id" = ', queries[1])
+        self.assertEqual(SocialAccount.objects.get().raw_response["name"], "Ana B")
+
+    def test_link_account(self):
+        user, _profile = self._existing_user()
+        link = lambda: SocialAuthService.link_account(user, "google", {"id_token": "token"})  # noqa: E731
+
+        result, queries = self._run(link, self._identity())
+        self.assertEqual(len(queries), 2, queries)
+        self.assertTrue(result["created"])
+        self.assertEqual(SocialAccount.objects.get(pk=result["social_account_id"]).user_id, user.pk)
+
+        _result, queries = self._run(link, self._identity())
+        self.assertEqual(len(queries), 1, queries)
+
+    def _link_concurrently(self, owner):
+        """Link g-1 to `owner` between the caller's lookup and its write."""
+        save = SocialAuthService._save_social_account
+
+        def racing_save(*args):
+            SocialAccount.objects.create(user=owner, provider="google", provider_user_id="g-1", email="old@example.com")
+            return save(*args)
+
+        return patch.object(SocialAuthService, "_save_social_account", side_effect=racing_save)
+
+    def test_concurrent_link_by_another_user_is_rejected(self):
+        owner, _profile = self._existing_user()
+        other = User.objects.create(username="beto", email="beto@example.com")
+
+        with self._link_concurrently(owner), self.assertRaises(SocialAuthError) as ctx:
+            self._run(lambda: SocialAuthService.link_account(other, "google", {"id_token": "token"}), self._identity())
+
+        self.assertEqual(ctx.exception.code, "social_already_linked")
+        account = SocialAccount.objects.get()
+        self.assertEqual(account.user_id, owner.pk)
+        self.assertEqual(account.email, "old@example.com")
+
+    def test_concurrent_first_login_signs_in_the_owner(self):
+        owner, _profile = self._existing_user()
+        users = User.objects.count()
+
+        SocialAccount.objects.create(user=owner, provider="google", provider_user_id="g-1", email="old@example.com")
+        calls = []
+
+        def stale_first_lookup(queryset, *args):
+            calls.append(queryset)
+            if len(calls) == 1:
+                # The account lookup ran before the other login committed.
+                return queryset.none()
+            return with_default_profile(queryset, *args)
+
+        with patch("jb_drf_auth.services.social_auth.with_default_profile", side_effect=stale_first_lookup):
+            result, _queries = self._login(self._identity(email="new@example.com"))
+
+        account = SocialAccount.objects.get()
+        self.assertEqual(result["social_account_id"], account.pk)
+        self.assertFalse(result["user_created"])
+        self.assertEqual(account.user_id, owner.pk)
+        self.assertEqual(account.email, "old@example.com")
+        # The user created for the losing request is rolled back.
+        self.assertEqual(User.objects.count(), users)
+
+    def test_concurrent_first_login_of_the_same_user_updates_its_row(self):
+        owner, _profile = self._existing_user()
+
+        with self._link_concurrently(owner):
+            result, _queries = self._login(self._identity())
+
+        account = SocialAccount.objects.get()
+        self.assertEqual(result["social_account_id"], account.pk)
+        self.assertEqual(account.email, "ana@example.com")
+        self.assertEqual(account.user_id, owner.pk)
+
+    def test_concurrent_link_without_upsert_support(self):
+        with patch("jb_drf_auth.services.social_auth.UPSERT_VENDORS", ()):
+            self.test_concurrent_link_by_another_user_is_rejected()
+            self.setUp()
+            self.test_concurrent_first_login_of_the_same_user_updates_its_row()
+
+    def test_precheck_identity_is_reused_by_login(self):
+        with patch("jb_drf_auth.services.social_auth.get_social_provider") as get_provider:
+            get_provider.return_value.authenticate.return_value = self._identity(
+                raw_response={"sub": "g-1", "exp": int(time.time()) + 60}
+            )
+            payload = {"authorization_code": "code", "code_verifier": "verifier"}
+            precheck = SocialAuthService.precheck("google", payload)
+            result = SocialAuthService.login_or_register(
+                "google", payload, "web", None, terms_and_conditions_accepted=True
+            )
+
+        get_provider.return_value.authenticate.assert_called_once_with(payload)
+        self.assertTrue(precheck["would_create_user"])
+        self.assertTrue(result["user_created"])
+
+    def test_identity_cache_limits(self):
+        expired = self._identity(raw_response={"sub": "g-1", "exp": int(time.time()) - 1})
+        with patch("jb_drf_auth.services.social_auth.get_social_provider") as get_provider:
+            get_provider.return_value.authenticate.return_value = expired
+            # Expired tokens, and authorization codes without a PKCE verifier, are not cached.
+            for payload in ({"id_token": "expired"}, {"authorization_code": "code"}):
+                SocialAuthService.precheck("google", payload)
+                SocialAuthService.precheck("google", payload)
+            self.assertEqual(get_provider.return_value.authenticate.call_count, 4)
+
+            get_provider.return_value.authenticate.return_value = self._identity()
+            with override_settings(JB_DRF_AUTH_SOCIAL={"IDENTITY_CACHE_SECONDS": 0}):
+                SocialAuthService.precheck("google", {"id_token": "token"})
+                SocialAuthService.precheck("google", {"id_token": "token"})
+            self.assertEqual(get_provider.return_value.authenticate.call_count, 6)
+            self.assertEqual(cache.get(SocialAuthService._identity_cache_key("google", {"id_token": "token"})), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from jb_drf_auth.revocation import bump_user_token_version, get_token_cache
+from jb_drf_auth.services.tokens import TokensService
+from jb_drf_auth.tests.concrete_models import Profile, User, ensure_schema
+from jb_drf_auth.tokens import AccessToken, RefreshToken
+
+
+class RefreshTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        get_token_cache().clear()
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.user = User.objects.create(
+            username="refresh", email="refresh@example.com", is_verified=True
+        )
+        self.profile = Profile.objects.create(user=self.user, is_default=True, role="USER")
+        self.tokens = TokensService.get_tokens_for_user(self.user, self.profile)
+
+
+class TokenRefreshRotationTests(RefreshTestCase):
+
+    def test_refresh_rotates_and_keeps_claims(self):
+        data = TokensService.refresh_tokens(self.tokens["refreshToken"])
+
+        old = RefreshToken(self.tokens["refreshToken"])
+        new = RefreshToken(data["refresh"])
+        access = AccessToken(data["access"])
+        self.assertNotEqual(new["jti"], old["jti"])
+        self.assertEqual(new["fam"], old["fam"])
+        self.assertEqual(new["profile_id"], self.profile.id)
+        self.assertEqual(access["profile_id"], self.profile.id)
+        self.assertEqual(access["role"], "USER")
+
+    def test_reusing_rotated_token_revokes_family(self):
+        data = TokensService.refresh_tokens(self.tokens["refreshToken"])
+
+        with self.assertRaises(AuthenticationFailed) as ctx:
+            TokensService.refresh_tokens(self.tokens["refreshToken"])
+        self.assertEqual(ctx.exception.get_codes(), "token_revoked")
+
+        with self.assertRaises(AuthenticationFailed):
+            TokensService.refresh_tokens(data["refresh"])
+
+    def test_other_families_are_not_affected_by_reuse(self):
+        other = TokensService.get_tokens_for_user(self.user, self.profile)
+        TokensService.refresh_tokens(self.tokens["refreshToken"])
+        with self.assertRaises(AuthenticationFailed):
+            TokensService.refresh_tokens(self.tokens["refreshToken"])
+
+        self.assertIn("refresh", TokensService.refresh_tokens(other["refreshToken"]))
+
+    def test_token_version_bump_blocks_refresh(self):
+        bump_user_token_version(self.user.pk)
+
+        with self.assertRaises(AuthenticationFailed) as ctx:
+            TokensService.refresh_tokens(self.tokens["refreshToken"])
+        self.assertEqual(ctx.exception.get_codes(), "token_revoked")
+
+    def test_refresh_storm_has_a_single_winner(self):
+        workers = 16
+        barrier = threading.Barrier(workers)
+        results = []
+        lock = threading.Lock()
+
+        def refresh():
+            barrier.wait()
+            try:
+                outcome = TokensService.refresh_tokens(self.tokens["refreshToken"])
+            except AuthenticationFailed:
+                outcome = None
+            with lock:
+                results.append(outcome)
+
+        threads = [threading.Thread(target=refresh) for _ in range(workers)]
+        # Worker threads get their own in-memory database, so serve the loaded user.
+        self.user.refresh_profile_role = self.profile.role
+        with patch.object(TokensService, "_get_refresh_user", return_value=self.user):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        winners = [result for result in results if result]
+        self.assertEqual(len(results), workers)
+        self.assertEqual(len(winners), 1)
+        # The replay attempts revoked the family, including the winner's new token.
+        with self.assertRaises(AuthenticationFailed):
+            TokensService.refresh_tokens(winners[0]["refresh"])
+
+    def test_sequential_rotation_chain(self):
+        refresh = self.tokens["refreshToken"]
+        for _ in range(5):
+            refresh = TokensService.refresh_tokens(refresh)["refresh"]
+
+        self.assertEqual(RefreshToken(refresh)["profile_id"], self.profile.id)
+
+    @override_settings(JB_DRF_AUTH_ROTATE_REFRESH_TOKENS=False)
+    def test_rotation_can_be_disabled(self):
+        first = TokensService.refresh_tokens(self.tokens["refreshToken"])
+        second = TokensService.refresh_tokens(self.tokens["refreshToken"])
+
+        self.assertEqual(set(first), {"access"})
+        self.assertEqual(set(second), {"access"})
+
+
+class TokenRefreshUserStateTests(RefreshTestCase):
+    def assertRefreshRejected(self, code):
+        with self.assertRaises(AuthenticationFailed) as ctx:
+            TokensService.refresh_tokens(self.tokens["refreshToken"])
+        self.assertEqual(ctx.exception.get_codes(), code)
+
+    def test_user_deactivated_with_queryset_update_cannot_refresh(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertRefreshRejected("user_inactive")
+
+    def test_deleted_user_cannot_refresh(self):
+        User.objects.filter(pk=self.user.pk).delete()
+
+        self.assertRefreshRejected("user_inactive")
+
+    def test_deleted_profile_cannot_refresh(self):
+        self.profile.delete()
+
+        self.assertRefreshRejected("profile_not_found")
+
+    def test_inactive_user_is_rejected_without_the_version_key(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        get_token_cache().clear()
+
+        self.assertRefreshRejected("user_inactive")
+
+    def test_claims_are_rebuilt_from_the_database(self):
+        User.objects.filter(pk=self.user.pk).update(is_verified=False)
+        Profile.objects.filter(pk=self.profile.pk).update(role="ADMIN")
+
+        data = TokensService.refresh_tokens(self.tokens["refreshToken"])
+
+        for token in (RefreshToken(data["refresh"]), AccessToken(data["access"])):
+            self.assertEqual(token["role"], "ADMIN")
+            self.assertFalse(token["is_verified"])
+            self.assertTrue(token["is_active"])
+
+
+class TokenRefreshEndpointTests(RefreshTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def test_refresh_endpoint_reads_the_user_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                "/token/refresh/", {"refresh": self.tokens["refreshToken"]}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {"access", "refresh"})
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_refresh_endpoint_rejects_reuse(self):
+        payload = {"refresh": self.tokens["refreshToken"]}
+        self.client.post("/token/refresh/", payload, format="json")
+
+        response = self.client.post("/token/refresh/", payload, format="json")
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_endpoint_rejects_garbage(self):
+        response = self.client.post("/token/refresh/", {"refresh": "nope"}, format="json")
+
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
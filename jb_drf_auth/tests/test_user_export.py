@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from io import StringIO
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from jb_drf_auth.services.user_export import UserExportService
+from jb_drf_auth.tests.concrete_models import Profile, SocialAccount, User, ensure_schema
+from jb_drf_auth.views import UserExportView
+
+
+class UserExportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        SocialAccount.objects.all().delete()
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.staff = User.objects.create(username="staff", email="staff@example.com", is_staff=True)
+        self.ana = User.objects.create(
+            username="ana", email="ana@example.com", phone="+525512345678", password="pbkdf2_sha256$secret"
+        )
+        Profile.objects.create(user=self.ana, first_name="Ana", birthday=date(1990, 4, 12), is_default=True)
+        Profile.objects.create(user=self.ana, first_name="Ana work", role="COMMERCE")
+        SocialAccount.objects.create(
+            user=self.ana, provider="google", provider_user_id="g-1", raw_response={"access_token": "x"}
+        )
+        SocialAccount.objects.create(user=self.ana, provider="apple", provider_user_id="a-1")
+
+    def test_records_include_default_profile_and_social_accounts_only(self):
+        records = {record["email"]: record for record in UserExportService.iter_records()}
+
+        ana = records["ana@example.com"]
+        self.assertEqual(ana["phone"], "+525512345678")
+        self.assertEqual(ana["default_profile"]["first_name"], "Ana")
+        self.assertEqual(ana["default_profile"]["birthday"], date(1990, 4, 12))
+        self.assertEqual([account["provider"] for account in ana["social_accounts"]], ["apple", "google"])
+        self.assertIsNone(records["staff@example.com"]["default_profile"])
+        self.assertEqual(records["staff@example.com"]["social_accounts"], [])
+        self.assertNotIn("password", ana)
+        self.assertNotIn("settings", ana)
+        self.assertNotIn("raw_response", ana["social_accounts"][0])
+
+    def test_one_cursor_and_one_social_query_per_chunk(self):
+        for index in range(5):
+            User.objects.create(username=f"u{index}", email=f"u{index}@example.com")
+
+        with CaptureQueriesContext(connection) as ctx:
+            records = list(UserExportService.iter_records(chunk_size=3))
+
+        self.assertEqual(len(records), 7)
+        self.assertEqual(len(ctx.captured_queries), 1 + 3)
+
+    def test_csv_lines_are_flat(self):
+        lines = list(UserExportService.iter_lines("csv"))
+
+        header = lines[0].strip().split(",")
+        self.assertIn("default_profile_first_name", header)
+        self.assertEqual(header[-1], "social_providers")
+        self.assertNotIn("password", header)
+        ana = next(line for line in lines if "ana@example.com" in line)
+        self.assertIn(",Ana,", ana)
+        self.assertIn("1990-04-12", ana)
+        self.assertTrue(ana.rstrip().endswith("apple|google"))
+
+    def test_csv_cells_are_not_formulas(self):
+        user = User.objects.create(username="=HYPERLINK(1)", email="@sum(1)@example.com")
+        Profile.objects.create(user=user, first_name="+1+1", last_name_1="-2", is_default=True)
+
+        line = next(line for line in UserExportService.iter_lines("csv") if "sum(1)" in line)
+
+        for value in ("'@sum(1)@example.com", "'=HYPERLINK(1)", "'+1+1", "'-2"):
+            self.assertIn(f",{value},", line)
+
+    def test_command_writes_jsonl_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "users.jsonl")
+            call_command("jb_auth_export", output=output, chunk_size=1, stderr=StringIO())
+
+            with open(output, encoding="utf-8") as handle:
+                records = [json.loads(line) for line in handle]
+        self.assertEqual([record["email"] for record in records], ["staff@example.com", "ana@example.com"])
+        self.assertEqual(records[1]["default_profile"]["birthday"], "1990-04-12")
+
+    def test_endpoint_streams_for_staff_only(self):
+        factory = APIRequestFactory()
+        request = factory.get("/auth/admin/users/export/", {"output": "csv"})
+        force_authenticate(request, user=self.staff)
+        response = UserExportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 3)
+
+        request = factory.get("/auth/admin/users/export/", {"output": "xml"})
+        force_authenticate(request, user=self.staff)
+        self.assertEqual(UserExportView.as_view()(request).status_code, 400)
+
+        request = factory.get("/auth/admin/users/export/")
+        force_authenticate(request, user=self.ana)
+        self.assertEqual(UserExportView.as_view()(request).status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
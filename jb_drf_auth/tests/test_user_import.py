@@ -0,0 +1,236 @@
+import json
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from jb_drf_auth.services.email_outbox import EmailOutboxService
+from jb_drf_auth.services.user_import import UserImportService
+from jb_drf_auth.tests.concrete_models import EmailLog, EmailOutbox, Profile, User, ensure_schema
+
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def data_queries(ctx):
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"] not in ("BEGIN", "COMMIT") and "SAVEPOINT" not in query["sql"]
+    ]
+
+
+class UserImportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ensure_schema()
+
+    def setUp(self):
+        settings_override = override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        EmailOutbox.objects.all().delete()
+        EmailLog.objects.all().delete()
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+        self.conflicts = []
+
+    def _import(self, rows, **kwargs):
+        lines = [(index, row, None) for index, row in enumerate(rows, start=1)]
+        return UserImportService.import_rows(
+            lines, on_conflict=lambda *conflict: self.conflicts.append(conflict), **kwargs
+        )
+
+    def _rows(self, count, start=0):
+        return [
+            {"email": f"user{index}@example.com", "password_hash": make_password("secret"), "first_name": f"U{index}"}
+            for index in range(start, start + count)
+        ]
+
+    def test_creates_users_with_default_profile(self):
+        result = self._import(
+            [
+                {
+                    "email": "ana@example.com",
+                    "password_hash": make_password("secret"),
+                    "first_name": "Ana",
+                    "birthday": "1990-04-12",
+                    "phone": "+52 55 1234 5678",
+                    "terms_and_conditions_accepted": "true",
+                },
+                {"email": "luis@example.com", "password": "plain-secret", "role": "COMMERCE"},
+            ],
+            verified=True,
+        )
+
+        self.assertEqual(result, {"created": 2, "skipped": 0, "queued_emails": 0})
+        ana = User.objects.get(email="ana@example.com")
+        self.assertTrue(ana.check_password("secret"))
+        self.assertTrue(ana.is_active and ana.is_verified)
+        self.assertEqual(ana.phone, "+525512345678")
+        self.assertIsNotNone(ana.terms_and_conditions)
+        self.assertEqual(ana.default_profile.first_name, "Ana")
+        self.assertTrue(ana.default_profile.is_default)
+        luis = User.objects.get(email="luis@example.com")
+        self.assertTrue(luis.check_password("plain-secret"))
+        self.assertEqual(luis.get_default_profile().role, "COMMERCE")
+
+    def test_queries_per_batch_do_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as small:
+            self._import(self._rows(5), batch_size=500)
+        with CaptureQueriesContext(connection) as large:
+            self._import(self._rows(40, start=5), batch_size=500)
+
+        self.assertEqual(User.objects.count(), 45)
+        self.assertEqual(len(data_queries(small)), len(data_queries(large)))
+
+    def test_conflicts_are_reported_and_skipped(self):
+        User.objects.create(username="taken", email="taken@example.com", phone="+525500000000")
+
+        result = self._import(
+            [
+                {"email": "taken@example.com"},
+                {"email": "new@example.com"},
+                {"email": "NEW@example.com"},
+                {"email": "not-an-email"},
+                {"email": "hash@example.com", "password_hash": "plain"},
+                {"email": "phone@example.com", "phone": "+525500000000"},
+                {"email": "name@example.com", "username": "taken"},
+                {"email": "day@example.com", "birthday": "12/04/1990"},
+            ]
+        )
+
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["skipped"], 7)
+        self.assertEqual(
+            [reason for _line, _email, reason in self.conflicts],
+            [
+                "invalid_email",
+                "invalid_password_hash",
+                "invalid_birthday",
+                "email_exists",
+                "duplicate_email",
+                "phone_exists",
+                "username_exists",
+            ],
+        )
+
+    def test_generated_usernames_avoid_existing_ones(self):
+        User.objects.create(username="ana", email="ana@other.com")
+
+        self._import([{"email": "ana@example.com"}, {"email": "ana@example.org"}])
+
+        self.assertEqual(
+            sorted(User.objects.exclude(email="ana@other.com").values_list("username", flat=True)),
+            ["ana1", "ana2"],
+        )
+
+    def test_confirmation_emails_are_queued_and_delivered_later(self):
+        with patch("jb_drf_auth.services.email_confirmation.get_email_provider") as inline_provider:
+            result = self._import(self._rows(3), send_confirmation=True)
+        inline_provider.assert_not_called()
+        self.assertEqual(result["queued_emails"], 3)
+        self.assertFalse(User.objects.filter(is_active=True).exists())
+        # Only the user id is stored: the link and its token are built at delivery.
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list("context", flat=True), key=lambda context: context["user_id"]),
+            [{"user_id": pk} for pk in User.objects.order_by("pk").values_list("pk", flat=True)],
+        )
+
+        with patch("jb_drf_auth.services.email_outbox.get_email_provider") as get_provider:
+            delivered = EmailOutboxService.deliver(batch_size=2)
+
+        self.assertEqual(delivered, {"sent": 3, "failed": 0})
+        self.assertEqual(get_provider.return_value.send_email.call_count, 3)
+        self.assertIn("/verify-email/?uid=", get_provider.return_value.send_email.call_args[0][2])
+        self.assertNotIn("verify_url", str(list(EmailOutbox.objects.values_list("context", flat=True))))
+        self.assertEqual(EmailOutbox.objects.filter(status="sent").count(), 3)
+        self.assertEqual(EmailLog.objects.filter(template_name="email_confirmation").count(), 3)
+
+    def test_missing_outbox_model_fails_before_any_insert(self):
+        with override_settings(JB_DRF_AUTH={**settings.JB_DRF_AUTH, "EMAIL_OUTBOX_MODEL": None}):
+            with self.assertRaises(RuntimeError):
+                self._import(self._rows(3), send_confirmation=True, batch_size=1)
+
+        self.assertFalse(User.objects.exists())
+
+    def test_users_are_rolled_back_when_queueing_fails(self):
+        with patch.object(EmailOutboxService, "enqueue", side_effect=DatabaseError("outbox down")):
+            with self.assertRaises(DatabaseError):
+                self._import(self._rows(2), send_confirmation=True)
+
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Profile.all_objects.exists())
+
+    def test_queued_confirmation_of_a_deleted_user_fails(self):
+        self._import(self._rows(1), send_confirmation=True)
+        User._base_manager.all().delete()
+
+        with override_settings(JB_DRF_AUTH_EMAIL_OUTBOX_MAX_ATTEMPTS=1):
+            with patch("jb_drf_auth.services.email_outbox.get_email_provider") as get_provider:
+                self.assertEqual(EmailOutboxService.deliver(), {"sent": 0, "failed": 1})
+
+        get_provider.return_value.send_email.assert_not_called()
+        self.assertEqual(EmailOutbox.objects.get().status, "failed")
+
+    def test_failed_outbox_emails_stay_pending_until_max_attempts(self):
+        EmailOutboxService.enqueue([("a@example.com", "password_reset", {"user_email": "a", "reset_url": "u"})])
+
+        with override_settings(JB_DRF_AUTH_EMAIL_OUTBOX_MAX_ATTEMPTS=2):
+            with patch("jb_drf_auth.services.email_outbox.get_email_provider") as get_provider:
+                get_provider.return_value.send_email.side_effect = RuntimeError("smtp down")
+                EmailOutboxService.deliver()
+                self.assertEqual(EmailOutbox.objects.get().status, "pending")
+                EmailOutboxService.deliver()
+
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.attempts), ("failed", 2))
+
+    def test_hash_workers_hash_plain_passwords_in_a_process_pool(self):
+        rows = [{"email": f"p{index}@example.com", "password": f"pw-{index}"} for index in range(4)]
+
+        self._import(rows, hash_workers=2)
+
+        self.assertTrue(User.objects.get(email="p3@example.com").check_password("pw-3"))
+
+    def test_command_reads_csv_and_writes_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "users.csv")
+            report = os.path.join(directory, "report.csv")
+            with open(source, "w", encoding="utf-8") as handle:
+                handle.write("email,first_name,password_hash\n")
+                handle.write(f"csv@example.com,Csv,{make_password('x')}\n")
+                handle.write("csv@example.com,Again,\n")
+            out = StringIO()
+
+            call_command("jb_auth_import_users", source, report=report, stdout=out)
+
+            with open(report, encoding="utf-8") as handle:
+                self.assertEqual(handle.read().splitlines()[1], "3,csv@example.com,duplicate_email")
+        self.assertIn("Created 1 users, skipped 1", out.getvalue())
+        self.assertEqual(User.objects.get(email="csv@example.com").get_default_profile().first_name, "Csv")
+
+    def test_jsonl_reader_reports_invalid_lines(self):
+        stream = StringIO(json.dumps({"email": "ok@example.com"}) + "\n{broken\n\n")
+
+        rows = list(UserImportService.read_rows(stream, "jsonl"))
+
+        self.assertEqual(rows, [(1, {"email": "ok@example.com"}, None), (2, None, "invalid_json")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import base64
 import os
+import tracemalloc
 import unittest
 from io import BytesIO
 from unittest.mock import patch
@@ -13,7 +15,16 @@ django.setup()
 
 from jb_drf_auth.conf import get_social_settings
 from jb_drf_auth import utils
-from jb_drf_auth.image_utils import optimize_profile_picture
+from rest_framework.exceptions import ValidationError
+
+from jb_drf_auth.image_utils import (
+    ImageDimensionsError,
+    ImageTooLargeError,
+    decode_base64_to_file,
+    inspect_image,
+    optimize_profile_picture,
+)
+from jb_drf_auth.serializers.fields import ProfilePictureField
 
 
 class UtilsTests(unittest.TestCase):
@@ -108,3 +119,60 @@ class UtilsTests(unittest.TestCase):
         result = optimize_profile_picture(payload)
         self.assertTrue(result.name.endswith(".jpg"))
         self.assertLess(len(result.read()), len(raw))
+
+    def test_decode_base64_to_file_keeps_peak_memory_bounded(self):
+        raw = os.urandom(4 * 1024 * 1024)
+        payload = f"data:image/png;base64,{base64.b64encode(raw).decode('ascii')}"
+
+        tracemalloc.start()
+        try:
+            upload = decode_base64_to_file(payload, max_bytes=len(raw))
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(upload.size, len(raw))
+        self.assertEqual(upload.content_type, "image/png")
+        self.assertLess(peak, 1024 * 1024)
+        upload.seek(0)
+        self.assertEqual(upload.read(), raw)
+        upload.close()
+
+    def test_decode_base64_to_file_rejects_oversized_payload_early(self):
+        payload = base64.b64encode(b"x" * (512 * 1024)).decode("ascii")
+        with patch("jb_drf_auth.image_utils.base64.b64decode", wraps=base64.b64decode) as decoder:
+            with self.assertRaises(ImageTooLargeError):
+                decode_base64_to_file(payload, max_bytes=1024, chunk_chars=4096)
+        self.assertEqual(decoder.call_count, 1)
+
+    def test_decode_base64_to_file_rejects_invalid_payload(self):
+        with self.assertRaises(ValueError):
+            decode_base64_to_file("not base64!", max_bytes=1024)
+
+    def test_inspect_image_reads_dimensions_from_header(self):
+        stream = BytesIO()
+        Image.new("RGB", (64, 32)).save(stream, format="PNG")
+        payload = SimpleUploadedFile("avatar.png", stream.getvalue(), content_type="image/png")
+
+        self.assertEqual(inspect_image(payload), ("png", 64, 32))
+        with self.assertRaises(ImageDimensionsError):
+            inspect_image(payload, max_pixels=100)
+
+    @patch("jb_drf_auth.serializers.fields.get_setting")
+    def test_profile_picture_field_accepts_base64_and_rejects_large_dimensions(self, mock_get_setting):
+        mock_get_setting.side_effect = lambda name: {
+            "PROFILE_PICTURE_MAX_UPLOAD_BYTES": 1024 * 1024,
+            "PROFILE_PICTURE_MAX_UPLOAD_PIXELS": 10_000,
+        }.get(name)
+        field = ProfilePictureField()
+
+        stream = BytesIO()
+        Image.new("RGB", (50, 50)).save(stream, format="JPEG")
+        upload = field.to_internal_value(base64.b64encode(stream.getvalue()).decode("ascii"))
+        self.assertTrue(upload.name.endswith(".jpg"))
+        upload.close()
+
+        stream = BytesIO()
+        Image.new("RGB", (200, 200)).save(stream, format="PNG")
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(base64.b64encode(stream.getvalue()).decode("ascii"))
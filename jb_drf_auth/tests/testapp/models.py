@@ -0,0 +1,59 @@
+"""Concrete models used by tests that need real database queries."""
+
+from jb_drf_auth.models import (
+    AbstractJbDeliveryStat,
+    AbstractJbDevice,
+    AbstractJbDuplicateCandidate,
+    AbstractJbEmailLog,
+    AbstractJbEmailOutbox,
+    AbstractJbOtpCode,
+    AbstractJbProfile,
+    AbstractJbSmsLog,
+    AbstractJbSocialAccount,
+    AbstractJbUser,
+    AbstractPersonCore,
+)
+
+
+class User(AbstractJbUser):
+    pass
+
+
+class Profile(AbstractJbProfile):
+    pass
+
+
+class Device(AbstractJbDevice):
+    pass
+
+
+class OtpCode(AbstractJbOtpCode):
+    pass
+
+
+class SmsLog(AbstractJbSmsLog):
+    pass
+
+
+class EmailLog(AbstractJbEmailLog):
+    pass
+
+
+class SocialAccount(AbstractJbSocialAccount):
+    pass
+
+
+class EmailOutbox(AbstractJbEmailOutbox):
+    pass
+
+
+class DeliveryStat(AbstractJbDeliveryStat):
+    pass
+
+
+class Person(AbstractPersonCore):
+    pass
+
+
+class DuplicateCandidate(AbstractJbDuplicateCandidate):
+    pass
@@ -0,0 +1,33 @@
+"""SimpleJWT token classes that honour JB_DRF_AUTH_JWT_SIGNING_KEYS."""
+
+from rest_framework_simplejwt import tokens
+
+from jb_drf_auth.signing import get_token_backend
+
+
+# Principal claims added by TokensService so requests can be authenticated statelessly.
+ROLE_CLAIM = "role"
+IS_ACTIVE_CLAIM = "is_active"
+IS_VERIFIED_CLAIM = "is_verified"
+TOKEN_VERSION_CLAIM = "ver"
+# Shared by every refresh token rotated from the same login.
+FAMILY_CLAIM = "fam"
+# Client device token the session was opened on, so a device can be signed out.
+DEVICE_CLAIM = "did"
+
+
+class JbTokenMixin:
+    def get_token_backend(self):
+        return get_token_backend()
+
+
+class AccessToken(JbTokenMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(JbTokenMixin, tokens.RefreshToken):
+    access_token_class = AccessToken
+
+
+class UntypedToken(JbTokenMixin, tokens.UntypedToken):
+    pass
@@ -2,28 +2,37 @@
 
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 
 from jb_drf_auth.views import (
     AccountConfirmEmailView,
     AccountUpdateView,
     BasicLoginView,
+    BulkRevokeDevicesView,
     CreateStaffUserView,
     CreateSuperUserView,
+    DeviceListView,
+    JwksView,
+    LogoutAllView,
+    LogoutView,
     MeView,
     PasswordChangeView,
     PasswordResetConfirmView,
     PasswordResetRequestView,
+    PersonSearchView,
     ProfilePictureUpdateView,
     ProfileViewSet,
     RegisterView,
     RequestOtpCodeView,
     ResendConfirmationEmailView,
+    RevokeDeviceView,
+    SignOutOtherDevicesView,
     SocialLinkView,
     SocialLoginView,
     SocialPrecheckView,
     SocialUnlinkView,
     SwitchProfileView,
+    TokenRefreshView,
+    UserExportView,
     VerifyOtpCodeView,
     delete_account,
 )
@@ -34,6 +43,8 @@ router.register(r"profiles", ProfileViewSet, basename="profiles")
 urlpatterns = [
     path("admin/create-superuser/", CreateSuperUserView.as_view(), name="create_superuser"),
     path("admin/create-staff/", CreateStaffUserView.as_view(), name="create_staff"),
+    path("admin/persons/search/", PersonSearchView.as_view(), name="person_search"),
+    path("admin/users/export/", UserExportView.as_view(), name="user_export"),
     path("register/", RegisterView.as_view()),
     path("registration/account-confirmation-email/", AccountConfirmEmailView.as_view()),
     path(
@@ -53,7 +64,14 @@ urlpatterns = [
     path("profile/switch/", SwitchProfileView.as_view()),
     path("profile/picture/", ProfilePictureUpdateView.as_view()),
     path("me/", MeView.as_view()),
+    path("logout/", LogoutView.as_view()),
+    path("logout/all/", LogoutAllView.as_view()),
+    path("devices/", DeviceListView.as_view()),
+    path("devices/revoke/", BulkRevokeDevicesView.as_view()),
+    path("devices/sign-out-others/", SignOutOtherDevicesView.as_view()),
+    path("devices/<int:device_id>/revoke/", RevokeDeviceView.as_view()),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path(".well-known/jwks.json", JwksView.as_view(), name="jwks"),
     path("account/update/", AccountUpdateView.as_view()),
     path("account/delete/", delete_account),
     path("", include(router.urls)),
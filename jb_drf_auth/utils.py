@@ -2,6 +2,7 @@ import re
 
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
 from django.utils.module_loading import import_string
 
 from .conf import get_setting, get_social_settings
@@ -9,6 +10,18 @@ from .conf import get_setting, get_social_settings
 def get_user_model_cls():
     return get_user_model()
 
+def with_default_profile(queryset, lookup="default_profile"):
+    """
+    Join the user's default_profile pointer when the user model has it, so
+    user.get_default_profile() does not need another query.
+    """
+    try:
+        get_user_model()._meta.get_field("default_profile")
+    except FieldDoesNotExist:
+        return queryset
+    return queryset.select_related(lookup)
+
+
 def get_profile_model_cls():
     model_path = get_setting("PROFILE_MODEL")
     if not model_path:
@@ -24,6 +37,21 @@ def get_profile_model_cls():
     return apps.get_model(app_label, model_name)
 
 
+def get_person_search_model_cls():
+    model_path = get_setting("PERSON_SEARCH_MODEL")
+    if not model_path:
+        return get_profile_model_cls()
+
+    try:
+        app_label, model_name = model_path.split(".")
+    except ValueError as exc:
+        raise RuntimeError(
+            "Invalid JB_DRF_AUTH_PERSON_SEARCH_MODEL format. Expected 'app_label.ModelName'"
+        ) from exc
+
+    return apps.get_model(app_label, model_name)
+
+
 def get_device_model_cls():
     model_path = get_setting("DEVICE_MODEL")
     if not model_path:
@@ -70,6 +98,18 @@ def get_email_provider():
     return provider_cls()
 
 
+_delivery_log_sinks = {}
+
+
+def get_delivery_log_sink():
+    # One instance per sink path: buffered sinks own a queue and a thread.
+    sink_path = get_setting("DELIVERY_LOG_SINK")
+    sink = _delivery_log_sinks.get(sink_path)
+    if sink is None:
+        sink = _delivery_log_sinks[sink_path] = import_string(sink_path)()
+    return sink
+
+
 def get_sms_log_model_cls():
     model_path = get_setting("SMS_LOG_MODEL")
     if not model_path:
@@ -100,6 +140,36 @@ def get_email_log_model_cls():
     return apps.get_model(app_label, model_name)
 
 
+def get_email_outbox_model_cls():
+    model_path = get_setting("EMAIL_OUTBOX_MODEL")
+    if not model_path:
+        raise RuntimeError("Missing setting: JB_DRF_AUTH_EMAIL_OUTBOX_MODEL = 'app_label.ModelName'")
+
+    try:
+        app_label, model_name = model_path.split(".")
+    except ValueError as exc:
+        raise RuntimeError(
+            "Invalid JB_DRF_AUTH_EMAIL_OUTBOX_MODEL format. Expected 'app_label.ModelName'"
+        ) from exc
+
+    return apps.get_model(app_label, model_name)
+
+
+def get_delivery_stat_model_cls():
+    model_path = get_setting("DELIVERY_STAT_MODEL")
+    if not model_path:
+        raise RuntimeError("Missing setting: JB_DRF_AUTH_DELIVERY_STAT_MODEL = 'app_label.ModelName'")
+
+    try:
+        app_label, model_name = model_path.split(".")
+    except ValueError as exc:
+        raise RuntimeError(
+            "Invalid JB_DRF_AUTH_DELIVERY_STAT_MODEL format. Expected 'app_label.ModelName'"
+        ) from exc
+
+    return apps.get_model(app_label, model_name)
+
+
 def get_social_account_model_cls():
     model_path = get_setting("SOCIAL_ACCOUNT_MODEL")
     if not model_path:
@@ -115,6 +185,23 @@ def get_social_account_model_cls():
     return apps.get_model(app_label, model_name)
 
 
+def get_duplicate_candidate_model_cls():
+    model_path = get_setting("DUPLICATE_CANDIDATE_MODEL")
+    if not model_path:
+        raise RuntimeError(
+            "Missing setting: JB_DRF_AUTH_DUPLICATE_CANDIDATE_MODEL = 'app_label.ModelName'"
+        )
+
+    try:
+        app_label, model_name = model_path.split(".")
+    except ValueError as exc:
+        raise RuntimeError(
+            "Invalid JB_DRF_AUTH_DUPLICATE_CANDIDATE_MODEL format. Expected 'app_label.ModelName'"
+        ) from exc
+
+    return apps.get_model(app_label, model_name)
+
+
 def get_social_provider(provider: str):
     social_settings = get_social_settings()
     providers = social_settings.get("PROVIDERS", {})
@@ -1,4 +1,10 @@
 from jb_drf_auth.views.account_management import AccountUpdateView, delete_account
+from jb_drf_auth.views.devices import (
+    BulkRevokeDevicesView,
+    DeviceListView,
+    RevokeDeviceView,
+    SignOutOtherDevicesView,
+)
 from jb_drf_auth.views.email_confirmation import (
     AccountConfirmEmailView,
     ResendConfirmationEmailView,
@@ -13,13 +19,20 @@ from jb_drf_auth.views.password_reset import (
 )
 from jb_drf_auth.views.profile import ProfilePictureUpdateView, ProfileViewSet
 from jb_drf_auth.views.register import RegisterView
+from jb_drf_auth.views.sessions import LogoutAllView, LogoutView
 from jb_drf_auth.views.social_auth import (
     SocialLinkView,
     SocialLoginView,
     SocialPrecheckView,
     SocialUnlinkView,
 )
-from jb_drf_auth.views.user_admin import CreateStaffUserView, CreateSuperUserView
+from jb_drf_auth.views.tokens import JwksView, TokenRefreshView
+from jb_drf_auth.views.user_admin import (
+    CreateStaffUserView,
+    CreateSuperUserView,
+    PersonSearchView,
+    UserExportView,
+)
 
 __all__ = [
     "delete_account",
@@ -37,10 +50,20 @@ __all__ = [
     "ProfileViewSet",
     "ProfilePictureUpdateView",
     "RegisterView",
+    "LogoutView",
+    "LogoutAllView",
+    "DeviceListView",
+    "RevokeDeviceView",
+    "BulkRevokeDevicesView",
+    "SignOutOtherDevicesView",
     "SocialLoginView",
     "SocialPrecheckView",
     "SocialLinkView",
     "SocialUnlinkView",
+    "JwksView",
+    "TokenRefreshView",
     "CreateStaffUserView",
     "CreateSuperUserView",
+    "PersonSearchView",
+    "UserExportView",
 ]
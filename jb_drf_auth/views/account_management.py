@@ -6,13 +6,14 @@ from rest_framework.views import APIView
 from django.utils.translation import gettext as _
 
 from jb_drf_auth.serializers import UserSerializer, UserUpdateSerializer
+from jb_drf_auth.services.account_deletion import AccountDeletionService
 
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def delete_account(request):
     if request.data.get("confirmation"):
-        user = request.user
-        user.delete()
+        # Owned records are soft deleted later by jb_auth_process_deletions.
+        AccountDeletionService.mark_deleted(request.user)
         return Response(_("Cuenta eliminada correctamente."), status=status.HTTP_200_OK)
 
     return Response(
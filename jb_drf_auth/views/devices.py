@@ -0,0 +1,64 @@
+from django.utils.translation import gettext as _
+from rest_framework import generics, status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.pagination import KeysetPagination
+from jb_drf_auth.serializers import (
+    DeviceRevokeSerializer,
+    DeviceSerializer,
+    SignOutOtherDevicesSerializer,
+)
+from jb_drf_auth.services.devices import DeviceService
+from jb_drf_auth.tokens import DEVICE_CLAIM
+
+
+class DeviceListView(generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = DeviceSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-linked_at", "-id")
+
+    def get_queryset(self):
+        return DeviceService.get_user_devices(self.request.user)
+
+
+class RevokeDeviceView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, device_id):
+        DeviceService.revoke_one(request.user, device_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BulkRevokeDevicesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = DeviceRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        revoked = DeviceService.revoke(request.user, serializer.validated_data["ids"])
+        return Response({"revoked": revoked}, status=status.HTTP_200_OK)
+
+
+class SignOutOtherDevicesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = SignOutOtherDevicesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payload = getattr(request.auth, "payload", None) or {}
+        profile_id = payload.get(get_setting("PROFILE_ID_CLAIM"))
+        if not profile_id:
+            raise AuthenticationFailed(_("Falta perfil en el token"))
+
+        profile = request.user.get_active_profile(profile_id)
+        if profile is None:
+            raise AuthenticationFailed(_("Perfil no encontrado."))
+
+        device_token = serializer.validated_data.get("device_token") or payload.get(DEVICE_CLAIM)
+        response = DeviceService.sign_out_other_devices(request.user, profile, device_token)
+        return Response(response, status=status.HTTP_200_OK)
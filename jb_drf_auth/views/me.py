@@ -6,6 +6,7 @@ from rest_framework.views import APIView
 from django.utils.translation import gettext as _
 
 from jb_drf_auth.services.me import MeService
+from jb_drf_auth.tokens import DEVICE_CLAIM
 
 
 class MeView(APIView):
@@ -16,7 +17,7 @@ class MeView(APIView):
         auth_payload = request.auth or {}
         profile_id = auth_payload.get("profile_id")
         client = request.query_params.get("client")
-        device_token = request.query_params.get("device_token")
+        device_token = request.query_params.get("device_token") or auth_payload.get(DEVICE_CLAIM)
 
         if not profile_id:
             raise AuthenticationFailed(_("Falta perfil en el token"))
@@ -34,6 +35,8 @@ class MeView(APIView):
             client=client,
             profile_id=profile_id,
             device_token=device_token,
+            # Only StatelessJWTAuthentication principals expose the revocation-checked device.
+            device_verified=bool(device_token) and getattr(user, "device_token", None) == device_token,
         )
 
         return Response(response, status=status.HTTP_200_OK)
@@ -1,32 +1,99 @@
 from rest_framework import status, viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils.translation import gettext as _
 
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.pagination import KeysetPagination
+from jb_drf_auth.replicas import use_read_replica
 from jb_drf_auth.serializers import ProfilePictureUpdateSerializer, ProfileSerializer
 from jb_drf_auth.utils import get_profile_model_cls
 
 
 class ProfileViewSet(viewsets.ModelViewSet):
+    """
+    Profiles of the authenticated user.
+
+    Reads accept ``?fields=a,b`` (sparse fieldset, also narrows the SELECT) and
+    ``?expand=relation`` (nested objects). The list is paginated with a keyset cursor
+    when ``PROFILE_PAGINATION_ENABLED`` is on or the client sends ``cursor``/``page_size``.
+    """
+
     queryset = get_profile_model_cls().objects.all()
+    serializer_class = ProfileSerializer
     search_fields = ["id", "first_name", "last_name_1", "last_name_2"]
     filter_fields = ["is_active"]
-
-    def get_serializer_class(self, *args, **kwargs):
-        serializer_class = ProfileSerializer
-        if self.request.method in ["PATCH", "POST", "PUT"]:
-            serializer_class.Meta.depth = 0
-        else:
-            serializer_class.Meta.depth = 1
-        return serializer_class
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-is_default", "id")
 
     def get_permissions(self):
         permissions = [IsAuthenticated]
         return [perm() for perm in permissions]
 
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            self._paginator = None
+            params = self.request.query_params
+            if get_setting("PROFILE_PAGINATION_ENABLED") or any(
+                name in params
+                for name in (KeysetPagination.cursor_query_param, KeysetPagination.page_size_query_param)
+            ):
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def _list_param(self, name):
+        raw = self.request.query_params.get(name) or ""
+        return [value.strip() for value in raw.split(",") if value.strip()]
+
+    def get_field_options(self):
+        """Parse and validate ``?fields=`` and ``?expand=`` once per request."""
+        if not hasattr(self, "_field_options"):
+            self._field_options = {"fields": None, "expand": None}
+            if self.request.method in SAFE_METHODS:
+                fields, expand = self._list_param("fields"), self._list_param("expand")
+                if fields or expand:
+                    self._validate_field_options(fields, expand)
+                self._field_options = {"fields": fields or None, "expand": expand or None}
+        return self._field_options
+
+    def _validate_field_options(self, fields, expand):
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        errors = {}
+        unknown = sorted(set(fields) - set(serializer.fields))
+        if unknown:
+            errors["fields"] = _("Campos no validos: %(fields)s.") % {"fields": ", ".join(unknown)}
+        unknown = sorted(set(expand) - set(serializer.get_expandable_fields()))
+        if unknown:
+            errors["expand"] = _("Relaciones no validas: %(fields)s.") % {"fields": ", ".join(unknown)}
+        if errors:
+            raise ValidationError(errors)
+
+    def get_serializer(self, *args, **kwargs):
+        for name, value in self.get_field_options().items():
+            kwargs.setdefault(name, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        with use_read_replica(request.user):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with use_read_replica(request.user):
+            return super().retrieve(request, *args, **kwargs)
+
     def get_queryset(self):
-        return get_profile_model_cls().objects.filter(user=self.request.user)
+        queryset = get_profile_model_cls().objects.filter(user_id=self.request.user.pk)
+        options = self.get_field_options()
+        if not any(options.values()):
+            return queryset
+        return self.get_serializer_class().optimize_queryset(
+            queryset,
+            required=[field.lstrip("-") for field in self.keyset_ordering],
+            **options,
+        )
 
 
 class ProfilePictureUpdateView(APIView):
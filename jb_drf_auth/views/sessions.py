@@ -0,0 +1,33 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from jb_drf_auth.serializers import LogoutSerializer
+from jb_drf_auth.services.sessions import SessionService
+
+
+def _token_payload(request):
+    return getattr(request.auth, "payload", None)
+
+
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        SessionService.logout(
+            request.user,
+            access_payload=_token_payload(request),
+            raw_refresh=serializer.validated_data.get("refresh") or None,
+        )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class LogoutAllView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        SessionService.logout_all(request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
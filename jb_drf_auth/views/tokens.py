@@ -0,0 +1,26 @@
+from django.utils.cache import patch_cache_control
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenRefreshView as BaseTokenRefreshView
+
+from jb_drf_auth.conf import get_setting
+from jb_drf_auth.serializers import TokenRefreshSerializer
+from jb_drf_auth.signing import build_jwks
+
+
+class TokenRefreshView(BaseTokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
+
+class JwksView(APIView):
+    """
+    Publishes the public signing keys so other services can verify access tokens offline.
+    """
+
+    permission_classes = []
+    authentication_classes = []
+
+    def get(self, request):
+        response = Response(build_jwks())
+        patch_cache_control(response, public=True, max_age=int(get_setting("JWKS_CACHE_SECONDS")))
+        return response
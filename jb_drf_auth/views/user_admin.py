@@ -1,11 +1,17 @@
 from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.translation import gettext as _
-from rest_framework import status
+from rest_framework import generics, serializers, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from jb_drf_auth.pagination import KeysetPagination
 from jb_drf_auth.permissions import BootstrapTokenOrAdmin
-from jb_drf_auth.serializers import UserAdminCreateSerializer
+from jb_drf_auth.serializers import UserAdminCreateSerializer, get_person_search_serializer
+from jb_drf_auth.services.person_search import PersonSearchService
+from jb_drf_auth.services.user_export import CONTENT_TYPES, EXPORT_FORMATS, UserExportService
 from jb_drf_auth.utils import get_profile_model_cls
 
 
@@ -93,3 +99,37 @@ class CreateStaffUserView(APIView):
             },
             status=status.HTTP_201_CREATED,
         )
+
+
+class PersonSearchView(generics.ListAPIView):
+    """Staff lookup by name, national_id, tax_id, contact_email or mobile_phone (`?q=`)."""
+
+    permission_classes = [IsAdminUser]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-rank", "id")
+
+    def get_serializer_class(self):
+        return get_person_search_serializer(PersonSearchService.get_queryset().model)
+
+    def get_queryset(self):
+        fields = self.get_serializer_class().Meta.read_only_fields
+        queryset = PersonSearchService.get_queryset().only(*fields)
+        return PersonSearchService.search(self.request.query_params.get("q"), queryset)
+
+
+class UserExportView(APIView):
+    """Staff export of every user, streamed as JSON Lines (default) or CSV (`?output=csv`)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        export_format = request.query_params.get("output", "jsonl")
+        if export_format not in EXPORT_FORMATS:
+            raise serializers.ValidationError({"output": _("Formato no valido. Usa jsonl o csv.")})
+
+        response = StreamingHttpResponse(
+            UserExportService.iter_lines(export_format), content_type=CONTENT_TYPES[export_format]
+        )
+        filename = f"users-{timezone.now():%Y%m%d%H%M%S}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Measure memory while streaming the user export (Linux, reads /proc/self/status).
+
+Seeds a temporary SQLite file so the rows live on disk, then prints RSS every 10% of
+the export. A flat column means memory does not grow with the number of users:
+
+    python scripts/benchmark_user_export.py --rows 1000000 --format csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+
+
+def rss_mb():
+    with open("/proc/self/status", encoding="ascii") as handle:
+        for line in handle:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    return parser.parse_args()
+
+
+def seed(rows):
+    from django.db import connection
+
+    from jb_drf_auth.tests.concrete_models import Profile, SocialAccount, User
+
+    batch = 5000
+    for start in range(0, rows, batch):
+        users = User.objects.bulk_create(
+            User(username=f"user{index}", email=f"user{index}@example.com", password="!")
+            for index in range(start, min(start + batch, rows))
+        )
+        Profile.objects.bulk_create(
+            Profile(user=user, first_name=f"User {user.pk}", is_default=True) for user in users
+        )
+        SocialAccount.objects.bulk_create(
+            SocialAccount(user=user, provider="google", provider_user_id=str(user.pk), raw_response={})
+            for user in users[::3]
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {User._meta.db_table} SET default_profile_id = ("
+            f"SELECT id FROM {Profile._meta.db_table} WHERE user_id = {User._meta.db_table}.id)"
+        )
+
+
+def main():
+    args = parse_args()
+    directory = tempfile.TemporaryDirectory()
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = os.path.join(directory.name, "export.sqlite3")
+    django.setup()
+
+    from jb_drf_auth.services.user_export import UserExportService
+    from jb_drf_auth.tests.concrete_models import ensure_schema
+
+    ensure_schema()
+    started = time.perf_counter()
+    seed(args.rows)
+    print(f"seeded {args.rows} users in {time.perf_counter() - started:.1f}s")
+
+    baseline = rss_mb()
+    step = max(args.rows // 10, 1)
+    print(f"{'rows':>10} {'rss MB':>8}")
+    print(f"{0:>10} {baseline:8.1f}")
+    started = time.perf_counter()
+    exported = 0
+    with open(os.devnull, "w", encoding="utf-8") as output:
+        for line in UserExportService.iter_lines(args.format, chunk_size=args.chunk_size):
+            output.write(line)
+            exported += 1
+            if exported % step == 0:
+                print(f"{exported:>10} {rss_mb():8.1f}")
+    elapsed = time.perf_counter() - started
+    print(f"exported {exported} lines in {elapsed:.1f}s ({exported / elapsed:.0f}/s), RSS growth {rss_mb() - baseline:.1f} MB")
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
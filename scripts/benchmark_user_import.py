@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compare user onboarding throughput: RegisterService one by one vs. UserImportService.
+
+Runs against the test settings (in-memory SQLite), so numbers are relative, e.g.:
+
+    python scripts/benchmark_user_import.py --rows 5000
+    python scripts/benchmark_user_import.py --rows 200 --hasher pbkdf2 --hash-workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jb_drf_auth.tests.settings")
+
+HASHERS = {
+    "md5": "django.contrib.auth.hashers.MD5PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--hasher",
+        choices=sorted(HASHERS),
+        default="md5",
+        help="md5 isolates database work; pbkdf2 shows the real hashing cost.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    import django
+    from django.conf import settings
+
+    settings.PASSWORD_HASHERS = [HASHERS[args.hasher]]
+    django.setup()
+
+    from django.contrib.auth.hashers import make_password
+
+    from jb_drf_auth.services import RegisterService, UserImportService
+    from jb_drf_auth.tests.concrete_models import EmailOutbox, Profile, User, ensure_schema
+
+    ensure_schema()
+    password_hash = make_password("benchmark-secret")
+
+    def rows(prefix, pre_hashed):
+        for index in range(args.rows):
+            row = {"email": f"{prefix}{index}@example.com", "first_name": f"User {index}"}
+            if pre_hashed:
+                row["password_hash"] = password_hash
+            else:
+                row["password"] = "benchmark-secret"
+            yield index + 1, row, None
+
+    def reset():
+        EmailOutbox.objects.all().delete()
+        Profile.all_objects.all().delete()
+        User.objects.all().delete()
+
+    def register_one_by_one():
+        with patch("jb_drf_auth.services.register.EmailConfirmationService.send_verification_email"):
+            for index in range(args.rows):
+                RegisterService.register_user(
+                    email=f"register{index}@example.com",
+                    username=None,
+                    password="benchmark-secret",
+                    password_confirm="benchmark-secret",
+                    first_name=f"User {index}",
+                    last_name_1=None,
+                    last_name_2=None,
+                    birthday=None,
+                    gender=None,
+                    role=None,
+                    terms_and_conditions_accepted=True,
+                )
+
+    def import_rows(prefix, pre_hashed, hash_workers):
+        return lambda: UserImportService.import_rows(
+            rows(prefix, pre_hashed),
+            batch_size=args.batch_size,
+            hash_workers=hash_workers,
+            send_confirmation=True,
+        )
+
+    cases = [
+        ("RegisterService (sequential)", register_one_by_one),
+        ("import, plain passwords", import_rows("plain", False, 0)),
+        (f"import, plain passwords, {args.hash_workers} workers", import_rows("pool", False, args.hash_workers)),
+        ("import, password_hash column", import_rows("hashed", True, 0)),
+    ]
+
+    print(f"{args.rows} users, hasher={args.hasher}, batch_size={args.batch_size}")
+    for label, run in cases:
+        reset()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        assert User.objects.count() == args.rows, label
+        print(f"{label:<45} {elapsed:8.2f}s {args.rows / elapsed:10.0f} users/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ CAMEL_COLLECTION_PATH = ROOT / "docs" / "API.camel.postman_collection.json"
 EXPECTED_ENDPOINTS = [
     "admin/create-superuser/",
     "admin/create-staff/",
+    "admin/persons/search/",
+    "admin/users/export/",
     "register/",
     "registration/account-confirmation-email/",
     "registration/account-confirmation-email/resend/",
@@ -33,7 +35,13 @@ EXPECTED_ENDPOINTS = [
     "profile/switch/",
     "profile/picture/",
     "me/",
+    "logout/",
+    "logout/all/",
+    "devices/",
+    "devices/revoke/",
+    "devices/sign-out-others/",
     "token/refresh/",
+    ".well-known/jwks.json",
     "account/update/",
     "account/delete/",
     "profiles/",